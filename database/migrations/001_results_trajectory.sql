@@ -0,0 +1,4 @@
+-- Adds the packed trajectory column to databases created before it was part of schema.sql,
+-- which is only applied when the database volume is first initialized:
+--     docker compose exec -T database psql -U "$DB_USERNAME" -d "$DB_DATABASE" < database/migrations/001_results_trajectory.sql
+ALTER TABLE results ADD COLUMN IF NOT EXISTS trajectory BYTEA;
\ No newline at end of file
@@ -19,5 +19,8 @@ CREATE TABLE results (
     id SERIAL PRIMARY KEY,
     application_id INTEGER NOT NULL REFERENCES applications(id) ON DELETE CASCADE,
     data JSONB NOT NULL,
+    trajectory BYTEA,
     created_at TIMESTAMP NOT NULL DEFAULT NOW()
-);
\ No newline at end of file
+);
+
+CREATE INDEX applications_user_id_created_at_idx ON applications (user_id, created_at DESC);
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Compares the single-pass function rewriter
+with the previous one-regex-per-function implementation
+over a corpus of real equations.
+
+Usage: python solver-bot/benchmarks/function_replacer_benchmark.py [--repeat 200]
+"""
+import argparse
+import re
+import sys
+import timeit
+
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).parent
+
+sys.path.insert(0, str(BENCHMARKS_DIR.parent / "src" / "main" / "python"))
+
+from equation.function_replacer import replace_math_functions
+from equation.functions import MATH_FUNCTIONS
+
+CORPUS_PATH = BENCHMARKS_DIR / "corpus" / "equations.txt"
+
+
+def load_corpus():
+    with open(CORPUS_PATH, "r", encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def replace_math_functions_per_regex(equation):
+    for func, replacement in MATH_FUNCTIONS.items():
+        if func in ['coth', 'cth']:
+            equation = re.sub(rf'\b{func}\((.*?)\)', r'(cosh(\1) / sinh(\1))', equation)
+        elif func in ['acot', 'actg', 'arccot', 'arcctg']:
+            equation = re.sub(rf'\b{func}\((.*?)\)', r'(atan(1 / \1))', equation)
+        else:
+            equation = re.sub(rf'\b{func}\b', f'{replacement}', equation)
+    return equation
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    corpus = [equation.split("=", 1)[-1] for equation in load_corpus()]
+
+    for name, function in (
+        ("per-regex", replace_math_functions_per_regex),
+        ("single-pass", replace_math_functions)
+    ):
+        elapsed = timeit.timeit(lambda: [function(equation) for equation in corpus], number=args.repeat)
+        per_equation = elapsed / (args.repeat * len(corpus))
+        print(f"{name:<12} {per_equation * 1e6:>8.2f} us per equation")
+
+    differences = [
+        (equation, replace_math_functions_per_regex(equation), replace_math_functions(equation))
+        for equation in corpus
+        if replace_math_functions_per_regex(equation) != replace_math_functions(equation)
+    ]
+    for equation, old, new in differences:
+        print(f"differs: {equation!r}: {old!r} -> {new!r}")
+
+
+if __name__ == "__main__":
+    main()
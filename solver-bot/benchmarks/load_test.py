@@ -0,0 +1,404 @@
+"""
+Load test of the conversation flow: N virtual users walk
+/start -> solve -> equation -> initial x -> initial y -> reach point -> step size
+through the real handlers of shell.build_application(), with the Telegram Bot API
+replaced by a local fake and the Spring API by a local stub with configurable latency.
+
+Reports the p50/p95/p99 handler latency (from the update entering the queue
+to the end of its processing), the throughput and the event loop lag
+for every concurrency level.
+
+Usage: python solver-bot/benchmarks/load_test.py [--users 1 10 50 100] [--rounds 2]
+       [--backend-latency 0.005] [--solve-latency 0.05] [--telegram-latency 0.02]
+       [--remote-solves] [--output results.json]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+from pathlib import Path
+
+from aiohttp import web
+
+PY_DIR = Path(__file__).parent.parent / "src" / "main" / "python"
+
+sys.path.insert(0, str(PY_DIR))
+
+STUB_HOST = "127.0.0.1"
+BOT_TOKEN = "123456:load-test"
+BOT_USER = {"id": 123456, "is_bot": True, "first_name": "Solver", "username": "solver_load_test_bot"}
+
+# Equations with their order, the initial y needs one value per order
+EQUATIONS = [
+    ("y' = y", 1),
+    ("y' = x + y", 1),
+    ("y' = sin(x) * y", 1),
+    ("y'' = -y", 2),
+    ("y'' = -y' - 4*y", 2),
+    ("y''' = x - y'", 3),
+]
+
+STEPS = ["start", "solve", "equation", "initial_x", "initial_y", "reach_point", "step_size"]
+
+LOOP_LAG_INTERVAL = 0.01
+
+
+async def sleep(latency):
+    if latency > 0:
+        await asyncio.sleep(latency)
+
+
+def create_telegram_app(latency, stats):
+    """Answers the Bot API methods the handlers call with minimal valid objects."""
+    message_ids = itertools.count(1)
+
+    def message(chat_id, message_id=None, **fields):
+        return {
+            "message_id": message_id or next(message_ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+            **fields
+        }
+
+    async def handle(request):
+        method = request.match_info["method"]
+        # Plain requests are form encoded, uploads are multipart
+        parameters = await request.post()
+        stats[method] = stats.get(method, 0) + 1
+        await sleep(latency)
+
+        chat_id = int(parameters.get("chat_id", 0))
+        message_id = int(parameters["message_id"]) if "message_id" in parameters else None
+
+        if method == "getMe":
+            result = BOT_USER
+        elif method in ("sendMessage", "editMessageText"):
+            result = message(chat_id, message_id, text=str(parameters.get("text", "")))
+        elif method in ("sendPhoto", "editMessageMedia"):
+            result = message(chat_id, message_id, photo=[{
+                "file_id": f"photo-{next(message_ids)}",
+                "file_unique_id": "photo",
+                "width": 800,
+                "height": 600
+            }])
+        else:
+            result = True
+
+        return web.json_response({"ok": True, "result": result})
+
+    app = web.Application(client_max_size=64 * 2**20)
+    app.router.add_post("/bot{token}/{method}", handle)
+    return app
+
+
+def create_spring_app(latency, solve_latency):
+    """Answers the Spring API requests of spring_client, results are sent as JSON."""
+    application_ids = itertools.count(1)
+    orders = {}
+
+    async def solve(request):
+        payload = await request.json()
+        await sleep(latency)
+        application_id = next(application_ids)
+        orders[application_id] = payload["order"]
+        return web.json_response(application_id)
+
+    async def record(request):
+        payload = await request.json()
+        await sleep(latency)
+        application_id = next(application_ids)
+        orders[application_id] = payload["request"]["order"]
+        return web.json_response(application_id)
+
+    async def status_wait(request):
+        await sleep(solve_latency)
+        return web.Response(text="completed")
+
+    async def get_results(request):
+        await sleep(latency)
+        order = orders.get(int(request.match_info["application_id"]), 1)
+        x_values = np.linspace(0, 1, 100)
+        y_values = np.column_stack([np.exp(x_values)] * order)
+        data = json.dumps({
+            "solution": [1.0, *y_values[-1].tolist()],
+            "xvalues": x_values.tolist(),
+            "yvalues": y_values.tolist()
+        })
+        return web.json_response([{"id": 1, "data": data, "created_at": ""}])
+
+    async def get_trajectory(request):
+        return web.Response(status=404)
+
+    async def get_user(request):
+        await sleep(latency)
+        # Unknown user, as for a first /start
+        return web.Response(status=500)
+
+    async def set_users(request):
+        settings = await request.json()
+        await sleep(latency)
+        return web.json_response(len(settings))
+
+    async def get_applications(request):
+        await sleep(latency)
+        return web.json_response([])
+
+    app = web.Application()
+    app.router.add_post("/solve/{user_id}", solve)
+    app.router.add_post("/solve/{user_id}/recorded", record)
+    app.router.add_get("/applications/{application_id}/status/wait", status_wait)
+    app.router.add_get("/results/{application_id}", get_results)
+    app.router.add_get("/results/{application_id}/trajectory", get_trajectory)
+    app.router.add_get("/users/{user_id}", get_user)
+    app.router.add_post("/users", set_users)
+    app.router.add_get("/applications/{user_id}", get_applications)
+    return app
+
+
+async def start_site(app):
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, STUB_HOST, 0)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+
+class Driver:
+    """Feeds synthetic updates to the application and waits for their processing to end."""
+
+    def __init__(self, application):
+        self.application = application
+        self.update_ids = itertools.count(1)
+        self.message_ids = itertools.count(10**6)
+        self.pending = {}
+
+    async def on_processed(self, update, context):
+        future = self.pending.pop(update.update_id, None)
+        if future is not None and not future.done():
+            future.set_result(None)
+
+    async def send(self, data):
+        from telegram import Update
+
+        update_id = next(self.update_ids)
+        update = Update.de_json({"update_id": update_id, **data}, self.application.bot)
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[update_id] = future
+
+        start = time.perf_counter()
+        await self.application.update_queue.put(update)
+        await future
+        return time.perf_counter() - start
+
+    def user(self, user_id):
+        return {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"}
+
+    async def send_text(self, user_id, text):
+        entities = []
+        if text.startswith("/"):
+            entities.append({"type": "bot_command", "offset": 0, "length": len(text.split()[0])})
+
+        return await self.send({"message": {
+            "message_id": next(self.message_ids),
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": self.user(user_id),
+            "text": text,
+            "entities": entities
+        }})
+
+    async def press(self, user_id, data):
+        return await self.send({"callback_query": {
+            "id": str(next(self.message_ids)),
+            "from": self.user(user_id),
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": {
+                "message_id": next(self.message_ids),
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": BOT_USER,
+                "text": "menu"
+            }
+        }})
+
+
+async def run_user(driver, user_id, rounds, step_size, latencies):
+    for round_index in range(rounds):
+        equation, order = EQUATIONS[(user_id + round_index) % len(EQUATIONS)]
+
+        for step, send in zip(STEPS, (
+            lambda: driver.send_text(user_id, "/start"),
+            lambda: driver.press(user_id, "solve"),
+            lambda: driver.send_text(user_id, equation),
+            lambda: driver.send_text(user_id, "0"),
+            lambda: driver.send_text(user_id, " ".join(["1"] * order)),
+            lambda: driver.send_text(user_id, "1"),
+            lambda: driver.send_text(user_id, str(step_size)),
+        )):
+            latencies[step].append(await send())
+
+
+async def measure_loop_lag(lags, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        lags.append(time.perf_counter() - start - LOOP_LAG_INTERVAL)
+
+
+def percentiles(values):
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": p50, "p95": p95, "p99": p99, "max": max(values)}
+
+
+async def run_level(driver, users, first_user_id, rounds, step_size, telegram_stats):
+    latencies = {step: [] for step in STEPS}
+    lags = []
+    stop = asyncio.Event()
+
+    media_before = telegram_stats.get("editMessageMedia", 0)
+    lag_task = asyncio.create_task(measure_loop_lag(lags, stop))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_user(driver, first_user_id + i, rounds, step_size, latencies)
+        for i in range(users)
+    ))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await lag_task
+
+    all_latencies = [latency for values in latencies.values() for latency in values]
+    solves = users * rounds
+
+    return {
+        "users": users,
+        "updates": len(all_latencies),
+        "solves": solves,
+        "plots_sent": telegram_stats.get("editMessageMedia", 0) - media_before,
+        "elapsed": elapsed,
+        "updates_per_second": len(all_latencies) / elapsed,
+        "solves_per_second": solves / elapsed,
+        "latency": percentiles(all_latencies),
+        "solve_latency": percentiles(latencies["step_size"]),
+        "step_latency": {step: percentiles(values) for step, values in latencies.items()},
+        "loop_lag": percentiles(lags)
+    }
+
+
+def ms(value):
+    return "-" if value is None else f"{value * 1000:.1f}"
+
+
+def report(result):
+    print(
+        f"{result['users']:>6} {result['updates_per_second']:>9.1f} {result['solves_per_second']:>8.2f} "
+        f"{ms(result['latency']['p50']):>8} {ms(result['latency']['p95']):>8} {ms(result['latency']['p99']):>8} "
+        f"{ms(result['solve_latency']['p50']):>9} {ms(result['solve_latency']['p99']):>9} "
+        f"{ms(result['loop_lag']['p50']):>8} {ms(result['loop_lag']['p99']):>8} {ms(result['loop_lag']['max']):>8}",
+        flush=True
+    )
+
+
+async def run(args):
+    telegram_stats = {}
+    telegram_runner, telegram_port = await start_site(create_telegram_app(args.telegram_latency, telegram_stats))
+    spring_runner, spring_port = await start_site(create_spring_app(args.backend_latency, args.solve_latency))
+
+    os.environ["CLIENT_API_URL"] = f"http://{STUB_HOST}:{spring_port}"
+
+    from telegram import Update
+    from telegram.ext import TypeHandler
+    from shell import build_application
+
+    logging.getLogger().setLevel(args.log_level)
+
+    application = build_application(base_url=f"http://{STUB_HOST}:{telegram_port}/bot")
+    driver = Driver(application)
+    # Runs after the conversation handler, so it marks the end of the processing of an update
+    application.add_handler(TypeHandler(Update, driver.on_processed), group=1)
+
+    # Same lifecycle as Application.run_polling, without the updater
+    await application.initialize()
+    await application.post_init(application)
+    await application.start()
+
+    results = []
+    try:
+        # Loads sympy, the plot workers and the equation memoization
+        await run_level(driver, len(EQUATIONS), 1, 1, args.step_size, telegram_stats)
+
+        print(
+            f"{'users':>6} {'updates/s':>9} {'solves/s':>8} {'p50, ms':>8} {'p95, ms':>8} {'p99, ms':>8} "
+            f"{'solve p50':>9} {'solve p99':>9} {'lag p50':>8} {'lag p99':>8} {'lag max':>8}"
+        )
+
+        first_user_id = 1000
+        for users in args.users:
+            result = await run_level(driver, users, first_user_id, args.rounds, args.step_size, telegram_stats)
+            first_user_id += users
+            results.append(result)
+            report(result)
+    finally:
+        await application.stop()
+        await application.shutdown()
+        await application.post_shutdown(application)
+        await telegram_runner.cleanup()
+        await spring_runner.cleanup()
+
+    print(f"Bot API calls: {json.dumps(telegram_stats, sort_keys=True)}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--rounds", type=int, default=2, help="full conversations per virtual user")
+    parser.add_argument("--backend-latency", type=float, default=0.005,
+                        help="latency of every Spring API response in seconds")
+    parser.add_argument("--solve-latency", type=float, default=0.05,
+                        help="time the Spring API takes to complete an application")
+    parser.add_argument("--telegram-latency", type=float, default=0.02,
+                        help="latency of every Bot API response in seconds")
+    parser.add_argument("--step-size", type=float, default=0.01)
+    parser.add_argument("--remote-solves", action="store_true",
+                        help="send every solve to the Spring stub instead of solving small ones locally")
+    parser.add_argument("--log-level", default="WARNING", help="log level of the bot during the test")
+    parser.add_argument("--output", type=Path, help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    os.environ["CLIENT_API_KEY"] = BOT_TOKEN
+    os.environ["METRICS_PORT"] = "0"
+    if args.remote_solves:
+        os.environ["LOCAL_SOLVER_MAX_STEPS"] = "0"
+
+    output = args.output.resolve() if args.output is not None else None
+
+    # The bot writes its logs and caches relative to the working directory
+    with tempfile.TemporaryDirectory() as cwd:
+        os.chdir(cwd)
+        os.environ["SOLUTION_CACHE_DIR"] = str(Path(cwd) / "cache")
+
+        results = asyncio.run(run(args))
+
+        logging.shutdown()
+
+    if output is not None:
+        output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Measures plot render time and peak traced memory
+against the number of points, with and without decimation.
+
+Usage: python solver-bot/benchmarks/plot_benchmark.py [--points 1000 10000 ...]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "main" / "python"))
+
+from plotting.plotter import plot_solution
+
+
+def make_solution(points, order):
+    x_values = np.linspace(0, 100, points)
+    y_values = np.column_stack([np.sin(x_values * (i + 1)) for i in range(order)])
+    return x_values, y_values
+
+
+def measure(x_values, y_values, order, max_points):
+    tracemalloc.start()
+    start = time.perf_counter()
+    png = plot_solution(x_values, y_values, order, max_points=max_points)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, len(png)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, nargs="+", default=[10**3, 10**4, 10**5, 10**6])
+    parser.add_argument("--order", type=int, default=2)
+    args = parser.parse_args()
+
+    # The first render loads fonts and is not representative
+    plot_solution([0, 1], [[0], [1]], 1)
+
+    print(f"{'points':>10} {'mode':>10} {'time, s':>10} {'peak, MiB':>10} {'png, KiB':>10}")
+
+    for points in args.points:
+        x_values, y_values = make_solution(points, args.order)
+        for mode, max_points in (("full", None), ("decimated", 4000)):
+            elapsed, peak, size = measure(x_values, y_values, args.order, max_points)
+            print(f"{points:>10} {mode:>10} {elapsed:>10.3f} {peak / 2**20:>10.1f} {size / 2**10:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
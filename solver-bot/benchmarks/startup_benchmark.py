@@ -0,0 +1,110 @@
+"""
+Measures the import time of the bot entry module in a fresh interpreter
+and reports the cumulative import time of each top-level module it pulls in.
+Heavy libraries must stay deferred until first use.
+
+Usage: python solver-bot/benchmarks/startup_benchmark.py [--runs 5] [--max-total 0.6]
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from pathlib import Path
+
+PY_DIR = Path(__file__).parent.parent / "src" / "main" / "python"
+
+# Submodules that only appear in sys.modules once the library has really been executed
+DEFERRED_MODULES = ["sympy.core", "matplotlib.pyplot", "matplotlib.figure", "numpy.linalg"]
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+PROBE = f"""
+import sys
+import time
+start = time.perf_counter()
+import shell
+print("total", time.perf_counter() - start)
+print("loaded", ",".join(name for name in {DEFERRED_MODULES!r} if name in sys.modules))
+"""
+
+
+def run_once():
+    with tempfile.TemporaryDirectory() as cwd:
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROBE],
+            cwd=cwd,
+            env={"PYTHONPATH": str(PY_DIR)},
+            capture_output=True,
+            text=True,
+            check=True
+        )
+
+    # Children are printed before their parent, one extra level of indentation deeper
+    modules = {}
+    children = {}
+    for line in completed.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        depth = len(match.group(3))
+        if depth == 3:
+            children[match.group(4)] = int(match.group(2)) / 1e6
+        elif depth == 1:
+            if match.group(4) == "shell":
+                modules = children
+            children = {}
+
+    total = None
+    loaded = []
+    for line in completed.stdout.splitlines():
+        key, _, value = line.partition(" ")
+        if key == "total":
+            total = float(value)
+        elif key == "loaded" and value:
+            loaded = value.split(",")
+
+    return total, modules, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-total", type=float, default=None,
+                        help="fail if the median import time in seconds exceeds this value")
+    args = parser.parse_args()
+
+    totals = []
+    per_module = {}
+    loaded = []
+
+    for _ in range(args.runs):
+        total, modules, loaded = run_once()
+        totals.append(total)
+        for name, elapsed in modules.items():
+            per_module.setdefault(name, []).append(elapsed)
+
+    print(f"{'module':<30} {'median, s':>10}")
+    for name, values in sorted(per_module.items(), key=lambda item: -statistics.median(item[1])):
+        print(f"{name:<30} {statistics.median(values):>10.3f}")
+
+    median_total = statistics.median(totals)
+    print(f"{'total':<30} {median_total:>10.3f}")
+
+    failed = False
+
+    if loaded:
+        print(f"Eagerly loaded heavy modules: {', '.join(loaded)}")
+        failed = True
+
+    if args.max_total is not None and median_total > args.max_total:
+        print(f"Import time {median_total:.3f}s exceeds the limit of {args.max_total:.3f}s")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
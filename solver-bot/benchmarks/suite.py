@@ -0,0 +1,397 @@
+"""
+Benchmark suite of the bot's hot paths: equation formatting and validation,
+solution printing, plot rendering and the spring_client calls
+against a local aiohttp stub of the Spring API.
+
+Results are written as JSON and can be compared against a saved baseline,
+the run fails if any benchmark is slower than the baseline by more than the threshold.
+Baselines are only comparable on the same machine and interpreter.
+
+Usage:
+    python solver-bot/benchmarks/suite.py [--filter REGEX] [--quick] [--output results.json]
+    python solver-bot/benchmarks/suite.py --save-baseline baseline.json
+    python solver-bot/benchmarks/suite.py --baseline baseline.json [--threshold 0.25]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+import numpy as np
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).parent
+
+sys.path.insert(0, str(BENCHMARKS_DIR.parent / "src" / "main" / "python"))
+
+from aiohttp import web
+
+import spring_client
+
+from equation.equation_parser import format_equation, format_normalized_equation
+from equation.equation_validator import validate_parentheses, validate_symbols
+from equation.function_replacer import replace_math_functions
+from plotting.plotter import plot_solution
+from printing.printer import print_solution
+from solver.trajectory import encode_trajectory
+
+CORPUS_PATH = BENCHMARKS_DIR / "corpus" / "equations.txt"
+
+STUB_HOST = "127.0.0.1"
+STUB_APPLICATION_ID = 1
+STUB_TRAJECTORY_POINTS = 10**5
+
+PLOT_POINTS = [10**3, 10**4, 10**5, 10**6]
+QUICK_PLOT_POINTS = [10**3, 10**4]
+
+DEFAULT_REPEAT = 5
+DEFAULT_MIN_TIME = 0.2
+DEFAULT_THRESHOLD = 0.25
+
+
+def load_corpus():
+    with open(CORPUS_PATH, "r", encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def make_solution(points, order):
+    x_values = np.linspace(0, 100, points)
+    y_values = np.column_stack([np.sin(x_values * (i + 1)) for i in range(order)])
+    return x_values, y_values
+
+
+def summarize(samples, operations):
+    per_operation = [sample / operations for sample in samples]
+    median = statistics.median(per_operation)
+    return {
+        "median": median,
+        "min": min(per_operation),
+        "stdev": statistics.stdev(per_operation) if len(per_operation) > 1 else 0.0,
+        "runs": len(per_operation),
+        "operations": operations
+    }
+
+
+def measure(function, operations, repeat, min_time):
+    """
+    Times function, which performs operations operations per call.
+    Calls are batched so every sample lasts at least min_time,
+    the results are in seconds per operation.
+    """
+    function()
+
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 2**20:
+            break
+        loops *= 2
+
+    samples = [elapsed]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        samples.append(time.perf_counter() - start)
+
+    return summarize(samples, operations * loops)
+
+
+async def measure_async(coroutine_function, operations, repeat, min_time):
+    await coroutine_function()
+
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            await coroutine_function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 2**16:
+            break
+        loops *= 2
+
+    samples = [elapsed]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            await coroutine_function()
+        samples.append(time.perf_counter() - start)
+
+    return summarize(samples, operations * loops)
+
+
+def equation_benchmarks(corpus):
+    right_hand_sides = [equation.split("=", 1)[-1] for equation in corpus]
+
+    def format_cold():
+        for equation in corpus:
+            format_normalized_equation.cache_clear()
+            format_equation(equation)
+
+    def format_cached():
+        for equation in corpus:
+            format_equation(equation)
+
+    def replace():
+        for equation in right_hand_sides:
+            replace_math_functions(equation)
+
+    def symbols():
+        for equation in corpus:
+            validate_symbols(equation)
+
+    def parentheses():
+        for equation in corpus:
+            validate_parentheses(equation)
+
+    return [
+        ("format_equation.cold", format_cold, len(corpus)),
+        ("format_equation.cached", format_cached, len(corpus)),
+        ("replace_math_functions", replace, len(corpus)),
+        ("validate_symbols", symbols, len(corpus)),
+        ("validate_parentheses", parentheses, len(corpus)),
+    ]
+
+
+def printing_benchmarks():
+    cases = []
+
+    for order in (1, 3, 6):
+        result = [1.2345678901234567 * (i + 1) for i in range(order + 1)]
+        for rounding in (4, 16):
+            cases.append((
+                f"print_solution.order{order}.rounding{rounding}",
+                lambda result=result, order=order, rounding=rounding: print_solution(result, order, rounding),
+                1
+            ))
+
+    return cases
+
+
+def plot_benchmarks(points_list):
+    # The first render loads fonts and is not representative
+    plot_solution([0, 1], [[0], [1]], 1)
+
+    cases = []
+    for points in points_list:
+        x_values, y_values = make_solution(points, 2)
+        cases.append((
+            f"plot_solution.{points}",
+            lambda x_values=x_values, y_values=y_values: plot_solution(x_values, y_values, 2),
+            1
+        ))
+    return cases
+
+
+def create_stub_app():
+    """Answers the requests of spring_client the way the Spring API does."""
+    x_values, y_values = make_solution(STUB_TRAJECTORY_POINTS, 2)
+    trajectory = encode_trajectory(x_values, y_values)
+    results = json.dumps([{
+        "id": 1,
+        "data": json.dumps({"solution": [x_values[-1], *y_values[-1]]}),
+        "created_at": "2025-01-01 00:00:00"
+    }])
+    applications = json.dumps([
+        {
+            "id": i,
+            "parameters": json.dumps({"userEquation": "y' = y", "order": 1}),
+            "status": "completed",
+            "created_at": "2025-01-01 00:00:00",
+            "last_updated_at": "2025-01-01 00:00:00"
+        }
+        for i in range(5)
+    ])
+    settings = json.dumps({"method": "runge_kutta", "rounding": "4", "language": "en", "hints": "true"})
+
+    async def solve(request):
+        await request.read()
+        return web.json_response(STUB_APPLICATION_ID)
+
+    async def status_wait(request):
+        return web.Response(text="completed")
+
+    async def get_results(request):
+        return web.Response(text=results, content_type="application/json")
+
+    async def get_trajectory(request):
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", request.headers.get("Range", ""))
+        if match is None:
+            return web.Response(body=trajectory)
+        start = int(match.group(1))
+        end = int(match.group(2)) + 1 if match.group(2) else len(trajectory)
+        return web.Response(
+            status=206,
+            body=trajectory[start:end],
+            headers={"Content-Range": f"bytes {start}-{end - 1}/{len(trajectory)}"}
+        )
+
+    async def get_applications(request):
+        return web.Response(text=applications, content_type="application/json")
+
+    async def get_user(request):
+        return web.Response(text=settings, content_type="application/json")
+
+    app = web.Application()
+    app.router.add_post("/solve/{user_id}", solve)
+    app.router.add_get("/applications/{application_id}/status/wait", status_wait)
+    app.router.add_get("/results/{application_id}", get_results)
+    app.router.add_get("/results/{application_id}/trajectory", get_trajectory)
+    app.router.add_get("/applications/{user_id}", get_applications)
+    app.router.add_get("/users/{user_id}", get_user)
+    return app
+
+
+async def client_benchmarks(pattern, repeat, min_time):
+    runner = web.AppRunner(create_stub_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, STUB_HOST, 0)
+    await site.start()
+
+    port = site._server.sockets[0].getsockname()[1]
+    os.environ["CLIENT_API_URL"] = f"http://{STUB_HOST}:{port}"
+
+    header = (0, STUB_TRAJECTORY_POINTS, 2)
+
+    async def stream():
+        async for _ in spring_client.stream_trajectory(STUB_APPLICATION_ID, header):
+            pass
+
+    cases = [
+        ("spring_client.set_parameters", lambda: spring_client.set_parameters(
+            1, "runge_kutta", 1, "y' = y", "y", "0", ["1"], "1", "0.01"
+        )),
+        ("spring_client.wait_for_application_completion",
+         lambda: spring_client.wait_for_application_completion(STUB_APPLICATION_ID)),
+        ("spring_client.get_results", lambda: spring_client.get_results(STUB_APPLICATION_ID)),
+        ("spring_client.get_recent_applications", lambda: spring_client.get_recent_applications(1)),
+        ("spring_client.get_user_settings", lambda: spring_client.get_user_settings(1, None, None, None, None)),
+        (f"spring_client.stream_trajectory.{STUB_TRAJECTORY_POINTS}", stream),
+    ]
+
+    results = {}
+    try:
+        for name, coroutine_function in cases:
+            if pattern.search(name):
+                results[name] = await measure_async(coroutine_function, 1, repeat, min_time)
+                report(name, results[name])
+    finally:
+        await spring_client.close_session()
+        await runner.cleanup()
+
+    return results
+
+
+def report(name, result):
+    print(
+        f"{name:<52} {result['median'] * 1e6:>12.2f} us "
+        f"(min {result['min'] * 1e6:.2f}, ±{result['stdev'] / result['median'] * 100:.1f}%)",
+        flush=True
+    )
+
+
+def run(pattern, quick, repeat, min_time):
+    corpus = load_corpus()
+
+    cases = equation_benchmarks(corpus) + printing_benchmarks()
+    if pattern.search("plot_solution"):
+        cases += plot_benchmarks(QUICK_PLOT_POINTS if quick else PLOT_POINTS)
+
+    results = {}
+    for name, function, operations in cases:
+        if pattern.search(name):
+            results[name] = measure(function, operations, repeat, min_time)
+            report(name, results[name])
+
+    if pattern.search("spring_client"):
+        results.update(asyncio.run(client_benchmarks(pattern, repeat, min_time)))
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "numpy": np.__version__,
+            "unit": "seconds per operation"
+        },
+        "results": results
+    }
+
+
+def compare(report_data, baseline, threshold):
+    """Prints the change of every benchmark and returns the names of the regressed ones."""
+    if baseline["meta"].get("python") != report_data["meta"]["python"]:
+        print(
+            f"Warning: the baseline was recorded with Python {baseline['meta'].get('python')}, "
+            f"this run uses {report_data['meta']['python']}"
+        )
+
+    regressions = []
+
+    print(f"\n{'benchmark':<52} {'baseline, us':>14} {'current, us':>14} {'change':>9}")
+    for name, result in report_data["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            print(f"{name:<52} {'-':>14} {result['median'] * 1e6:>14.2f} {'new':>9}")
+            continue
+
+        ratio = result["median"] / previous["median"]
+        regressed = ratio > 1 + threshold
+        if regressed:
+            regressions.append(name)
+
+        print(
+            f"{name:<52} {previous['median'] * 1e6:>14.2f} {result['median'] * 1e6:>14.2f} "
+            f"{(ratio - 1) * 100:>+8.1f}%{'  REGRESSION' if regressed else ''}"
+        )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="", help="only run the benchmarks whose name matches this regex")
+    parser.add_argument("--quick", action="store_true", help="skip the largest plots")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME,
+                        help="minimum duration of one sample in seconds")
+    parser.add_argument("--output", type=Path, help="write the results to this JSON file")
+    parser.add_argument("--save-baseline", type=Path, help="write the results as a new baseline")
+    parser.add_argument("--baseline", type=Path, help="compare the results with this baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="fail if a median is slower than the baseline by more than this fraction")
+    args = parser.parse_args()
+
+    report_data = run(re.compile(args.filter), args.quick, args.repeat, args.min_time)
+
+    for path in (args.output, args.save_baseline):
+        if path is not None:
+            path.write_text(json.dumps(report_data, indent=2), encoding="utf-8")
+            print(f"Results written to {path}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(report_data, baseline, args.threshold)
+
+        if regressions:
+            print(
+                f"\nFAILED: {len(regressions)} benchmark(s) regressed by more than "
+                f"{args.threshold * 100:.0f}%: {', '.join(regressions)}"
+            )
+            sys.exit(1)
+
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compares the payload size and decode time of solution trajectories
+sent as JSON (a results row whose data is a JSON string, decoded twice)
+and as packed float64 columns decoded with numpy.frombuffer.
+
+Usage: python solver-bot/benchmarks/trajectory_encoding_benchmark.py [--points 1000 10000 ...]
+"""
+import argparse
+import json
+import sys
+import time
+import numpy as np
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "main" / "python"))
+
+from solver.trajectory import decode_trajectory, encode_trajectory
+
+
+def make_solution(points, order):
+    x_values = np.linspace(0, 100, points)
+    y_values = np.column_stack([np.sin(x_values * (i + 1)) for i in range(order)])
+    return x_values, y_values
+
+
+def json_payload(x_values, y_values):
+    data = json.dumps({
+        "solution": [x_values[-1], *y_values[-1]],
+        "xvalues": x_values.tolist(),
+        "yvalues": y_values.tolist()
+    })
+    return json.dumps([{"id": 1, "data": data, "created_at": ""}]).encode("utf-8")
+
+
+def decode_json(payload):
+    results = json.loads(payload)
+    data = json.loads(results[0]["data"])
+    return np.asarray(data["xvalues"], dtype=float), np.asarray(data["yvalues"], dtype=float)
+
+
+def measure(function, payload, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function(payload)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, nargs="+", default=[10**3, 10**4, 10**5, 10**6])
+    parser.add_argument("--order", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'points':>10} {'mode':>8} {'size, KiB':>10} {'decode, ms':>11}")
+
+    for points in args.points:
+        x_values, y_values = make_solution(points, args.order)
+
+        for mode, payload, decode in (
+            ("json", json_payload(x_values, y_values), decode_json),
+            ("binary", encode_trajectory(x_values, y_values), decode_trajectory)
+        ):
+            elapsed = measure(decode, payload, args.repeat)
+            print(f"{points:>10} {mode:>8} {len(payload) / 2**10:>10.1f} {elapsed * 1000:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import os
+import time
+
+from collections import OrderedDict
+
+from spring_client import DEFAULT_HISTORY_SIZE, get_recent_applications
+
+DEFAULT_HISTORY_TTL = 300
+DEFAULT_HISTORY_MAX_USERS = 10000
+
+_history_cache = None
+
+
+class HistoryCache:
+    """
+    LRU cache of the recent applications of each user, as shown in the history menu.
+    A user's entry is invalidated when they submit a new application,
+    the ttl covers applications submitted through other bot instances.
+    """
+
+    def __init__(self, ttl, max_users, size=DEFAULT_HISTORY_SIZE):
+        self.ttl = ttl
+        self.max_users = max_users
+        self.size = size
+
+        # user_id -> (applications, time.monotonic() of the fetch)
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, user_id):
+        entry = self._entries.get(user_id)
+
+        if entry is not None and time.monotonic() - entry[1] < self.ttl:
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        applications = await get_recent_applications(user_id, self.size)
+
+        self._entries[user_id] = (applications, time.monotonic())
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+
+        return applications
+
+    def invalidate(self, user_id):
+        self._entries.pop(user_id, None)
+
+
+def get_history_cache():
+    global _history_cache
+
+    if _history_cache is None:
+        _history_cache = HistoryCache(
+            ttl=float(os.getenv("HISTORY_CACHE_TTL", DEFAULT_HISTORY_TTL)),
+            max_users=int(os.getenv("HISTORY_CACHE_MAX_USERS", DEFAULT_HISTORY_MAX_USERS))
+        )
+
+    return _history_cache
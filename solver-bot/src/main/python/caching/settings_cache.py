@@ -0,0 +1,228 @@
+import asyncio
+import os
+import time
+
+from aiohttp import ClientError
+
+from logger import logger
+from spring_client import get_user_settings, set_user_settings_batch
+
+DEFAULT_SETTINGS_TTL = 3600
+DEFAULT_FLUSH_INTERVAL = 2
+DEFAULT_FLUSH_BATCH_SIZE = 500
+MAX_FLUSH_DELAY = 60
+
+SETTINGS_KEYS = ("method", "rounding", "language", "hints")
+
+_settings_cache = None
+
+
+class SettingsCache:
+    """
+    Write-behind cache of user settings.
+    Reads are served from memory until the entry is older than the ttl,
+    changes only mark the user dirty and a background flusher
+    coalesces them into batched writes to the backend.
+    Dirty entries never expire, so a refresh can not overwrite an unsaved change.
+    """
+
+    def __init__(self, defaults, ttl=DEFAULT_SETTINGS_TTL,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, batch_size=DEFAULT_FLUSH_BATCH_SIZE):
+        self.defaults = defaults
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        # user_id -> {"settings": dict, "loaded_at": time.monotonic(), "stored": bool}
+        self._entries = {}
+        self._dirty = set()
+        # user_id -> asyncio.Event set when the write of the user has finished
+        self._in_flight = {}
+        self._wakeup = asyncio.Event()
+        self._flusher = None
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.flushes = 0
+
+    def _is_fresh(self, user_id, entry):
+        return user_id in self._dirty or time.monotonic() - entry["loaded_at"] < self.ttl
+
+    async def get(self, user_id):
+        entry = self._entries.get(user_id)
+
+        if entry is not None and self._is_fresh(user_id, entry):
+            self.hits += 1
+            return dict(entry["settings"])
+
+        self.misses += 1
+
+        try:
+            # Unknown users come back with the None defaults
+            loaded = await get_user_settings(user_id, None, None, None, None)
+        except (ClientError, asyncio.TimeoutError) as e:
+            if entry is None:
+                raise
+            logger.warning("Using stale settings of %s: %s", user_id, e)
+            return dict(entry["settings"])
+
+        # Changed while loading
+        if user_id in self._dirty:
+            return dict(self._entries[user_id]["settings"])
+
+        stored = isinstance(loaded, dict) and loaded.get("method") is not None
+        settings = {
+            key: loaded[key] if stored and loaded.get(key) is not None else self.defaults[key]
+            for key in SETTINGS_KEYS
+        }
+
+        self._entries[user_id] = {"settings": settings, "loaded_at": time.monotonic(), "stored": stored}
+        if not stored:
+            # New users are created with the defaults
+            self._mark_dirty(user_id)
+
+        return dict(settings)
+
+    def update(self, user_id, user_data):
+        """Takes the settings from the user_data and schedules them to be written."""
+        settings = {key: user_data.get(key, self.defaults[key]) for key in SETTINGS_KEYS}
+        entry = self._entries.get(user_id)
+
+        if entry is not None and entry["settings"] == settings and user_id not in self._dirty:
+            return
+
+        self._entries[user_id] = {
+            "settings": settings,
+            "loaded_at": time.monotonic(),
+            "stored": entry is not None and entry["stored"]
+        }
+        self._mark_dirty(user_id)
+
+    def _mark_dirty(self, user_id):
+        self._dirty.add(user_id)
+        self._wakeup.set()
+
+    async def ensure_stored(self, user_id):
+        """
+        Writes a user that the backend does not know yet, applications reference it.
+        If the user is being written already, waits for that write instead.
+        """
+        while True:
+            entry = self._entries.get(user_id)
+            if entry is None or entry["stored"]:
+                return
+
+            in_flight = self._in_flight.get(user_id)
+            if in_flight is None:
+                break
+
+            # A failed write marks the user dirty again and it is written below
+            await in_flight.wait()
+
+        if user_id in self._dirty:
+            await self._write([user_id])
+
+    async def _write(self, user_ids):
+        self._dirty.difference_update(user_ids)
+
+        done = asyncio.Event()
+        for user_id in user_ids:
+            self._in_flight[user_id] = done
+
+        batch = [
+            {"id": user_id, **self._entries[user_id]["settings"]}
+            for user_id in user_ids
+            if user_id in self._entries
+        ]
+
+        try:
+            await set_user_settings_batch(batch)
+        except BaseException:
+            # Changes made during the write are newer, the rest is retried
+            self._dirty.update(user_ids)
+            raise
+        finally:
+            for user_id in user_ids:
+                # A newer write of the user may have started meanwhile
+                if self._in_flight.get(user_id) is done:
+                    del self._in_flight[user_id]
+            done.set()
+
+        for user_id in user_ids:
+            if user_id in self._entries:
+                self._entries[user_id]["stored"] = True
+
+        self.writes += len(batch)
+        self.flushes += 1
+
+    async def flush(self):
+        while self._dirty:
+            await self._write(list(self._dirty)[:self.batch_size])
+
+    async def _run_flusher(self):
+        delay = self.flush_interval
+
+        while True:
+            await self._wakeup.wait()
+            # Let the changes of a burst of menu presses coalesce
+            await asyncio.sleep(delay)
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+                delay = self.flush_interval
+            except Exception as e:
+                delay = min(delay * 2, MAX_FLUSH_DELAY)
+                logger.warning(
+                    "Error while flushing settings of %s users, retrying in %s s: %s",
+                    len(self._dirty), delay, e
+                )
+                self._wakeup.set()
+
+    def start(self):
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run_flusher())
+
+    async def stop(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error("Lost unsaved settings of %s users: %s", len(self._dirty), e)
+
+        logger.info(
+            "Settings cache closed, hits: %s, misses: %s, users written: %s in %s flushes",
+            self.hits, self.misses, self.writes, self.flushes
+        )
+
+
+def get_settings_cache():
+    return _settings_cache
+
+
+def init_settings_cache(defaults):
+    global _settings_cache
+
+    _settings_cache = SettingsCache(
+        defaults,
+        ttl=float(os.getenv("SETTINGS_CACHE_TTL", DEFAULT_SETTINGS_TTL)),
+        flush_interval=float(os.getenv("SETTINGS_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL))
+    )
+    _settings_cache.start()
+
+
+async def close_settings_cache():
+    global _settings_cache
+
+    if _settings_cache is not None:
+        await _settings_cache.stop()
+
+    _settings_cache = None
@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import os
+
+from collections import OrderedDict
+from pathlib import Path
+
+from lazy_imports import lazy_import
+from logger import logger
+
+np = lazy_import("numpy")
+
+DEFAULT_MEMORY_BUDGET = 64 * 2**20
+DEFAULT_DISK_BUDGET = 512 * 2**20
+DEFAULT_CACHE_DIR = "cache/"
+
+_solution_cache = None
+
+
+def create_entry(data):
+    """
+    Builds a cache entry from the decoded data of a results row.
+    For a sweep the solution holds one row per trajectory
+    and y_values one (steps, order) array per trajectory.
+    """
+    return {
+        "x_values": np.asarray(data.get("xvalues", []), dtype=float),
+        "y_values": np.asarray(data.get("yvalues", []), dtype=float),
+        "solution": data["solutions"] if "solutions" in data else data.get("solution", ""),
+        "png": None,
+        "file_id": None
+    }
+
+
+def entry_size(entry):
+    return (
+        entry["x_values"].nbytes
+        + entry["y_values"].nbytes
+        + len(entry["png"] or b"")
+    )
+
+
+class SolutionCache:
+    """
+    Two-tier cache of completed solutions.
+    Entries are dicts with the decoded x_values/y_values arrays, the solution,
+    the rendered png and the Telegram file_id of the uploaded plot.
+    Completed results never change, so entries are never invalidated, only evicted.
+    """
+
+    def __init__(self, memory_budget, disk_dir, disk_budget):
+        self.memory_budget = memory_budget
+        self.disk_dir = Path(disk_dir)
+        self.disk_budget = disk_budget
+
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+        self._entries = OrderedDict()
+        self._memory_size = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        digest = hashlib.sha256(str(key).encode("utf-8")).hexdigest()
+        return self.disk_dir / f"{digest}.npz"
+
+    def _remember(self, key, entry):
+        # Sizes are stored, because entries are updated in place with the png and file_id
+        if key in self._entries:
+            _, size = self._entries.pop(key)
+            self._memory_size -= size
+
+        size = entry_size(entry)
+        if size > self.memory_budget:
+            return
+
+        self._entries[key] = (entry, size)
+        self._memory_size += size
+
+        while self._memory_size > self.memory_budget:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._memory_size -= evicted_size
+
+    def _read(self, key):
+        path = self._path(key)
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                entry = {
+                    "x_values": data["x_values"],
+                    "y_values": data["y_values"],
+                    "solution": data["solution"].tolist(),
+                    "png": data["png"].tobytes() or None,
+                    "file_id": str(data["file_id"]) or None
+                }
+            os.utime(path)
+            return entry
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Dropping unreadable cache file %s: %s", path, e)
+            path.unlink(missing_ok=True)
+            return None
+
+    def _write(self, key, entry):
+        path = self._path(key)
+        temp_path = path.with_suffix(".tmp")
+
+        with open(temp_path, "wb") as file:
+            np.savez(
+                file,
+                x_values=entry["x_values"],
+                y_values=entry["y_values"],
+                solution=np.asarray(entry["solution"], dtype=float),
+                png=np.frombuffer(entry["png"] or b"", dtype=np.uint8),
+                file_id=np.asarray(entry["file_id"] or "")
+            )
+        os.replace(temp_path, path)
+
+        self._evict_disk()
+
+    def _evict_disk(self):
+        files = sorted(
+            (file for file in os.scandir(self.disk_dir) if file.name.endswith(".npz")),
+            key=lambda file: file.stat().st_mtime
+        )
+        total = sum(file.stat().st_size for file in files)
+
+        for file in files:
+            if total <= self.disk_budget:
+                break
+            total -= file.stat().st_size
+            try:
+                os.unlink(file.path)
+            except FileNotFoundError:
+                pass
+
+    async def get(self, key):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+        entry = await asyncio.to_thread(self._read, key)
+        if entry is not None:
+            self._remember(key, entry)
+            self.disk_hits += 1
+            return entry
+
+        self.misses += 1
+        return None
+
+    async def put(self, key, entry):
+        self._remember(key, entry)
+
+        try:
+            await asyncio.to_thread(self._write, key, entry)
+        except (OSError, ValueError) as e:
+            logger.warning("Error while writing cache entry %s: %s", key, e)
+
+
+def get_solution_cache():
+    global _solution_cache
+
+    if _solution_cache is None:
+        _solution_cache = SolutionCache(
+            memory_budget=int(os.getenv("SOLUTION_CACHE_MEMORY_BUDGET", DEFAULT_MEMORY_BUDGET)),
+            disk_dir=os.getenv("SOLUTION_CACHE_DIR", DEFAULT_CACHE_DIR),
+            disk_budget=int(os.getenv("SOLUTION_CACHE_DISK_BUDGET", DEFAULT_DISK_BUDGET))
+        )
+
+    return _solution_cache
@@ -0,0 +1,87 @@
+import asyncio
+import os
+
+from collections import deque
+from contextlib import asynccontextmanager, nullcontext
+
+from logger import logger
+
+DEFAULT_MAX_CONCURRENT_SOLVES = 8
+
+_solve_queue = None
+
+
+class SolveQueue:
+    """
+    Bounds the number of solves in flight.
+    Solves over capacity wait in arrival order and learn their position in the queue.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._active = 0
+        self._waiters = deque()
+
+    @property
+    def active(self):
+        return self._active
+
+    @property
+    def waiting(self):
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def slot(self, on_queued=None, while_queued=None):
+        """
+        Holds a solve slot for the body of the block and yields whether the solve had to wait.
+        If no slot is free, on_queued is awaited with the 1-based position in the queue first.
+        while_queued returns an async context manager the wait in the queue runs in.
+        """
+        queued = not (self._active < self.capacity and not self._waiters)
+
+        if not queued:
+            self._active += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+
+            try:
+                async with while_queued() if while_queued is not None else nullcontext():
+                    if on_queued is not None:
+                        try:
+                            await on_queued(len(self._waiters))
+                        except Exception as e:
+                            logger.warning("Error while reporting the queue position: %s", e)
+
+                    await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # The slot was handed over just before the cancellation
+                    self._release()
+                elif waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                raise
+
+        try:
+            yield queued
+        finally:
+            self._release()
+
+    def _release(self):
+        # A freed slot goes straight to the next waiter, so nobody can overtake the queue
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+        self._active -= 1
+
+
+def get_solve_queue():
+    global _solve_queue
+
+    if _solve_queue is None:
+        _solve_queue = SolveQueue(int(os.getenv("MAX_CONCURRENT_SOLVES", DEFAULT_MAX_CONCURRENT_SOLVES)))
+
+    return _solve_queue
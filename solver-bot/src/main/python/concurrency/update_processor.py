@@ -0,0 +1,117 @@
+import asyncio
+import sys
+
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+DEFAULT_MAX_CONCURRENT_UPDATES = 64
+
+# PTB takes its own semaphore before do_process_update, where an update may still wait
+# for the lock of its user, so that one is left unbounded and the limit applied after the lock
+UNBOUNDED_UPDATES = sys.maxsize
+
+# Processing slot of the update the current task processes
+_current_slot = ContextVar("current_slot", default=None)
+
+
+class _Slot:
+    __slots__ = ("semaphore", "held")
+
+    def __init__(self, semaphore):
+        self.semaphore = semaphore
+        self.held = False
+
+
+@asynccontextmanager
+async def released_update_slot():
+    """
+    Gives the processing slot of the current update up for the block and takes it again after,
+    for long waits such as the solve queue that should not stall the updates of other users.
+    Does nothing outside of an update processed by PerUserUpdateProcessor.
+    """
+    slot = _current_slot.get()
+    if slot is None or not slot.held:
+        yield
+        return
+
+    slot.held = False
+    slot.semaphore.release()
+
+    try:
+        yield
+    finally:
+        await slot.semaphore.acquire()
+        slot.held = True
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Processes updates of different users concurrently,
+    while the updates of one user are processed one by one in arrival order,
+    as the ConversationHandler state machine expects.
+    At most processing_limit updates are processed at once, updates waiting
+    for their user do not take a slot, so one busy user can not stall the other chats.
+    current_concurrent_updates counts the waiting updates as well.
+    Handlers give their slot up with released_update_slot while they wait for long.
+    """
+
+    def __init__(self, max_concurrent_updates=DEFAULT_MAX_CONCURRENT_UPDATES):
+        if max_concurrent_updates < 1:
+            raise ValueError("max_concurrent_updates must be a positive integer")
+
+        super().__init__(UNBOUNDED_UPDATES)
+        self.processing_limit = max_concurrent_updates
+        self._slots = asyncio.BoundedSemaphore(max_concurrent_updates)
+        # key -> [lock, number of updates holding or waiting for it]
+        self._locks = {}
+
+    async def _process(self, coroutine):
+        slot = _Slot(self._slots)
+        token = _current_slot.set(slot)
+
+        try:
+            await self._slots.acquire()
+            slot.held = True
+            await coroutine
+        finally:
+            if slot.held:
+                slot.held = False
+                self._slots.release()
+            _current_slot.reset(token)
+
+    @staticmethod
+    def _key(update):
+        if not isinstance(update, Update):
+            return None
+        if update.effective_user is not None:
+            return "user", update.effective_user.id
+        if update.effective_chat is not None:
+            return "chat", update.effective_chat.id
+        return None
+
+    async def do_process_update(self, update, coroutine):
+        key = self._key(update)
+
+        if key is None:
+            await self._process(coroutine)
+            return
+
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+
+        try:
+            async with entry[0]:
+                await self._process(coroutine)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
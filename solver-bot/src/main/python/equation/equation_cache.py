@@ -0,0 +1,98 @@
+import os
+import sqlite3
+
+from pathlib import Path
+
+from logger import logger
+
+_store = None
+_store_loaded = False
+
+stats = {
+    "persistent_hits": 0,
+    "persistent_misses": 0
+}
+
+
+class EquationStore:
+    """
+    Persistent tier of the format_equation memoization,
+    maps a normalized equation to its (formatted, order) result.
+    """
+
+    def __init__(self, path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS equations (
+                equation TEXT PRIMARY KEY,
+                formatted TEXT,
+                equation_order INTEGER
+            )
+            """
+        )
+        self.connection.commit()
+
+    def get(self, equation):
+        row = self.connection.execute(
+            "SELECT formatted, equation_order FROM equations WHERE equation = ?",
+            (equation,)
+        ).fetchone()
+        return tuple(row) if row is not None else None
+
+    def put(self, equation, result):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO equations (equation, formatted, equation_order) VALUES (?, ?, ?)",
+            (equation, *result)
+        )
+        self.connection.commit()
+
+
+def get_store():
+    """
+    Returns the persistent store,
+    or None if EQUATION_CACHE_PATH is not set.
+    """
+    global _store, _store_loaded
+
+    if not _store_loaded:
+        _store_loaded = True
+        path = os.getenv("EQUATION_CACHE_PATH")
+        if path:
+            try:
+                _store = EquationStore(path)
+            except sqlite3.Error as e:
+                logger.warning("Equation cache %s is unavailable: %s", path, e)
+
+    return _store
+
+
+def lookup(equation):
+    store = get_store()
+    if store is None:
+        return None
+
+    try:
+        result = store.get(equation)
+    except sqlite3.Error as e:
+        logger.warning("Error while reading equation cache: %s", e)
+        return None
+
+    if result is None:
+        stats["persistent_misses"] += 1
+    else:
+        stats["persistent_hits"] += 1
+
+    return result
+
+
+def remember(equation, result):
+    store = get_store()
+    if store is None:
+        return
+
+    try:
+        store.put(equation, result)
+    except sqlite3.Error as e:
+        logger.warning("Error while writing equation cache: %s", e)
@@ -1,7 +1,14 @@
 import re
-import sympy as sp
 
+from functools import lru_cache
+
+from equation import equation_cache
 from equation.function_replacer import replace_math_functions
+from lazy_imports import lazy_import
+
+sp = lazy_import("sympy")
+
+EQUATION_CACHE_SIZE = 512
 
 def get_equation_order(eq):
     derivatives = list(eq.lhs.atoms(sp.Derivative))
@@ -27,11 +34,15 @@ def convert_to_first_order(eq, y, x):
     return last_equation, order
 
 
+def normalize_equation(eq):
+    return eq.lower().replace(" ", "").replace("`", "'").replace("’", "'")
+
+
 def parse_equation(eq):
     x = sp.Symbol('x')
     y = sp.Function('y')(x)
 
-    eq = eq.replace(" ", "").replace("`", "'").replace("’", "'")
+    eq = normalize_equation(eq)
     eq = re.sub(r"y\^\((\d+)\)", lambda m: "y" + "'" * int(m.group(1)), eq)
     eq = re.sub(r"y'{3,}", lambda m: f"Derivative(y, x, {len(m.group(0)) - 1})", eq)
     eq = re.sub(r"y''", "Derivative(y, x, 2)", eq)
@@ -48,12 +59,40 @@ def parse_equation(eq):
     return sp.Eq(lhs_expr, rhs_expr), y, x
 
 
-def format_equation(eq):
+def convert_equation(eq):
     try:
-        equation, y, x = parse_equation(eq.lower())
+        equation, y, x = parse_equation(eq)
         last_equation, order = convert_to_first_order(equation, y, x)
         rhs_str = str(last_equation.rhs).replace("**", "^")
         rhs_str = replace_math_functions(rhs_str)
-        return rhs_str, order
+        return rhs_str, int(order)
     except (sp.SympifyError, TypeError, AttributeError, ValueError):
         return None, None
+
+
+@lru_cache(maxsize=EQUATION_CACHE_SIZE)
+def format_normalized_equation(eq):
+    result = equation_cache.lookup(eq)
+    if result is None:
+        result = convert_equation(eq)
+        equation_cache.remember(eq, result)
+    return result
+
+
+def format_equation(eq):
+    """
+    Returns the right-hand side of the equivalent first-order system and the order,
+    memoized on the normalized equation.
+    """
+    return format_normalized_equation(normalize_equation(eq))
+
+
+def format_equation_cache_info():
+    info = format_normalized_equation.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+        **equation_cache.stats
+    }
@@ -1,13 +1,6 @@
 import re
-import json
 
-from pathlib import Path
-
-PY_DIR = Path(__file__).parent
-functions_path = PY_DIR / "functions.json"
-
-with open(functions_path, "r", encoding="utf-8") as f:
-    MATH_FUNCTIONS = json.load(f)
+from equation.functions import MATH_FUNCTIONS
 
 
 def validate_symbols(equation):
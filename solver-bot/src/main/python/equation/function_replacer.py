@@ -1,13 +1,53 @@
-import re
-import json
+from equation.functions import (
+    MATH_FUNCTIONS,
+    ARGUMENT_TEMPLATES,
+    FUNCTION_PATTERN)
 
-from pathlib import Path
 
-PY_DIR = Path(__file__).parent
-functions_path = PY_DIR / "functions.json"
+def find_closing_parenthesis(equation, start, end):
+    depth = 0
+    for i in range(start, end):
+        if equation[i] == '(':
+            depth += 1
+        elif equation[i] == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
 
-with open(functions_path, "r", encoding="utf-8") as f:
-    MATH_FUNCTIONS = json.load(f)
+
+def rewrite(equation, start, end):
+    parts = []
+    position = start
+
+    while True:
+        match = FUNCTION_PATTERN.search(equation, position, end)
+        if match is None:
+            break
+
+        parts.append(equation[position:match.start()])
+        name = match.group()
+        position = match.end()
+
+        template = ARGUMENT_TEMPLATES.get(name)
+        if template is None:
+            parts.append(MATH_FUNCTIONS[name])
+            continue
+
+        closing = -1
+        if position < end and equation[position] == '(':
+            closing = find_closing_parenthesis(equation, position, end)
+
+        if closing == -1:
+            parts.append(name)
+            continue
+
+        parts.append(template.format(rewrite(equation, position + 1, closing)))
+        position = closing + 1
+
+    parts.append(equation[position:end])
+
+    return "".join(parts)
 
 
 def replace_math_functions(equation):
@@ -15,19 +55,7 @@ def replace_math_functions(equation):
     The function accepts an equation
     and checks if there are trigonometric functions there,
     if there are, it converts them.
+    All names are rewritten in a single pass,
+    arguments of coth and acot may contain nested parentheses.
     """
-    for func, replacement in MATH_FUNCTIONS.items():
-        if func in ['coth', 'cth']:
-            equation = re.sub(rf'\b{func}\((.*?)\)',
-                              r'(cosh(\1) / sinh(\1))',
-                              equation)
-        elif func in ['acot', 'actg', 'arccot', 'arcctg']:
-            equation = re.sub(rf'\b{func}\((.*?)\)',
-                              r'(atan(1 / \1))',
-                              equation)
-        else:
-            equation = re.sub(rf'\b{func}\b',
-                              f'{replacement}',
-                              equation)
-
-    return equation
+    return rewrite(equation, 0, len(equation))
@@ -0,0 +1,34 @@
+import re
+import json
+
+from pathlib import Path
+
+PY_DIR = Path(__file__).parent
+functions_path = PY_DIR / "functions.json"
+
+with open(functions_path, "r", encoding="utf-8") as f:
+    MATH_FUNCTIONS = json.load(f)
+
+
+def create_argument_template(replacement):
+    """
+    Turns a replacement written in terms of x, e.g. "atan(1 / x)",
+    into a format string that takes the function argument.
+    """
+    template = replacement.replace("(x)", "({0})")
+    template = re.sub(r"\bx\b", "({0})", template)
+    return f"({template})"
+
+
+# Functions whose replacement depends on the argument, e.g. coth(a) -> (cosh(a) / sinh(a))
+ARGUMENT_TEMPLATES = {
+    name: create_argument_template(replacement)
+    for name, replacement in MATH_FUNCTIONS.items()
+    if re.search(r"\bx\b", replacement)
+}
+
+FUNCTION_PATTERN = re.compile(
+    r"\b(?:" +
+    "|".join(re.escape(name) for name in sorted(MATH_FUNCTIONS, key=len, reverse=True)) +
+    r")\b"
+)
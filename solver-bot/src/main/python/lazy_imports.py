@@ -0,0 +1,29 @@
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """
+    Returns the module without executing it,
+    it is loaded on first attribute access.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    return module
+
+
+def preload(*names):
+    """
+    Forces lazily imported modules to load, meant to run in a background thread.
+    """
+    for name in names:
+        getattr(lazy_import(name), "__name__")
@@ -0,0 +1,60 @@
+from caching.history_cache import get_history_cache
+from caching.settings_cache import get_settings_cache
+from caching.solution_cache import get_solution_cache
+from concurrency.solve_queue import get_solve_queue
+from equation.equation_parser import format_equation_cache_info
+from monitoring.metrics import CallbackMetric
+from spring_client import connection_stats
+
+_registered = False
+
+
+def cache_counts(attribute):
+    counts = {
+        ("solution",): getattr(get_solution_cache(), attribute),
+        ("history",): getattr(get_history_cache(), attribute),
+    }
+
+    # Only exists between post_init and post_shutdown
+    settings_cache = get_settings_cache()
+    if settings_cache is not None:
+        counts[("settings",)] = getattr(settings_cache, attribute)
+
+    # Equations found in the persistent tier missed the memory one
+    equation_cache = format_equation_cache_info()
+    if attribute == "hits":
+        counts[("solution",)] += get_solution_cache().disk_hits
+        counts[("equation",)] = equation_cache["hits"] + equation_cache["persistent_hits"]
+    else:
+        counts[("equation",)] = equation_cache["misses"] - equation_cache["persistent_hits"]
+
+    return counts
+
+
+def register_collectors():
+    """
+    Exposes the counters the caches, the solve queue and the backend session already keep.
+    The metrics are registered once per process, however many applications are built.
+    """
+    global _registered
+
+    if _registered:
+        return
+    _registered = True
+
+    CallbackMetric(
+        "solver_bot_cache_hits_total", "Cache hits", "counter", ("cache",),
+        lambda: cache_counts("hits")
+    )
+    CallbackMetric(
+        "solver_bot_cache_misses_total", "Cache misses", "counter", ("cache",),
+        lambda: cache_counts("misses")
+    )
+    CallbackMetric(
+        "solver_bot_solve_slots", "Solves holding or waiting for a solve queue slot", "gauge", ("state",),
+        lambda: {("active",): get_solve_queue().active, ("waiting",): get_solve_queue().waiting}
+    )
+    CallbackMetric(
+        "solver_bot_backend_connections_total", "Backend connection pool events", "counter", ("event",),
+        lambda: {(event,): count for event, count in connection_stats.items()}
+    )
@@ -0,0 +1,236 @@
+import bisect
+import math
+import os
+import time
+
+from contextlib import contextmanager
+
+from aiohttp import web
+
+from logger import logger
+
+DEFAULT_METRICS_HOST = "127.0.0.1"
+DEFAULT_METRICS_PORT = 9100
+
+# Seconds, from a cache lookup to a solve that waits for the backend
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_registry = []
+_runner = None
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class Metric:
+    """
+    Base of the metrics, keeps one child per combination of label values,
+    created by child_factory.
+    Children are plain objects updated without locks,
+    as everything runs on the event loop of the bot.
+    Metrics without a child_factory provide their own samples.
+    """
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), child_factory=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._child_factory = child_factory
+        self._children = {}
+
+        # Metrics without labels are exported from the start
+        if not self.labelnames and child_factory is not None:
+            self.labels()
+
+        _registry.append(self)
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            if self._child_factory is None:
+                raise TypeError(f"{self.name} has no children to update")
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children[values] = self._child_factory()
+        return child
+
+    def samples(self):
+        for values, child in self._children.items():
+            for suffix, extra_labels, value in child.samples():
+                yield suffix, tuple(zip(self.labelnames, values)) + extra_labels, value
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}"
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def samples(self):
+        yield "", (), self.value
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # Not cumulative, the last count is for the +Inf bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def samples(self):
+        total = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            total += count
+            yield "_bucket", (("le", _format_value(bound)),), total
+        yield "_sum", (), self.sum
+        yield "_count", (), total
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames, _CounterChild)
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames, _GaugeChild)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, lambda: _HistogramChild(self.buckets))
+
+
+class CallbackMetric(Metric):
+    """
+    Reads its values when scraped, for the counters the bot already keeps.
+    The callback returns a dict of label values tuples to values.
+    """
+
+    def __init__(self, name, documentation, type, labelnames, callback):
+        self.type = type
+        self.callback = callback
+        super().__init__(name, documentation, labelnames)
+
+    def samples(self):
+        for values, value in self.callback().items():
+            yield "", tuple(zip(self.labelnames, values)), value
+
+
+STAGE_DURATION = Histogram(
+    "solver_bot_stage_duration_seconds",
+    "Duration of the stages of a solve",
+    ("stage",)
+)
+ERRORS = Counter("solver_bot_errors_total", "Failed stages of a solve", ("stage",))
+BACKEND_RETRIES = Counter("solver_bot_backend_retries_total", "Retried backend requests")
+SOLVES_IN_FLIGHT = Gauge("solver_bot_solves_in_flight", "Solves being processed or waiting for a slot")
+# The rejection rate is rejected over all results
+PREFLIGHT_CHECKS = Counter(
+    "solver_bot_preflight_checks_total",
+    "Equations evaluated before submission, by passed, rejected or skipped",
+    ("result",)
+)
+PREFLIGHT_REJECTIONS = Counter(
+    "solver_bot_preflight_rejections_total",
+    "Equations rejected before submission",
+    ("reason",)
+)
+
+
+def render():
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+async def handle_metrics(request):
+    return web.Response(
+        body=render().encode("utf-8"),
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+    )
+
+
+async def start_metrics_server():
+    """Serves /metrics in the Prometheus text format, disabled with METRICS_PORT=0."""
+    global _runner
+
+    port = int(os.getenv("METRICS_PORT", DEFAULT_METRICS_PORT))
+    if port == 0:
+        return
+
+    host = os.getenv("METRICS_HOST", DEFAULT_METRICS_HOST)
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+
+    _runner = web.AppRunner(app, access_log=None)
+    await _runner.setup()
+    await web.TCPSite(_runner, host, port).start()
+
+    logger.info(f"Serving metrics on {host}:{port}/metrics")
+
+
+async def stop_metrics_server():
+    global _runner
+
+    if _runner is not None:
+        await _runner.cleanup()
+
+    _runner = None
@@ -0,0 +1,132 @@
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+# The plot is 2000px wide, a min and a max per pixel column keeps every visible peak
+DEFAULT_MAX_POINTS = 4000
+
+
+def decimate(x_values, y_values, max_points=DEFAULT_MAX_POINTS):
+    """
+    Reduces a curve to at most about max_points points
+    by keeping the minimum and the maximum of each equal-size bucket,
+    so that peaks and oscillations survive. The first and the last point are always kept.
+    """
+    size = len(x_values)
+
+    if max_points is None or size <= max_points:
+        return x_values, y_values
+
+    bucket_size = -(-size // (max_points // 2))
+    buckets = -(-size // bucket_size)
+
+    padded = np.pad(y_values, (0, buckets * bucket_size - size), mode="edge")
+    padded = padded.reshape(buckets, bucket_size)
+
+    offsets = np.arange(buckets) * bucket_size
+
+    indices = np.concatenate((
+        [0],
+        offsets + padded.argmin(axis=1),
+        offsets + padded.argmax(axis=1),
+        [size - 1]
+    ))
+    indices = np.unique(np.minimum(indices, size - 1))
+
+    return x_values[indices], y_values[indices]
+
+
+def bucket_size(size, max_points=DEFAULT_MAX_POINTS):
+    if max_points is None or size <= max_points:
+        return 1
+    return -(-size // (max_points // 2))
+
+
+class StreamingDecimator:
+    """
+    Decimates rows that arrive in chunks the same way as decimate,
+    but for all key columns at once: for every bucket it keeps the whole row
+    at the minimum and at the maximum of each key column, plus the first and the last row.
+    Its arrays are preallocated from the total number of rows, so memory depends
+    on max_points and the number of columns, not on the number of rows.
+    """
+
+    def __init__(self, size, columns, keys=None, max_points=DEFAULT_MAX_POINTS):
+        self.size = size
+        self.columns = columns
+        self.keys = list(range(columns)) if keys is None else list(keys)
+        self.bucket_size = bucket_size(size, max_points)
+
+        buckets = -(-size // self.bucket_size)
+        candidates = 2 * len(self.keys)
+
+        self._min = np.full((buckets, len(self.keys)), np.inf)
+        self._max = np.full((buckets, len(self.keys)), -np.inf)
+        self._indices = np.full((buckets, candidates), -1, dtype=np.int64)
+        self._rows = np.empty((buckets, candidates, 1 + columns))
+
+        self._first = None
+        self._last = None
+        self._count = 0
+
+    def update(self, x_chunk, y_chunk):
+        x_chunk = np.asarray(x_chunk, dtype=float)
+        y_chunk = np.asarray(y_chunk, dtype=float).reshape(len(x_chunk), self.columns)
+
+        if not len(x_chunk):
+            return
+
+        rows = np.column_stack((x_chunk, y_chunk))
+        indices = self._count + np.arange(len(x_chunk))
+        buckets = indices // self.bucket_size
+
+        # Chunks do not have to be aligned to buckets, every run of one bucket is a segment
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        segment_buckets = buckets[starts]
+        lengths = np.diff(np.r_[starts, len(x_chunk)])
+
+        for key_number, key in enumerate(self.keys):
+            column = y_chunk[:, key]
+            candidates = (
+                (np.where(np.isnan(column), np.inf, column), np.minimum, np.less, self._min, key_number),
+                (np.where(np.isnan(column), -np.inf, column), np.maximum, np.greater, self._max,
+                 len(self.keys) + key_number)
+            )
+
+            for values, reduce, better, best, slot in candidates:
+                extremes = reduce.reduceat(values, starts)
+                # The first row of each segment equal to its extreme, like argmin and argmax
+                matches = np.flatnonzero(values == np.repeat(extremes, lengths))
+                positions = matches[np.searchsorted(matches, starts)]
+
+                improved = (
+                    better(extremes, best[segment_buckets, key_number])
+                    | (self._indices[segment_buckets, slot] < 0)
+                )
+
+                targets = segment_buckets[improved]
+                best[targets, key_number] = extremes[improved]
+                self._indices[targets, slot] = indices[positions[improved]]
+                self._rows[targets, slot] = rows[positions[improved]]
+
+        if self._first is None:
+            self._first = rows[0].copy()
+        self._last = rows[-1].copy()
+        self._count += len(x_chunk)
+
+    def result(self):
+        """
+        Returns the kept x values and rows of y values ordered by their position.
+        """
+        if self._first is None:
+            return np.empty(0), np.empty((0, self.columns))
+
+        filled = self._indices >= 0
+
+        indices = np.concatenate(([0], self._indices[filled], [self._count - 1]))
+        rows = np.concatenate(([self._first], self._rows[filled], [self._last]))
+
+        _, unique = np.unique(indices, return_index=True)
+        rows = rows[unique]
+
+        return rows[:, 0], rows[:, 1:]
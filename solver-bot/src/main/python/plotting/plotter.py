@@ -1,26 +1,65 @@
 import io
-import matplotlib.pyplot as plt
+import numpy as np
 
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from plotting.decimation import DEFAULT_MAX_POINTS, decimate
 from printing.printer import get_variable_name
 
-def plot_solution(x_values, y_values, order):
-    plt.clf()
+def plot_solution(x_values, y_values, order, max_points=DEFAULT_MAX_POINTS):
+    x_values = np.asarray(x_values, dtype=float)
+    y_values = np.asarray(y_values, dtype=float).reshape(-1, order)
+
+    figure = Figure(figsize=(10, 6), dpi=200)
+    FigureCanvasAgg(figure)
 
-    plt.figure(figsize=(10, 6), dpi=200)
+    axes = figure.subplots()
 
-    plt.grid(True)
+    axes.grid(True)
 
     variable_names = ["y"] + [get_variable_name(i) for i in range(1, order)]
 
-    plt.plot(x_values, y_values, label=variable_names)
+    for column, variable_name in zip(y_values.T, variable_names):
+        axes.plot(*decimate(x_values, column, max_points), label=variable_name)
+
+    axes.legend()
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png', bbox_inches="tight")
+
+    return buffer.getvalue()
+
+
+def plot_sweep(x_values, y_values, order, labels, max_points=DEFAULT_MAX_POINTS):
+    """
+    Overlays y of every trajectory of a sweep in one plot,
+    y_values holds one (steps, order) array per trajectory.
+    """
+    x_values = np.asarray(x_values, dtype=float)
+    y_values = np.asarray(y_values, dtype=float).reshape(len(labels), -1, order)
+
+    figure = Figure(figsize=(10, 6), dpi=200)
+    FigureCanvasAgg(figure)
+
+    axes = figure.subplots()
+
+    axes.grid(True)
+
+    for trajectory, label in zip(y_values, labels):
+        axes.plot(*decimate(x_values, trajectory[:, 0], max_points), label=label)
 
-    plt.legend()
+    axes.legend(title="y₀", fontsize="small")
 
     buffer = io.BytesIO()
-    plt.savefig(buffer, format='png', bbox_inches="tight")
+    figure.savefig(buffer, format='png', bbox_inches="tight")
 
-    plt.close()
+    return buffer.getvalue()
 
-    buffer.seek(0)
 
-    return buffer
+def warm_up():
+    """
+    Renders a tiny figure so that a fresh worker process
+    loads matplotlib and its font cache before the first real plot.
+    """
+    plot_solution([0, 1], [[0], [1]], 1)
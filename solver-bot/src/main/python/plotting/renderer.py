@@ -0,0 +1,133 @@
+import asyncio
+import multiprocessing
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from logger import logger
+
+DEFAULT_RENDER_WORKERS = 2
+DEFAULT_RENDER_QUEUE_SIZE = 8
+DEFAULT_RENDER_TIMEOUT = 30
+
+_executor = None
+_max_pending = 0
+_pending = 0
+
+
+class RenderError(Exception):
+    pass
+
+
+# Worker entry points import the plotter themselves,
+# so the bot process never loads matplotlib
+def _warm_up():
+    from plotting.plotter import warm_up
+    warm_up()
+
+
+def _plot_solution(x_values, y_values, order):
+    from plotting.plotter import plot_solution
+    return plot_solution(x_values, y_values, order)
+
+
+def _plot_sweep(x_values, y_values, order, labels):
+    from plotting.plotter import plot_sweep
+    return plot_sweep(x_values, y_values, order, labels)
+
+
+def _create_executor():
+    global _max_pending
+
+    workers = int(os.getenv("PLOT_RENDER_WORKERS", DEFAULT_RENDER_WORKERS))
+    queue_size = int(os.getenv("PLOT_RENDER_QUEUE_SIZE", DEFAULT_RENDER_QUEUE_SIZE))
+
+    _max_pending = workers + queue_size
+
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_up
+    )
+
+    # Submitting one no-op per worker spawns the whole pool up front
+    for _ in range(workers):
+        executor.submit(int)
+
+    return executor
+
+
+def get_executor():
+    global _executor
+
+    if _executor is None:
+        _executor = _create_executor()
+
+    return _executor
+
+
+def init_renderer():
+    get_executor()
+    logger.info("Plot renderer started with %s pending renders allowed", _max_pending)
+
+
+def close_renderer():
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+
+    _executor = None
+
+    logger.info("Plot renderer stopped")
+
+
+def _release(future):
+    global _pending
+    _pending -= 1
+
+
+async def render_plot(x_values, y_values, order):
+    """
+    Renders the solution plot in a worker process and returns PNG bytes.
+    Raises RenderError if the queue is full, the render times out or fails.
+    """
+    return await _render(_plot_solution, x_values, y_values, order)
+
+
+async def render_sweep_plot(x_values, y_values, order, labels):
+    """
+    Renders the overlaid plot of a sweep, see render_plot.
+    """
+    return await _render(_plot_sweep, x_values, y_values, order, labels)
+
+
+async def _render(function, *args):
+    global _pending
+
+    executor = get_executor()
+
+    if _pending >= _max_pending:
+        raise RenderError(f"Render queue is full ({_pending} pending)")
+
+    try:
+        future = asyncio.wrap_future(executor.submit(function, *args))
+    except BrokenProcessPool as e:
+        logger.error("Plot renderer pool is broken, restarting it")
+        close_renderer()
+        raise RenderError("Render pool is broken") from e
+
+    _pending += 1
+    # A timed out render keeps its worker busy, so it is released only when it really finishes
+    future.add_done_callback(_release)
+
+    try:
+        return await asyncio.wait_for(
+            asyncio.shield(future),
+            float(os.getenv("PLOT_RENDER_TIMEOUT", DEFAULT_RENDER_TIMEOUT))
+        )
+    except asyncio.TimeoutError as e:
+        raise RenderError("Render timed out") from e
+    except Exception as e:
+        raise RenderError(f"Render failed: {e}") from e
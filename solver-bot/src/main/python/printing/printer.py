@@ -25,3 +25,7 @@ def print_solution(result, order, rounding):
     variables_str = ", ".join(f"{name}: {val}" for name, val in zip(variable_names, values))
 
     return f"x: {formatted_x}, {variables_str}"
+
+
+def print_solutions(results, order, rounding):
+    return "\n".join(print_solution(result, order, rounding) for result in results)
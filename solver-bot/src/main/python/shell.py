@@ -1,19 +1,54 @@
+import asyncio
+import functools
 import json
 import os
 import telegram
 from pathlib import Path
 
 from logger import logger
-from plotting.plotter import plot_solution
-from printing.printer import print_solution
+from lazy_imports import preload
+from plotting.renderer import (
+    RenderError,
+    render_plot,
+    render_sweep_plot,
+    init_renderer,
+    close_renderer)
+from printing.printer import print_solution, print_solutions
+from caching.history_cache import get_history_cache
+from caching.settings_cache import close_settings_cache, get_settings_cache, init_settings_cache
+from caching.solution_cache import (
+    create_entry,
+    get_solution_cache)
 from spring_client import (
+    record_solution,
     set_parameters,
-    set_user_settings,
-    get_user_settings,
-    get_recent_applications,
+    set_sweep_parameters,
     get_results,
-    wait_for_application_completion)
+    get_trajectory_header,
+    stream_trajectory,
+    wait_for_application_completion,
+    init_session,
+    close_session)
 from equation.equation_parser import format_equation
+from solver.local_solver import try_solve_locally
+from solver.preflight import PreflightRejection, check_equation
+from concurrency.solve_queue import get_solve_queue
+from concurrency.update_processor import (
+    DEFAULT_MAX_CONCURRENT_UPDATES,
+    PerUserUpdateProcessor,
+    released_update_slot)
+from solver.sweep import DEFAULT_SWEEP_MAX_TRAJECTORIES, parse_initial_conditions
+from plotting.decimation import StreamingDecimator
+from monitoring.collectors import register_collectors
+from monitoring.metrics import (
+    ERRORS,
+    PREFLIGHT_CHECKS,
+    PREFLIGHT_REJECTIONS,
+    SOLVES_IN_FLIGHT,
+    STAGE_DURATION,
+    start_metrics_server,
+    stop_metrics_server)
+from webhook.server import measure_latency, run_webhook
 from equation.equation_validator import (
     validate_symbols,
     validate_parentheses)
@@ -30,6 +65,7 @@ from telegram.ext import (
     ContextTypes,
     ConversationHandler,
     MessageHandler,
+    TypeHandler,
     filters
 )
 
@@ -52,26 +88,12 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.edited_message:
         return MENU
 
-    user_settings = await get_user_settings(
-        update.effective_user.id,
-        DEFAULT_METHOD,
-        DEFAULT_ROUNDING,
-        DEFAULT_LANGUAGE,
-        DEFAULT_HINTS
-    )
+    user_settings = await get_settings_cache().get(update.effective_user.id)
 
-    context.user_data['method'] = user_settings.get('method', DEFAULT_METHOD)
-    context.user_data['rounding'] = user_settings.get('rounding', DEFAULT_ROUNDING)
-    context.user_data['language'] = user_settings.get('language', DEFAULT_LANGUAGE)
-    context.user_data['hints'] = user_settings.get('hints', DEFAULT_HINTS)
-
-    await set_user_settings(
-        update.effective_user.id,
-        context.user_data['method'],
-        context.user_data['rounding'],
-        context.user_data['language'],
-        context.user_data['hints']
-    )
+    context.user_data['method'] = user_settings['method']
+    context.user_data['rounding'] = user_settings['rounding']
+    context.user_data['language'] = user_settings['language']
+    context.user_data['hints'] = user_settings['hints']
 
     current_state = context.user_data.get("state", None)
     current_language = context.user_data.get('language', DEFAULT_LANGUAGE)
@@ -199,13 +221,7 @@ async def method(update: Update, context: ContextTypes.DEFAULT_TYPE):
     current_method = query.data
     context.user_data['method'] = current_method
 
-    await set_user_settings(
-        update.effective_user.id,
-        context.user_data['method'],
-        context.user_data['rounding'],
-        context.user_data['language'],
-        context.user_data['hints']
-    )
+    get_settings_cache().update(update.effective_user.id, context.user_data)
 
     await settings_method(update, context)
 
@@ -217,7 +233,7 @@ async def settings_method(update: Update, context: ContextTypes.DEFAULT_TYPE):
     current_language = context.user_data.get('language', DEFAULT_LANGUAGE)
     current_method = context.user_data.get('method', DEFAULT_METHOD)
 
-    methods = ["euler", "midpoint", "heun", "runge_kutta", "dormand_prince"]
+    methods = ["euler", "midpoint", "heun", "runge_kutta", "dormand_prince", "dormand_prince_adaptive"]
 
     numerical_texts = LANG_TEXTS[current_language]["numerical_methods"]
 
@@ -254,13 +270,7 @@ async def rounding(update: Update, context: ContextTypes.DEFAULT_TYPE):
     current_rounding = query.data
     context.user_data['rounding'] = current_rounding
 
-    await set_user_settings(
-        update.effective_user.id,
-        context.user_data['method'],
-        context.user_data['rounding'],
-        context.user_data['language'],
-        context.user_data['hints']
-    )
+    get_settings_cache().update(update.effective_user.id, context.user_data)
 
     await settings_rounding(update, context)
 
@@ -312,13 +322,7 @@ async def language(update: Update, context: ContextTypes.DEFAULT_TYPE):
     current_language = query.data
     context.user_data['language'] = current_language
 
-    await set_user_settings(
-        update.effective_user.id,
-        context.user_data['method'],
-        context.user_data['rounding'],
-        context.user_data['language'],
-        context.user_data['hints']
-    )
+    get_settings_cache().update(update.effective_user.id, context.user_data)
 
     await settings_language(update, context)
 
@@ -367,13 +371,7 @@ async def hints(update: Update, context: ContextTypes.DEFAULT_TYPE):
     current_hints = "false" if context.user_data.get('hints', DEFAULT_HINTS) == "true" else "true"
     context.user_data['hints'] = current_hints
 
-    await set_user_settings(
-        update.effective_user.id,
-        context.user_data['method'],
-        context.user_data['rounding'],
-        context.user_data['language'],
-        context.user_data['hints']
-    )
+    get_settings_cache().update(update.effective_user.id, context.user_data)
 
     return await settings(update, context)
 
@@ -384,7 +382,7 @@ async def solve_history(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     current_language = context.user_data.get('language', DEFAULT_LANGUAGE)
 
-    recent_applications = await get_recent_applications(update.effective_user.id)
+    recent_applications = await get_history_cache().get(update.effective_user.id)
 
     keyboard = []
 
@@ -432,7 +430,7 @@ async def solve_history_details(update: Update, context: ContextTypes.DEFAULT_TY
 
     application_index = int(query.data.split('_')[1])
 
-    recent_applications = await get_recent_applications(update.effective_user.id)
+    recent_applications = await get_history_cache().get(update.effective_user.id)
 
     if application_index >= len(recent_applications):
         await query.edit_message_text(
@@ -448,7 +446,10 @@ async def solve_history_details(update: Update, context: ContextTypes.DEFAULT_TY
 
     application = recent_applications[application_index]
     application_id = application.get('id')
-    results = await get_results(application_id)
+
+    solution_cache = get_solution_cache()
+    cached_solution = await solution_cache.get(application_id)
+    is_cached = cached_solution is not None
 
     try:
         parameters = json.loads(application.get("parameters", "{}"))
@@ -458,29 +459,43 @@ async def solve_history_details(update: Update, context: ContextTypes.DEFAULT_TY
         user_equation = parameters.get("userEquation", "")
         initial_x = parameters.get("initialX", "")
         initial_y = parameters.get("initialY", "")
+        initial_ys = parameters.get("initialYs")
         reach_point = parameters.get("reachPoint", "")
         step_size = parameters.get("stepSize", "")
 
-        data = json.loads(results[0].get("data", "{}"))
-        x_values = data.get("xvalues", [])
-        y_values = data.get("yvalues", [])
-        solution = data.get("solution", "")
+        # New and running applications have no results yet
+        if not is_cached:
+            cached_solution = create_entry(await get_results_data(application_id))
 
-        plot_graph = plot_solution(x_values, y_values, order)
+        x_values = cached_solution["x_values"]
+        y_values = cached_solution["y_values"]
+        solution = cached_solution["solution"]
+        file_id = cached_solution["file_id"]
 
-        if isinstance(initial_y, list):
+        if initial_ys is not None:
+            initial_y_str = "; ".join(sweep_labels(initial_ys))
+        elif isinstance(initial_y, list):
             initial_y_str = ", ".join([str(y) for y in initial_y])
         else:
             initial_y_str = str(initial_y)
 
+        if initial_ys is not None:
+            solution_str = print_solutions(solution, order, current_rounding)
+        else:
+            solution_str = print_solution(solution, order, current_rounding)
+
         method_mapping = {
             "euler": LANG_TEXTS[current_language]["numerical_methods"]["euler"],
             "midpoint": LANG_TEXTS[current_language]["numerical_methods"]["midpoint"],
             "heun": LANG_TEXTS[current_language]["numerical_methods"]["heun"],
             "rungeKutta": LANG_TEXTS[current_language]["numerical_methods"]["runge_kutta"],
-            "dormandPrince": LANG_TEXTS[current_language]["numerical_methods"]["dormand_prince"]
+            "dormandPrince": LANG_TEXTS[current_language]["numerical_methods"]["dormand_prince"],
+            "dormandPrinceAdaptive": LANG_TEXTS[current_language]["numerical_methods"]["dormand_prince_adaptive"]
         }
 
+        if method == "dormandPrince" and parameters.get("relativeTolerance") is not None:
+            method = "dormandPrinceAdaptive"
+
         method_display = method_mapping.get(method, method)
 
         details_text = (
@@ -491,7 +506,7 @@ async def solve_history_details(update: Update, context: ContextTypes.DEFAULT_TY
             f"<b>{LANG_TEXTS[current_language]['reach_point']}:</b> {reach_point}\n"
             f"<b>{LANG_TEXTS[current_language]['step_size']}:</b> {step_size}\n\n"
             f"<b>{LANG_TEXTS[current_language]['solution']}:</b>\n"
-            f"{print_solution(solution, order, current_rounding)}"
+            f"{solution_str}"
         )
 
         keyboard = [[
@@ -501,30 +516,77 @@ async def solve_history_details(update: Update, context: ContextTypes.DEFAULT_TY
             )
         ]]
 
-        media = InputMediaPhoto(
-            media=plot_graph,
-            caption=details_text,
-            parse_mode="HTML"
-        )
+        async def render_png():
+            with STAGE_DURATION.labels("render").time():
+                if initial_ys is not None:
+                    cached_solution["png"] = await render_sweep_plot(
+                        x_values, y_values, order, sweep_labels(initial_ys)
+                    )
+                else:
+                    cached_solution["png"] = await render_plot(x_values, y_values, order)
+
+        async def send_media(photo):
+            media = InputMediaPhoto(
+                media=photo,
+                caption=details_text,
+                parse_mode="HTML"
+            )
+
+            with STAGE_DURATION.labels("upload").time():
+                return await query.edit_message_media(
+                    media=media,
+                    reply_markup=InlineKeyboardMarkup(keyboard),
+                    write_timeout=60,
+                    pool_timeout=30
+                )
 
         try:
-            await query.edit_message_media(
-                media=media,
+            if file_id is None and cached_solution["png"] is None:
+                await render_png()
+
+            try:
+                message = await send_media(file_id or cached_solution["png"])
+            except telegram.error.BadRequest as e:
+                if file_id is None:
+                    raise
+
+                # Telegram no longer accepts the cached file id, the plot is uploaded again
+                logger.warning(
+                    "File id of application %s was rejected, uploading the plot again: %s",
+                    application_id,
+                    e
+                )
+                cached_solution["file_id"] = None
+                if cached_solution["png"] is None:
+                    await render_png()
+                message = await send_media(cached_solution["png"])
+
+            remember_file_id(cached_solution, message)
+        except RenderError as e:
+            logger.warning(
+                "Error while rendering plot for user %s, falling back to text only: %s",
+                update.effective_user.id,
+                e
+            )
+            ERRORS.labels("render").inc()
+            await query.edit_message_text(
+                details_text,
                 reply_markup=InlineKeyboardMarkup(keyboard),
-                write_timeout=60,
-                pool_timeout=30
+                parse_mode="HTML"
             )
         except telegram.error.TimedOut:
             logger.warning(
                 "Timeout while sending media for user %s, falling back to text only",
                 update.effective_user.id
             )
+            ERRORS.labels("upload").inc()
             await query.edit_message_text(
                 details_text,
                 reply_markup=InlineKeyboardMarkup(keyboard)
             )
-        finally:
-            plot_graph.close()
+
+        if not is_cached or cached_solution["file_id"] != file_id:
+            await solution_cache.put(application_id, cached_solution)
 
     except Exception as e:
         logger.error(f"Error displaying application details: {e}")
@@ -616,7 +678,8 @@ async def equation(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return EQUATION
 
-    formatted_equation, order = format_equation(update.message.text)
+    with STAGE_DURATION.labels("parse").time():
+        formatted_equation, order = format_equation(update.message.text)
 
     if formatted_equation is None or order is None or order == 0:
         logger.info("User %s used unsupported symbols", user.id)
@@ -678,48 +741,54 @@ async def initial_y(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.message.from_user
     user_input = update.message.text.strip()
 
-    if "," in user_input:
-        splitted_user_input = user_input.split(",")
-    else:
-        splitted_user_input = user_input.split()
-
     order = int(context.user_data['order'])
+    max_trajectories = int(os.getenv("SWEEP_MAX_TRAJECTORIES", DEFAULT_SWEEP_MAX_TRAJECTORIES))
 
     current_language = context.user_data.get('language', DEFAULT_LANGUAGE)
 
+    # Several initial states separated by ";" or a range start..stop:count make a sweep
     try:
-        [float(value) for value in splitted_user_input]
-    except ValueError:
-        invalid_value = next(
-            (
-                value for value in splitted_user_input
-                if not value.replace('.', '', 1).replace('-', '', 1).isdigit()
-            ),
-            None
-        )
+        initial_ys = parse_initial_conditions(user_input, max_trajectories)
+    except ValueError as e:
         logger.info("Invalid initial y input by %s: %s", user.id, user_input)
         await update.message.reply_text(
             LANG_TEXTS[current_language]["invalid_initial_y"] +
-            f"<b><i>{invalid_value}</i></b>. " +
+            f"<b><i>{e.args[0]}</i></b>. " +
             LANG_TEXTS[current_language]["try_again"],
             parse_mode="HTML"
         )
         return INITIAL_Y
 
-    if len(splitted_user_input) != order:
-        logger.info("Invalid number of initial y values by %s: %s", user.id, user_input)
+    for splitted_user_input in initial_ys:
+        if len(splitted_user_input) != order:
+            logger.info("Invalid number of initial y values by %s: %s", user.id, user_input)
+            await update.message.reply_text(
+                LANG_TEXTS[current_language]["invalid_initial_y_count1"] +
+                f"<b><i>{len(splitted_user_input)}</i></b>. " +
+                LANG_TEXTS[current_language]["invalid_initial_y_count2"] +
+                f"<b><i>{order}</i></b>. " +
+                LANG_TEXTS[current_language]["try_again"],
+                parse_mode="HTML"
+            )
+            return INITIAL_Y
+
+    if len(initial_ys) > max_trajectories:
+        logger.info("Too many initial states by %s: %s", user.id, user_input)
         await update.message.reply_text(
-            LANG_TEXTS[current_language]["invalid_initial_y_count1"] +
-            f"<b><i>{len(splitted_user_input)}</i></b>. " +
-            LANG_TEXTS[current_language]["invalid_initial_y_count2"] +
-            f"<b><i>{order}</i></b>. " +
+            LANG_TEXTS[current_language]["invalid_sweep_size"] +
+            f"<b><i>{max_trajectories}</i></b>. " +
             LANG_TEXTS[current_language]["try_again"],
             parse_mode="HTML"
         )
         return INITIAL_Y
 
     logger.info("Initial y of %s: %s", user.id, user_input)
-    context.user_data['initial_y'] = splitted_user_input
+    context.user_data['initial_y'] = initial_ys[0]
+
+    if len(initial_ys) > 1:
+        context.user_data['initial_ys'] = initial_ys
+    else:
+        context.user_data.pop('initial_ys', None)
     context.user_data['state'] = REACH_POINT
 
     await send_localized_message(update, context, "enter_reach_point", "hints_enter_reach_point")
@@ -781,7 +850,6 @@ async def solution(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.edited_message:
         return STEP_SIZE
 
-    user = update.message.from_user
     current_language = context.user_data.get('language', DEFAULT_LANGUAGE)
 
     keyboard = [
@@ -805,56 +873,156 @@ async def solution(update: Update, context: ContextTypes.DEFAULT_TYPE):
         LANG_TEXTS[current_language]["processing"]
     )
 
+    on_queued = functools.partial(report_queue_position, processing_message, current_language)
+
+    SOLVES_IN_FLIGHT.labels().inc()
     try:
-        application_id = await set_parameters(
-            user_id=user.id,
-            method=context.user_data['method'],
-            order=context.user_data['order'],
-            user_equation=context.user_data['user_equation'],
-            formatted_equation=context.user_data['formatted_equation'],
-            initial_x=context.user_data['initial_x'],
-            initial_y=context.user_data['initial_y'],
-            reach_point=context.user_data['reach_point'],
-            step_size=context.user_data['step_size']
-        )
-    except Exception as e:
-        logger.error("Error while setting Java parameters: %s", e)
-        await save_user_settings(context)
-        await processing_message.edit_text(
-            LANG_TEXTS[current_language]["server_error"] + " " +
-            LANG_TEXTS[current_language]["try_again"],
-            reply_markup=new_reply_markup
-        )
-        return MENU
+        with STAGE_DURATION.labels("handler").time():
+            # Waiting solves give their update slot up, so the queue does not stall other chats
+            solve_slot = get_solve_queue().slot(on_queued=on_queued, while_queued=released_update_slot)
+            async with solve_slot as queued:
+                if queued:
+                    await processing_message.edit_text(LANG_TEXTS[current_language]["processing"])
+                return await solve_and_reply(update, context, processing_message, new_reply_markup)
+    finally:
+        SOLVES_IN_FLIGHT.labels().dec()
 
-    is_completed = await wait_for_application_completion(application_id)
 
-    if not is_completed:
-        logger.error("Application %s did not complete successfully", application_id)
-        await save_user_settings(context)
-        await processing_message.edit_text(
-            LANG_TEXTS[current_language]["processing_error"] + " " +
-            LANG_TEXTS[current_language]["try_again"],
-            reply_markup=new_reply_markup
-        )
-        return MENU
+async def report_queue_position(processing_message, language, position):
+    await processing_message.edit_text(
+        LANG_TEXTS[language]["queued"] + f"<b>{position}</b>.",
+        parse_mode="HTML"
+    )
+
 
-    results = await get_results(application_id)
+async def solve_and_reply(update, context, processing_message, new_reply_markup):
+    user = update.message.from_user
+    current_language = context.user_data.get('language', DEFAULT_LANGUAGE)
 
+    parameters = {
+        "user_id": user.id,
+        "method": context.user_data['method'],
+        "order": context.user_data['order'],
+        "user_equation": context.user_data['user_equation'],
+        "formatted_equation": context.user_data['formatted_equation'],
+        "initial_x": context.user_data['initial_x'],
+        "initial_y": context.user_data['initial_y'],
+        "reach_point": context.user_data['reach_point'],
+        "step_size": context.user_data['step_size']
+    }
+
+    application_id = None
+    initial_ys = context.user_data.get('initial_ys')
+
+    # Equations that fail for certain are rejected before they take an application and a job slot
     try:
-        data = json.loads(results[0].get("data", "{}"))
-        x_values = data.get("xvalues", [])
-        y_values = data.get("yvalues", [])
-        solution = data.get("solution", "")
-    except Exception:
-        logger.error("Error while getting solution for application %s", application_id)
+        with STAGE_DURATION.labels("preflight").time():
+            checked = await asyncio.to_thread(
+                check_equation,
+                parameters["formatted_equation"],
+                parameters["order"],
+                parameters["initial_x"],
+                initial_ys or [parameters["initial_y"]],
+                parameters["reach_point"]
+            )
+        PREFLIGHT_CHECKS.labels("passed" if checked else "skipped").inc()
+    except PreflightRejection as e:
+        logger.info("Rejected equation of %s before submission: %s", user.id, e)
+        PREFLIGHT_CHECKS.labels("rejected").inc()
+        PREFLIGHT_REJECTIONS.labels(e.reason).inc()
         await save_user_settings(context)
         await processing_message.edit_text(
-            LANG_TEXTS[current_language]["server_error"] + " " +
-            LANG_TEXTS[current_language]["try_again"],
+            preflight_error_text(current_language, e),
+            parse_mode="HTML",
             reply_markup=new_reply_markup
         )
         return MENU
+    except Exception as e:
+        logger.warning("Preflight check of %s failed, leaving it to the backend: %s", user.id, e)
+        PREFLIGHT_CHECKS.labels("skipped").inc()
+
+    # Sweeps are always solved by the backend in one application
+    if initial_ys is None:
+        data = await try_solve_locally(
+            parameters["method"],
+            parameters["formatted_equation"],
+            parameters["order"],
+            parameters["initial_x"],
+            parameters["initial_y"],
+            parameters["reach_point"],
+            parameters["step_size"]
+        )
+    else:
+        data = None
+
+    if data is not None:
+        logger.info("Solved problem of %s locally", user.id)
+        solution = data["solution"]
+    else:
+        try:
+            await get_settings_cache().ensure_stored(user.id)
+
+            with STAGE_DURATION.labels("set_parameters").time():
+                if initial_ys is None:
+                    application_id = await set_parameters(**parameters)
+                else:
+                    application_id = await set_sweep_parameters(
+                        parameters["user_id"],
+                        parameters["method"],
+                        parameters["order"],
+                        parameters["user_equation"],
+                        parameters["formatted_equation"],
+                        parameters["initial_x"],
+                        initial_ys,
+                        parameters["reach_point"],
+                        parameters["step_size"]
+                    )
+
+            get_history_cache().invalidate(user.id)
+        except Exception as e:
+            logger.error("Error while setting Java parameters: %s", e)
+            ERRORS.labels("set_parameters").inc()
+            await save_user_settings(context)
+            await processing_message.edit_text(
+                LANG_TEXTS[current_language]["server_error"] + " " +
+                LANG_TEXTS[current_language]["try_again"],
+                reply_markup=new_reply_markup
+            )
+            return MENU
+
+        with STAGE_DURATION.labels("completion").time():
+            is_completed = await wait_for_application_completion(application_id)
+
+        if not is_completed:
+            logger.error("Application %s did not complete successfully", application_id)
+            ERRORS.labels("completion").inc()
+            await save_user_settings(context)
+            await processing_message.edit_text(
+                LANG_TEXTS[current_language]["processing_error"] + " " +
+                LANG_TEXTS[current_language]["try_again"],
+                reply_markup=new_reply_markup
+            )
+            return MENU
+
+        try:
+            data = await get_results_data(application_id)
+            solution = data.get("solution", "") if initial_ys is None else data.get("solutions")
+        except Exception:
+            logger.error("Error while getting solution for application %s", application_id)
+            ERRORS.labels("get_results").inc()
+            await save_user_settings(context)
+            await processing_message.edit_text(
+                LANG_TEXTS[current_language]["server_error"] + " " +
+                LANG_TEXTS[current_language]["try_again"],
+                reply_markup=new_reply_markup
+            )
+            return MENU
+
+        if "acceptedSteps" in data:
+            logger.info(
+                "Application %s accepted %s and rejected %s adaptive steps",
+                application_id, data["acceptedSteps"], data.get("rejectedSteps")
+            )
 
     if solution is None:
         logger.info("User %s used unsupported symbols", user.id)
@@ -866,35 +1034,69 @@ async def solution(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return MENU
 
-    plot_graph = plot_solution(
-        x_values,
-        y_values,
-        context.user_data['order']
-    )
+    cached_solution = create_entry(data)
 
-    print_result = print_solution(
-        solution,
-        context.user_data['order'],
-        context.user_data['rounding']
-    )
+    if initial_ys is None:
+        print_result = print_solution(
+            solution,
+            context.user_data['order'],
+            context.user_data['rounding']
+        )
+    else:
+        print_result = print_solutions(
+            solution,
+            context.user_data['order'],
+            context.user_data['rounding']
+        )
 
     logger.info("Result of %s: %s", user.id, print_result)
 
     try:
-        await processing_message.edit_media(
-            media=InputMediaPhoto(plot_graph, caption=print_result),
-            reply_markup=new_reply_markup,
-            write_timeout=60,
-            pool_timeout=30
+        with STAGE_DURATION.labels("render").time():
+            if initial_ys is None:
+                cached_solution["png"] = await render_plot(
+                    cached_solution["x_values"],
+                    cached_solution["y_values"],
+                    context.user_data['order']
+                )
+            else:
+                cached_solution["png"] = await render_sweep_plot(
+                    cached_solution["x_values"],
+                    cached_solution["y_values"],
+                    context.user_data['order'],
+                    sweep_labels(initial_ys)
+                )
+
+        with STAGE_DURATION.labels("upload").time():
+            message = await processing_message.edit_media(
+                media=InputMediaPhoto(cached_solution["png"], caption=print_result),
+                reply_markup=new_reply_markup,
+                write_timeout=60,
+                pool_timeout=30
+            )
+        remember_file_id(cached_solution, message)
+    except RenderError as e:
+        logger.warning("Error while rendering plot for user %s, falling back to text only: %s", user.id, e)
+        ERRORS.labels("render").inc()
+        await processing_message.edit_text(
+            print_result,
+            reply_markup=new_reply_markup
         )
     except telegram.error.TimedOut:
         logger.warning("Timeout while sending media for user %s, falling back to text only", user.id)
+        ERRORS.labels("upload").inc()
         await processing_message.edit_text(
             print_result,
             reply_markup=new_reply_markup
         )
-    finally:
-        plot_graph.close()
+
+    if application_id is None:
+        context.application.create_task(
+            record_local_solution(parameters, cached_solution),
+            update=update
+        )
+    else:
+        await get_solution_cache().put(application_id, cached_solution)
 
     await save_user_settings(context)
 
@@ -940,6 +1142,91 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return current_state
 
 
+def preflight_error_text(language, rejection):
+    point = f"x = {rejection.x:g}"
+    if rejection.y is not None:
+        point += ", y = [" + ", ".join(f"{value:g}" for value in rejection.y) + "]"
+
+    return (
+        LANG_TEXTS[language][f"preflight_{rejection.reason}"] +
+        f"<b><i>{point}</i></b>. " +
+        LANG_TEXTS[language]["try_again"]
+    )
+
+
+async def get_results_data(application_id):
+    """
+    Returns the decoded data of the application results.
+    If the backend stored a packed trajectory, the x and y values are streamed
+    in chunks and decimated on the fly, so only the points the plot needs are kept.
+    """
+    with STAGE_DURATION.labels("get_results").time():
+        results = await get_results(application_id)
+
+    # Includes streaming the packed trajectory, which is decoded chunk by chunk
+    with STAGE_DURATION.labels("decode").time():
+        data = json.loads(results[0].get("data", "{}"))
+
+        if "xvalues" not in data:
+            header = await get_trajectory_header(application_id)
+            if header is not None:
+                data["xvalues"], data["yvalues"] = await load_trajectory(application_id, header)
+
+    return data
+
+
+async def load_trajectory(application_id, header):
+    trajectories, points, order = header
+
+    if not trajectories:
+        decimator = StreamingDecimator(points, order)
+        async for x_chunk, y_chunk in stream_trajectory(application_id, header):
+            decimator.update(x_chunk, y_chunk)
+        return decimator.result()
+
+    # Sweep plots show y of every trajectory, so only those columns decide what is kept
+    decimator = StreamingDecimator(
+        points,
+        trajectories * order,
+        keys=range(0, trajectories * order, order)
+    )
+    async for x_chunk, y_chunk in stream_trajectory(application_id, header):
+        decimator.update(x_chunk, y_chunk.transpose(1, 0, 2).reshape(len(x_chunk), -1))
+
+    x_values, y_values = decimator.result()
+    return x_values, y_values.reshape(len(x_values), trajectories, order).transpose(1, 0, 2)
+
+
+async def record_local_solution(parameters, cached_solution):
+    """
+    Stores a locally solved problem with its results in the backend,
+    so that it appears in the solution history like any other.
+    """
+    try:
+        await get_settings_cache().ensure_stored(parameters["user_id"])
+        application_id = await record_solution(
+            **parameters,
+            solution=cached_solution["solution"],
+            x_values=cached_solution["x_values"],
+            y_values=cached_solution["y_values"]
+        )
+        get_history_cache().invalidate(parameters["user_id"])
+    except Exception as e:
+        logger.warning("Error while recording local solution of %s: %s", parameters["user_id"], e)
+        return
+
+    await get_solution_cache().put(application_id, cached_solution)
+
+
+def sweep_labels(initial_ys):
+    return [", ".join(str(y) for y in initial_y) for initial_y in initial_ys]
+
+
+def remember_file_id(cached_solution, message):
+    if isinstance(message, telegram.Message) and message.photo:
+        cached_solution["file_id"] = message.photo[-1].file_id
+
+
 async def save_user_settings(context: ContextTypes.DEFAULT_TYPE):
     keys_to_keep = ['method', 'rounding', 'language', 'hints']
     for key in list(context.user_data.keys()):
@@ -947,8 +1234,48 @@ async def save_user_settings(context: ContextTypes.DEFAULT_TYPE):
             del context.user_data[key]
 
 
-def main() -> None:
-    application = Application.builder().token(os.getenv("CLIENT_API_KEY")).build()
+async def post_init(application: Application):
+    await init_session()
+    init_renderer()
+    register_collectors()
+    await start_metrics_server()
+    init_settings_cache({
+        "method": DEFAULT_METHOD,
+        "rounding": DEFAULT_ROUNDING,
+        "language": DEFAULT_LANGUAGE,
+        "hints": DEFAULT_HINTS
+    })
+
+    asyncio.get_running_loop().run_in_executor(None, preload, "sympy", "numpy")
+
+
+async def post_shutdown(application: Application):
+    # Flushes the unsaved settings, so it goes before the session is closed
+    await close_settings_cache()
+    await close_session()
+    await stop_metrics_server()
+    close_renderer()
+
+
+def build_application(base_url=None) -> Application:
+    """
+    Builds the application with all handlers, without starting it.
+    base_url replaces the Telegram Bot API url, for a local Bot API server or a fake one.
+    """
+    builder = (
+        Application.builder()
+        .token(os.getenv("CLIENT_API_KEY"))
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .concurrent_updates(PerUserUpdateProcessor(
+            int(os.getenv("MAX_CONCURRENT_UPDATES", DEFAULT_MAX_CONCURRENT_UPDATES))
+        ))
+    )
+
+    if base_url is not None:
+        builder = builder.base_url(base_url)
+
+    application = builder.build()
 
     conv_handler = ConversationHandler(
         entry_points=[CommandHandler("start", start)],
@@ -970,7 +1297,7 @@ def main() -> None:
                 CallbackQueryHandler(settings_language, pattern="^settings_language$"),
                 CallbackQueryHandler(
                     method,
-                    pattern="^(euler|midpoint|heun|runge_kutta|dormand_prince)$"
+                    pattern="^(euler|midpoint|heun|runge_kutta|dormand_prince|dormand_prince_adaptive)$"
                 ),
                 CallbackQueryHandler(rounding, pattern="^(4|6|8|16)$"),
                 CallbackQueryHandler(language, pattern="^(en|ru|zh)$"),
@@ -991,5 +1318,15 @@ def main() -> None:
     application.add_handler(conv_handler)
     application.add_handler(CommandHandler("start", start))
 
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    return application
+
+
+def main() -> None:
+    application = build_application()
+
+    if os.getenv("BOT_MODE", "polling") == "webhook":
+        application.add_handler(TypeHandler(Update, measure_latency), group=-1)
+        run_webhook(application)
+    else:
+        application.run_polling(allowed_updates=Update.ALL_TYPES)
 
@@ -0,0 +1,190 @@
+import asyncio
+import math
+import os
+import re
+
+from functools import lru_cache
+
+from lazy_imports import lazy_import
+from logger import logger
+from solver.numerical_methods import METHODS, STAGES
+
+np = lazy_import("numpy")
+sp = lazy_import("sympy")
+
+DEFAULT_LOCAL_SOLVER_MAX_STEPS = 5000
+
+# Functions of the backend evaluator (exp4j) that a formatted equation may contain,
+# mapped to their sympy names
+EVALUATOR_FUNCTIONS = {
+    "sin": "sin",
+    "cos": "cos",
+    "tan": "tan",
+    "cot": "cot",
+    "asin": "asin",
+    "acos": "acos",
+    "atan": "atan",
+    "sinh": "sinh",
+    "cosh": "cosh",
+    "tanh": "tanh",
+    "sqrt": "sqrt",
+    "log": "log",
+    "exp": "exp",
+    "abs": "Abs"
+}
+
+
+class LocalSolverError(Exception):
+    pass
+
+
+def estimate_steps(initial_x, reach_point, step_size):
+    """
+    Returns the number of steps the solve takes,
+    or None if the step size would never reach the point.
+    """
+    if reach_point <= initial_x:
+        return 0
+    if step_size <= 0:
+        return None
+    return math.ceil((reach_point - initial_x) / step_size)
+
+
+def parse_equation(formatted_equation, order):
+    """Returns the sympy expression of the formatted equation with its x and y symbols."""
+    x = sp.Symbol("x")
+    y = [sp.Symbol(f"y_{i}") for i in range(order)]
+
+    local_names = {name: getattr(sp, sympy_name) for name, sympy_name in EVALUATOR_FUNCTIONS.items()}
+    local_names.update({
+        "log10": lambda value: sp.log(value, 10),
+        "e": sp.E,
+        "pi": sp.pi,
+        "x": x,
+        **{f"y_{i}": y[i] for i in range(order)}
+    })
+
+    expression_str = re.sub(r"y\[(\d+)\]", r"y_\1", formatted_equation).replace("^", "**")
+
+    # sympify knows more names than the backend, anything else must fail there as well
+    unknown_names = set(re.findall(r"[A-Za-z_]\w*", expression_str)) - local_names.keys()
+    if unknown_names:
+        raise LocalSolverError(f"Unsupported names in equation: {', '.join(sorted(unknown_names))}")
+
+    try:
+        expression = sp.sympify(expression_str, locals=local_names)
+    except (sp.SympifyError, TypeError, AttributeError, ValueError, SyntaxError) as e:
+        raise LocalSolverError(f"Unsupported equation: {formatted_equation}") from e
+
+    unknown_symbols = expression.free_symbols - {x, *y}
+    unknown_functions = expression.atoms(sp.core.function.AppliedUndef)
+    if unknown_symbols or unknown_functions:
+        raise LocalSolverError(f"Unsupported equation: {formatted_equation}")
+
+    return expression, x, y
+
+
+def compile_expression(formatted_equation, symbols, expression):
+    try:
+        return sp.lambdify(symbols, expression, modules="numpy")
+    except (KeyError, TypeError, NameError) as e:
+        # Constants such as zoo of a simplified division by zero have no NumPy equivalent
+        raise LocalSolverError(f"Unsupported equation: {formatted_equation}") from e
+
+
+@lru_cache(maxsize=128)
+def create_right_hand_side(formatted_equation, order):
+    expression, x, y = parse_equation(formatted_equation, order)
+    return compile_expression(formatted_equation, [x, *y], expression)
+
+
+def create_equation_function(formatted_equation, order):
+    """
+    Mirrors CreateEquationFunction.java: the system y[i]' = y[i + 1], y[order - 1]' = equation.
+    """
+    right_hand_side = create_right_hand_side(formatted_equation, order)
+
+    def equation_function(x, y, out):
+        value = right_hand_side(x, *y.tolist())
+        if math.isnan(value):
+            raise LocalSolverError(f"Result is NaN at x = {x}")
+        out[:-1] = y[1:]
+        out[-1] = value
+
+    return equation_function
+
+
+def solve(method, formatted_equation, order, initial_x, initial_y, reach_point, step_size):
+    """
+    Mirrors SolverJob.solve and returns the same data as a results row of the backend.
+    """
+    step = METHODS.get(method)
+    if step is None:
+        raise LocalSolverError(f"Invalid method value: {method}")
+
+    order = int(order)
+    x = float(initial_x)
+    y = np.array(list(map(float, initial_y)), dtype=float)
+    reach_point = float(reach_point)
+    step_size = float(step_size)
+
+    equation_function = create_equation_function(formatted_equation, order)
+
+    capacity = (estimate_steps(x, reach_point, step_size) or 0) + 2
+    x_values = np.empty(capacity)
+    y_values = np.empty((capacity, order))
+
+    stages = np.empty((STAGES, order))
+    temp = np.empty(order)
+    scratch = np.empty(order)
+    y_next = np.empty(order)
+
+    count = 0
+
+    with np.errstate(divide="raise", invalid="raise", over="ignore", under="ignore"):
+        while x < reach_point - 1e-10:
+            try:
+                step(equation_function, x, y, step_size, stages, temp, scratch, y_next)
+            except (ZeroDivisionError, FloatingPointError, OverflowError, TypeError) as e:
+                raise LocalSolverError(f"Arithmetic error at x = {x}: {e}") from e
+
+            x = x + step_size
+            y, y_next = y_next, y
+
+            if count == capacity:
+                capacity *= 2
+                x_values = np.resize(x_values, capacity)
+                y_values = np.resize(y_values, (capacity, order))
+
+            x_values[count] = x
+            y_values[count] = y
+            count += 1
+
+    return {
+        "solution": [x, *y.tolist()],
+        "xvalues": x_values[:count],
+        "yvalues": y_values[:count]
+    }
+
+
+async def try_solve_locally(method, formatted_equation, order, initial_x, initial_y, reach_point, step_size):
+    """
+    Solves small problems in the bot process.
+    Returns None if the problem is too large or unsupported and must go to the backend.
+    """
+    if method not in METHODS:
+        return None
+
+    max_steps = int(os.getenv("LOCAL_SOLVER_MAX_STEPS", DEFAULT_LOCAL_SOLVER_MAX_STEPS))
+
+    steps = estimate_steps(float(initial_x), float(reach_point), float(step_size))
+    if steps is None or steps > max_steps:
+        return None
+
+    try:
+        return await asyncio.to_thread(
+            solve, method, formatted_equation, order, initial_x, initial_y, reach_point, step_size
+        )
+    except LocalSolverError as e:
+        logger.info("Falling back to the backend solver: %s", e)
+        return None
@@ -0,0 +1,132 @@
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+# Each method advances y from x by h, mirroring NumericalMethods.java.
+# f(x, y, out) writes the derivative into out,
+# k is a preallocated (STAGES, order) buffer, temp and scratch are (order,) buffers,
+# the new state is written into out.
+
+STAGES = 6
+
+
+def euler(f, x, y, h, k, temp, scratch, out):
+    f(x, y, k[0])
+
+    np.multiply(k[0], h, out=out)
+    out += y
+
+
+def midpoint(f, x, y, h, k, temp, scratch, out):
+    f(x, y, k[0])
+
+    np.multiply(k[0], h / 2, out=temp)
+    temp += y
+    f(x + h / 2, temp, k[1])
+
+    np.multiply(k[1], h, out=out)
+    out += y
+
+
+def heun(f, x, y, h, k, temp, scratch, out):
+    f(x, y, k[0])
+
+    np.multiply(k[0], h, out=temp)
+    temp += y
+    f(x + h, temp, k[1])
+
+    np.add(k[0], k[1], out=out)
+    out *= h / 2
+    out += y
+
+
+def runge_kutta(f, x, y, h, k, temp, scratch, out):
+    k1, k2, k3, k4 = k[0], k[1], k[2], k[3]
+
+    f(x, y, k1)
+    k1 *= h
+
+    np.multiply(k1, 0.5, out=temp)
+    temp += y
+    f(x + h / 2, temp, k2)
+    k2 *= h
+
+    np.multiply(k2, 0.5, out=temp)
+    temp += y
+    f(x + h / 2, temp, k3)
+    k3 *= h
+
+    np.add(y, k3, out=temp)
+    f(x + h, temp, k4)
+    k4 *= h
+
+    np.multiply(k2, 2, out=out)
+    out += k1
+    np.multiply(k3, 2, out=scratch)
+    out += scratch
+    out += k4
+    out /= 6
+    out += y
+
+
+def _combine(k, coefficients, y, temp, scratch):
+    temp.fill(0.0)
+    for stage, coefficient in coefficients:
+        np.multiply(k[stage], coefficient, out=scratch)
+        temp += scratch
+    temp += y
+
+
+def dormand_prince(f, x, y, h, k, temp, scratch, out):
+    k1, k2, k3, k4, k5, k6 = k[0], k[1], k[2], k[3], k[4], k[5]
+
+    f(x, y, k1)
+    k1 *= h
+
+    _combine(k, ((0, 1.0 / 5.0),), y, temp, scratch)
+    f(x + h / 5.0, temp, k2)
+    k2 *= h
+
+    _combine(k, ((0, 3.0 / 40.0), (1, 9.0 / 40.0)), y, temp, scratch)
+    f(x + h * 3.0 / 10.0, temp, k3)
+    k3 *= h
+
+    _combine(k, ((0, 44.0 / 45.0), (1, -56.0 / 15.0), (2, 32.0 / 9.0)), y, temp, scratch)
+    f(x + h * 4.0 / 5.0, temp, k4)
+    k4 *= h
+
+    _combine(k, (
+        (0, 19372.0 / 6561.0),
+        (1, -25360.0 / 2187.0),
+        (2, 64448.0 / 6561.0),
+        (3, -212.0 / 729.0)
+    ), y, temp, scratch)
+    f(x + h * 8.0 / 9.0, temp, k5)
+    k5 *= h
+
+    _combine(k, (
+        (0, 9017.0 / 3168.0),
+        (1, -355.0 / 33.0),
+        (2, 46732.0 / 5247.0),
+        (3, 49.0 / 176.0),
+        (4, -5103.0 / 18656.0)
+    ), y, temp, scratch)
+    f(x + h, temp, k6)
+    k6 *= h
+
+    _combine(k, (
+        (0, 35.0 / 384.0),
+        (2, 500.0 / 1113.0),
+        (3, 125.0 / 192.0),
+        (4, -2187.0 / 6784.0),
+        (5, 11.0 / 84.0)
+    ), y, out, scratch)
+
+
+METHODS = {
+    "euler": euler,
+    "midpoint": midpoint,
+    "heun": heun,
+    "runge_kutta": runge_kutta,
+    "dormand_prince": dormand_prince
+}
@@ -0,0 +1,114 @@
+import math
+
+from lazy_imports import lazy_import
+from solver.local_solver import LocalSolverError, compile_expression, create_right_hand_side, parse_equation
+
+np = lazy_import("numpy")
+sp = lazy_import("sympy")
+
+# Points along the interval where the parts of the equation that do not depend on y are evaluated,
+# all of them in one vectorized call per part
+PREFLIGHT_X_SAMPLES = 32
+
+
+class PreflightRejection(Exception):
+    """
+    The equation fails the solve for certain.
+    reason is "nan" or "infinite" if it does so at the initial state x, y,
+    or "undefined" if from x on a part of it that does not depend on y is NaN,
+    which makes the equation NaN whatever y the solve reaches.
+    """
+
+    def __init__(self, reason, x, y=None):
+        super().__init__(f"{reason} at x = {x}" + ("" if y is None else f", y = {y}"))
+        self.reason = reason
+        self.x = x
+        self.y = y
+
+
+def evaluate(right_hand_side, x, ys):
+    """
+    Evaluates the right-hand side at the points x and the states ys, given as one array per component.
+    Complex values are returned as NaN, as the backend evaluator has no complex numbers.
+    """
+    with np.errstate(all="ignore"):
+        values = np.asarray(right_hand_side(x, *ys))
+
+    values = np.broadcast_to(values, np.shape(x))
+
+    if np.iscomplexobj(values):
+        values = np.where(values.imag == 0, values.real, math.nan)
+
+    return values.astype(float, copy=False)
+
+
+def x_terms(expression, y):
+    """
+    Returns the largest parts of the expression that depend on x but not on the y symbols,
+    reached only through sums, products and functions of one argument, which all keep a NaN.
+    Elsewhere, as in a power with an exponent that depends on y, a NaN may still be cancelled.
+    """
+    if expression.free_symbols.isdisjoint(y):
+        return [expression] if expression.free_symbols else []
+
+    if isinstance(expression, (sp.Add, sp.Mul)) or (
+            isinstance(expression, sp.Function) and len(expression.args) == 1):
+        return [term for argument in expression.args for term in x_terms(argument, y)]
+
+    return []
+
+
+def check_equation(formatted_equation, order, initial_x, initial_ys, reach_point):
+    """
+    Evaluates the formatted equation before it is submitted, vectorized with NumPy.
+    Every method evaluates it at the initial state in the first step,
+    and a solve can not get past an x where a part that does not depend on y is NaN.
+    Parts that depend on y are only checked at the initial state,
+    the solve may well stay where they are defined.
+    Raises PreflightRejection for such equations.
+    Returns True if the equation passed and False if it could not be checked,
+    the backend then decides.
+    """
+    try:
+        right_hand_side = create_right_hand_side(formatted_equation, int(order))
+    except LocalSolverError:
+        return False
+
+    initial_x = float(initial_x)
+    reach_point = float(reach_point)
+    initial_ys = [[float(value) for value in initial_y] for initial_y in initial_ys]
+
+    try:
+        starts = evaluate(
+            right_hand_side,
+            np.full(len(initial_ys), initial_x),
+            [np.asarray(column) for column in zip(*initial_ys)]
+        )
+
+        for initial_y, value in zip(initial_ys, starts):
+            if math.isnan(value):
+                raise PreflightRejection("nan", initial_x, initial_y)
+            if math.isinf(value):
+                raise PreflightRejection("infinite", initial_x, initial_y)
+
+        if reach_point <= initial_x:
+            return True
+
+        expression, x_symbol, y_symbols = parse_equation(formatted_equation, int(order))
+        x = np.linspace(initial_x, reach_point, PREFLIGHT_X_SAMPLES)
+        undefined = np.zeros(len(x), dtype=bool)
+
+        for term in x_terms(expression, set(y_symbols)):
+            undefined |= np.isnan(evaluate(compile_expression(formatted_equation, [x_symbol], term), x, []))
+
+        # A NaN at a single sample may be a hole the steps pass by
+        stretch = undefined[:-1] & undefined[1:]
+        if stretch.any():
+            raise PreflightRejection("undefined", float(x[np.argmax(stretch)]))
+    except LocalSolverError:
+        return False
+    except (TypeError, ValueError, ZeroDivisionError, OverflowError):
+        # Expressions NumPy can not evaluate are left to the backend
+        return False
+
+    return True
@@ -0,0 +1,73 @@
+DEFAULT_SWEEP_MAX_TRAJECTORIES = 10
+
+
+def split_values(text):
+    if "," in text:
+        return [value.strip() for value in text.split(",")]
+    return text.split()
+
+
+def expand_range(value):
+    """
+    Expands a range "start..stop:count" into count evenly spaced values.
+    """
+    bounds, separator, count = value.partition(":")
+    start, _, stop = bounds.partition("..")
+
+    if not separator:
+        raise ValueError(value)
+
+    start, stop, count = float(start), float(stop), int(count)
+
+    if count < 2:
+        raise ValueError(value)
+
+    return (str(start + (stop - start) * i / (count - 1)) for i in range(count))
+
+
+def parse_initial_conditions(user_input, max_vectors):
+    """
+    Splits the initial y input into vectors of values.
+    Vectors are separated by ";", one value of a vector may be a range
+    "start..stop:count", which expands into count vectors.
+    Stops as soon as there are more than max_vectors vectors.
+    Raises ValueError with the invalid value.
+    """
+    groups = [group for group in user_input.split(";") if group.strip()] or [""]
+
+    vectors = []
+
+    for group in groups:
+        values = split_values(group.strip())
+        ranges = [i for i, value in enumerate(values) if ".." in value]
+
+        if len(ranges) > 1:
+            raise ValueError(values[ranges[1]])
+
+        for i, value in enumerate(values):
+            if i in ranges:
+                continue
+            try:
+                float(value)
+            except ValueError:
+                raise ValueError(value) from None
+
+        if not ranges:
+            vectors.append(values)
+            if len(vectors) > max_vectors:
+                break
+            continue
+
+        index = ranges[0]
+
+        try:
+            expanded = expand_range(values[index])
+        except ValueError:
+            raise ValueError(values[index]) from None
+
+        for value in expanded:
+            vectors.append(values[:index] + [value] + values[index + 1:])
+            if len(vectors) > max_vectors:
+                return vectors
+
+    return vectors
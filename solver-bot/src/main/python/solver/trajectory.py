@@ -0,0 +1,82 @@
+import struct
+
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+MAGIC = b"RKT1"
+HEADER = struct.Struct("<4sIII")
+
+
+class TrajectoryError(ValueError):
+    pass
+
+
+def encode_trajectory(x_values, y_values):
+    """
+    Packs a trajectory the way the backend stores it:
+    a header with the magic, number of trajectories (0 for a single solution),
+    number of points and order, then little-endian float64 x and y values.
+    y_values is (points, order) for a solution or (trajectories, points, order) for a sweep.
+    """
+    x_values = np.asarray(x_values, dtype="<f8")
+    y_values = np.asarray(y_values, dtype="<f8")
+
+    trajectories = 0 if y_values.ndim < 3 else y_values.shape[0]
+    order = y_values.shape[-1] if y_values.ndim > 1 else 1
+
+    header = HEADER.pack(MAGIC, trajectories, len(x_values), order)
+
+    return header + x_values.tobytes() + y_values.tobytes()
+
+
+def decode_header(payload):
+    """
+    Returns the number of trajectories, points and the order from the header.
+    """
+    if len(payload) < HEADER.size:
+        raise TrajectoryError("Trajectory is shorter than its header")
+
+    magic, trajectories, points, order = HEADER.unpack_from(payload)
+
+    if magic != MAGIC:
+        raise TrajectoryError(f"Unknown trajectory format: {magic!r}")
+
+    return trajectories, points, order
+
+
+def chunk_ranges(trajectories, points, order, start, count):
+    """
+    Returns the byte ranges (start, end) holding points start..start + count:
+    the x values first, then the y values of every trajectory.
+    """
+    x_start = HEADER.size + 8 * start
+    y_offset = HEADER.size + 8 * points
+
+    ranges = [(x_start, x_start + 8 * count)]
+
+    for trajectory in range(max(trajectories, 1)):
+        y_start = y_offset + 8 * order * (trajectory * points + start)
+        ranges.append((y_start, y_start + 8 * order * count))
+
+    return ranges
+
+
+def decode_trajectory(payload):
+    """
+    Returns x_values and y_values as read-only views into payload, without copying.
+    """
+    trajectories, points, order = decode_header(payload)
+
+    y_count = max(trajectories, 1) * points * order
+
+    if len(payload) != HEADER.size + 8 * (points + y_count):
+        raise TrajectoryError("Trajectory size does not match its header")
+
+    x_values = np.frombuffer(payload, dtype="<f8", count=points, offset=HEADER.size)
+    y_values = np.frombuffer(payload, dtype="<f8", count=y_count, offset=HEADER.size + 8 * points)
+
+    if trajectories:
+        return x_values, y_values.reshape(trajectories, points, order)
+
+    return x_values, y_values.reshape(points, order)
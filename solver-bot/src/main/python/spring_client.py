@@ -1,25 +1,147 @@
-import numpy as np
 import asyncio
 import json
 import os
 
-from aiohttp import ClientError, ClientTimeout, ClientSession
+from aiohttp import (
+    ClientError,
+    ClientResponseError,
+    ClientTimeout,
+    ClientSession,
+    TCPConnector,
+    TraceConfig)
+
+from lazy_imports import lazy_import
+from logger import logger
+from monitoring.metrics import BACKEND_RETRIES
+from solver.trajectory import HEADER, TrajectoryError, chunk_ranges, decode_header
+
+np = lazy_import("numpy")
 
 REQUEST_TIMEOUT = 60
 MAX_RETRIES = 3
 RETRY_DELAY = 1
 MAX_DELAY = 10
 
-async def set_parameters(
-    user_id, method, order, user_equation, formatted_equation,
-    initial_x, initial_y, reach_point, step_size
+STATUS_WAIT_TIMEOUT = 30
+STATUS_WAIT_ROUNDS = 20
+
+DEFAULT_CONNECTION_LIMIT = 100
+DEFAULT_CONNECTION_LIMIT_PER_HOST = 20
+DEFAULT_DNS_CACHE_TTL = 300
+DEFAULT_KEEPALIVE_TIMEOUT = 30
+
+DEFAULT_ADAPTIVE_RTOL = 1e-6
+DEFAULT_ADAPTIVE_ATOL = 1e-9
+
+DEFAULT_TRAJECTORY_CHUNK_SIZE = 2**20
+
+# Several times the points a plot keeps after decimation, so peaks between samples are rare
+DEFAULT_OUTPUT_MAX_POINTS = 20000
+
+DEFAULT_HISTORY_SIZE = 5
+HISTORY_STATUSES = ("new", "in_progress", "completed")
+
+_session = None
+
+connection_stats = {
+    "created": 0,
+    "reused": 0,
+    "queued": 0
+}
+
+
+async def _on_connection_create_end(session, context, params):
+    connection_stats["created"] += 1
+
+
+async def _on_connection_reuseconn(session, context, params):
+    connection_stats["reused"] += 1
+
+
+async def _on_connection_queued_start(session, context, params):
+    connection_stats["queued"] += 1
+    logger.warning(
+        "Backend connection pool is saturated, request queued (limit per host: %s)",
+        session.connector.limit_per_host
+    )
+
+
+def _create_session():
+    trace_config = TraceConfig()
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
+    trace_config.on_connection_queued_start.append(_on_connection_queued_start)
+
+    connector = TCPConnector(
+        limit=int(os.getenv("CLIENT_CONNECTION_LIMIT", DEFAULT_CONNECTION_LIMIT)),
+        limit_per_host=int(os.getenv(
+            "CLIENT_CONNECTION_LIMIT_PER_HOST",
+            DEFAULT_CONNECTION_LIMIT_PER_HOST
+        )),
+        ttl_dns_cache=int(os.getenv("CLIENT_DNS_CACHE_TTL", DEFAULT_DNS_CACHE_TTL)),
+        keepalive_timeout=int(os.getenv(
+            "CLIENT_KEEPALIVE_TIMEOUT",
+            DEFAULT_KEEPALIVE_TIMEOUT
+        ))
+    )
+
+    return ClientSession(
+        connector=connector,
+        timeout=ClientTimeout(total=REQUEST_TIMEOUT),
+        trace_configs=[trace_config]
+    )
+
+
+def get_session():
+    """
+    Returns the shared backend session,
+    creating it on first use if init_session was not called.
+    """
+    global _session
+
+    if _session is None or _session.closed:
+        _session = _create_session()
+
+    return _session
+
+
+async def init_session():
+    get_session()
+    logger.info("Backend client session opened")
+
+
+async def close_session():
+    global _session
+
+    if _session is not None and not _session.closed:
+        await _session.close()
+
+    _session = None
+
+    logger.info(
+        "Backend client session closed, connections created: %s, reused: %s, queued: %s",
+        connection_stats["created"],
+        connection_stats["reused"],
+        connection_stats["queued"]
+    )
+
+def create_payload(
+    method, order, user_equation, formatted_equation,
+    initial_x, initial_y, reach_point, step_size,
+    max_points=None, output_every=None
 ):
+    """
+    Builds the solve request. Only every output_every-th step and at most
+    max_points points are recorded by the backend, max_points defaults to
+    OUTPUT_MAX_POINTS and 0 asks for every step.
+    """
     method_mapping = {
         "euler": "euler",
         "midpoint": "midpoint",
         "heun": "heun",
         "runge_kutta": "rungeKutta",
         "dormand_prince": "dormandPrince",
+        "dormand_prince_adaptive": "dormandPrince",
     }
 
     payload = {
@@ -33,23 +155,94 @@ async def set_parameters(
         "stepSize": float(step_size)
     }
 
+    if max_points is None:
+        max_points = int(os.getenv("OUTPUT_MAX_POINTS", DEFAULT_OUTPUT_MAX_POINTS))
+
+    if max_points > 0:
+        payload["maxPoints"] = int(max_points)
+
+    if output_every is not None:
+        payload["outputEvery"] = int(output_every)
+
+    return payload
+
+
+async def post_application(url, payload):
     for attempt in range(MAX_RETRIES):
         try:
-            timeout = ClientTimeout(total=REQUEST_TIMEOUT)
-            async with ClientSession(timeout=timeout) as session:
-                async with session.post(
-                    f"{os.getenv('CLIENT_API_URL')}/solve/{user_id}",
-                    json=payload
-                ) as response:
-                    response.raise_for_status()
-                    return await response.json()
+            async with get_session().post(url, json=payload) as response:
+                response.raise_for_status()
+                return await response.json()
         except (ClientError, asyncio.TimeoutError) as e:
             if attempt < MAX_RETRIES - 1:
+                BACKEND_RETRIES.labels().inc()
                 await asyncio.sleep(RETRY_DELAY)
                 continue
             raise e
 
 
+async def set_parameters(
+    user_id, method, order, user_equation, formatted_equation,
+    initial_x, initial_y, reach_point, step_size,
+    max_points=None, output_every=None
+):
+    payload = create_payload(
+        method, order, user_equation, formatted_equation,
+        initial_x, initial_y, reach_point, step_size,
+        max_points, output_every
+    )
+
+    # The adaptive variant is Dormand-Prince with error control,
+    # the step size is then only used as the initial step
+    if method == "dormand_prince_adaptive":
+        payload["relativeTolerance"] = float(os.getenv("ADAPTIVE_RTOL", DEFAULT_ADAPTIVE_RTOL))
+        payload["absoluteTolerance"] = float(os.getenv("ADAPTIVE_ATOL", DEFAULT_ADAPTIVE_ATOL))
+
+    return await post_application(f"{os.getenv('CLIENT_API_URL')}/solve/{user_id}", payload)
+
+
+async def record_solution(
+    user_id, method, order, user_equation, formatted_equation,
+    initial_x, initial_y, reach_point, step_size,
+    solution, x_values, y_values
+):
+    """
+    Stores a problem solved by the bot as a completed application with its results,
+    the backend does not solve it again. Returns the application id.
+    """
+    payload = {
+        "request": create_payload(
+            method, order, user_equation, formatted_equation,
+            initial_x, initial_y, reach_point, step_size,
+            max_points=0
+        ),
+        "solution": [float(value) for value in solution],
+        "xValues": np.asarray(x_values, dtype=float).tolist(),
+        "yValues": np.asarray(y_values, dtype=float).tolist()
+    }
+
+    return await post_application(f"{os.getenv('CLIENT_API_URL')}/solve/{user_id}/recorded", payload)
+
+
+async def set_sweep_parameters(
+    user_id, method, order, user_equation, formatted_equation,
+    initial_x, initial_ys, reach_point, step_size,
+    max_points=None, output_every=None
+):
+    """
+    Submits one application integrating every initial state in initial_ys.
+    Sweeps use fixed steps, the adaptive method runs as plain Dormand-Prince.
+    """
+    payload = create_payload(
+        method, order, user_equation, formatted_equation,
+        initial_x, initial_ys[0], reach_point, step_size,
+        max_points, output_every
+    )
+    payload["initialYs"] = [list(map(float, initial_y)) for initial_y in initial_ys]
+
+    return await post_application(f"{os.getenv('CLIENT_API_URL')}/solve/{user_id}/sweep", payload)
+
+
 async def set_user_settings(user_id, method, rounding, language, hints):
     payload = {
         "method": method,
@@ -58,106 +251,233 @@ async def set_user_settings(user_id, method, rounding, language, hints):
         "hints": hints
     }
 
-    timeout = ClientTimeout(total=REQUEST_TIMEOUT)
-    async with ClientSession(timeout=timeout) as session:
-        async with session.post(
-            f"{os.getenv('CLIENT_API_URL')}/users/{user_id}",
-            params=payload
-        ) as response:
-            response.raise_for_status()
-            return await response.text()
+    async with get_session().post(
+        f"{os.getenv('CLIENT_API_URL')}/users/{user_id}",
+        params=payload
+    ) as response:
+        response.raise_for_status()
+        return await response.text()
+
+
+async def set_user_settings_batch(settings):
+    """
+    Upserts the settings of several users in one request,
+    settings are dicts with the id, method, rounding, language and hints of a user.
+    """
+    payload = [
+        {
+            "id": user_settings["id"],
+            "method": user_settings["method"],
+            "rounding": user_settings["rounding"],
+            "language": user_settings["language"],
+            "hints": user_settings["hints"] == "true"
+        }
+        for user_settings in settings
+    ]
+
+    async with get_session().post(
+        f"{os.getenv('CLIENT_API_URL')}/users",
+        json=payload
+    ) as response:
+        response.raise_for_status()
+        return await response.text()
 
 
 async def get_user_settings(user_id, method, rounding, language, hints):
-    timeout = ClientTimeout(total=REQUEST_TIMEOUT)
-    async with ClientSession(timeout=timeout) as session:
-        async with session.get(
-            f"{os.getenv('CLIENT_API_URL')}/users/{user_id}"
-        ) as response:
-            if response.status == 500:
-                return {
-                    'method': method,
-                    'rounding': rounding,
-                    'language': language,
-                    'hints': hints
-                }
-
-            response.raise_for_status()
-            text = await response.text()
-            try:
-                data = json.loads(text)
-            except json.JSONDecodeError:
-                return text
-            return data
-
-
-async def get_recent_applications(user_id):
-    timeout = ClientTimeout(total=REQUEST_TIMEOUT)
-    async with ClientSession(timeout=timeout) as session:
-        async with session.get(
-            f"{os.getenv('CLIENT_API_URL')}/applications/{user_id}"
-        ) as response:
-            if response.status == 500:
-                return []
-
-            response.raise_for_status()
-            text = await response.text()
-            try:
-                data = json.loads(text)
-            except json.JSONDecodeError:
-                return []
-
-            valid_statuses = {"new", "in_progress", "completed"}
-
-            filtered = []
-
-            if isinstance(data, list):
-                for app in data:
+    async with get_session().get(
+        f"{os.getenv('CLIENT_API_URL')}/users/{user_id}"
+    ) as response:
+        if response.status == 500:
+            return {
+                'method': method,
+                'rounding': rounding,
+                'language': language,
+                'hints': hints
+            }
+
+        response.raise_for_status()
+        text = await response.text()
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            return text
+        return data
+
+
+async def get_recent_applications(user_id, limit=DEFAULT_HISTORY_SIZE):
+    # The filters are applied again below for backends that ignore them
+    async with get_session().get(
+        f"{os.getenv('CLIENT_API_URL')}/applications/{user_id}",
+        params={"limit": limit, "status": ",".join(HISTORY_STATUSES)}
+    ) as response:
+        if response.status == 500:
+            return []
+
+        response.raise_for_status()
+        text = await response.text()
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            return []
+
+        valid_statuses = set(HISTORY_STATUSES)
+
+        filtered = []
+
+        if isinstance(data, list):
+            for app in data:
+                if isinstance(app, dict) and app.get("status") in valid_statuses:
+                    filtered.append(app)
+                    if len(filtered) == limit:
+                        break
+            return filtered
+
+        elif isinstance(data, dict) and 'applications' in data:
+            applications = data['applications']
+            if isinstance(applications, list):
+                for app in applications:
                     if isinstance(app, dict) and app.get("status") in valid_statuses:
-                        filtered.append(app)
-                        if len(filtered) == 5:
+                        filtered.append(app.get('id') if 'id' in app else app)
+                        if len(filtered) == limit:
                             break
                 return filtered
 
-            elif isinstance(data, dict) and 'applications' in data:
-                applications = data['applications']
-                if isinstance(applications, list):
-                    for app in applications:
-                        if isinstance(app, dict) and app.get("status") in valid_statuses:
-                            filtered.append(app.get('id') if 'id' in app else app)
-                            if len(filtered) == 5:
-                                break
-                    return filtered
-
-            return []
+        return []
 
 
 async def get_results(application_id):
-    timeout = ClientTimeout(total=REQUEST_TIMEOUT)
-    async with ClientSession(timeout=timeout) as session:
-        async with session.get(
-            f"{os.getenv('CLIENT_API_URL')}/results/{application_id}"
-        ) as response:
-            response.raise_for_status()
-            text = await response.text()
-            try:
-                data = json.loads(text)
-            except json.JSONDecodeError:
-                return text
-            return data
+    async with get_session().get(
+        f"{os.getenv('CLIENT_API_URL')}/results/{application_id}"
+    ) as response:
+        response.raise_for_status()
+        text = await response.text()
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            return text
+        return data
+
+
+async def read_trajectory_range(application_id, start, end):
+    """
+    Requests bytes start..end of the packed trajectory of the results.
+    Returns (payload, whole), whole being True if the backend ignored the range
+    and sent the whole trajectory, or (None, False) if the backend stored them as JSON only.
+    """
+    async with get_session().get(
+        f"{os.getenv('CLIENT_API_URL')}/results/{application_id}/trajectory",
+        headers={"Range": f"bytes={start}-{end - 1}"}
+    ) as response:
+        if response.status == 404:
+            return None, False
+        response.raise_for_status()
+        payload = await response.read()
+
+    return payload, response.status != 206
+
+
+async def get_trajectory_range(application_id, start, end):
+    """
+    Returns bytes start..end of the packed trajectory of the results,
+    or None if the backend stored them as JSON only.
+    """
+    payload, whole = await read_trajectory_range(application_id, start, end)
+
+    if whole:
+        # The whole trajectory came back, the range is cut out of it
+        payload = payload[start:end]
+
+    return payload
+
+
+async def get_trajectory_header(application_id):
+    """
+    Returns (trajectories, points, order) of the packed trajectory, or None if there is none.
+    """
+    payload = await get_trajectory_range(application_id, 0, HEADER.size)
+    return None if payload is None else decode_header(payload)
+
+
+async def stream_trajectory(application_id, header, chunk_size=None):
+    """
+    Reads the packed trajectory in ranges of about chunk_size bytes and yields
+    (x_chunk, y_chunk) arrays, y_chunk being (points, order) for a solution
+    or (trajectories, points, order) for a sweep, so the whole trajectory
+    is never held in memory at once.
+    """
+    if chunk_size is None:
+        chunk_size = int(os.getenv("TRAJECTORY_CHUNK_SIZE", DEFAULT_TRAJECTORY_CHUNK_SIZE))
+
+    trajectories, points, order = header
+    chunk_points = max(1, chunk_size // (8 * (1 + max(trajectories, 1) * order)))
+
+    # The first range is requested alone, if the backend or a proxy ignores ranges
+    # the whole trajectory comes back once and the chunks are cut out of it
+    whole = None
+    first = None
+
+    if points:
+        first_range = chunk_ranges(trajectories, points, order, 0, min(chunk_points, points))[0]
+        payload, is_whole = await read_trajectory_range(application_id, *first_range)
+        if is_whole:
+            whole = payload
+        else:
+            first = payload
+
+    for start in range(0, points, chunk_points):
+        count = min(chunk_points, points - start)
+
+        ranges = chunk_ranges(trajectories, points, order, start, count)
+
+        if whole is not None:
+            payloads = [whole[range_start:range_end] for range_start, range_end in ranges]
+        elif start == 0:
+            payloads = [first, *await asyncio.gather(*(
+                get_trajectory_range(application_id, range_start, range_end)
+                for range_start, range_end in ranges[1:]
+            ))]
+        else:
+            payloads = await asyncio.gather(*(
+                get_trajectory_range(application_id, range_start, range_end)
+                for range_start, range_end in ranges
+            ))
+
+        for payload, (range_start, range_end) in zip(payloads, ranges):
+            if payload is None or len(payload) != range_end - range_start:
+                raise TrajectoryError(f"Trajectory of application {application_id} ended early")
+
+        x_chunk = np.frombuffer(payloads[0], dtype="<f8")
+        y_chunk = np.frombuffer(b"".join(payloads[1:]), dtype="<f8")
+
+        if trajectories:
+            yield x_chunk, y_chunk.reshape(trajectories, count, order)
+        else:
+            yield x_chunk, y_chunk.reshape(count, order)
 
 
 async def get_application_status(application_id):
-    timeout = ClientTimeout(total=REQUEST_TIMEOUT)
-    async with ClientSession(timeout=timeout) as session:
-        async with session.get(
-            f"{os.getenv('CLIENT_API_URL')}/applications/{application_id}/status"
-        ) as response:
-            response.raise_for_status()
-            return await response.text()
+    async with get_session().get(
+        f"{os.getenv('CLIENT_API_URL')}/applications/{application_id}/status"
+    ) as response:
+        response.raise_for_status()
+        return await response.text()
 
 
-async def wait_for_application_completion(application_id):
+async def wait_for_application_status(application_id, timeout=STATUS_WAIT_TIMEOUT):
+    """
+    Long-polls the application status.
+    The backend answers as soon as the application completes or fails,
+    or with the current status once the timeout expires.
+    """
+    async with get_session().get(
+        f"{os.getenv('CLIENT_API_URL')}/applications/{application_id}/status/wait",
+        params={"timeout": timeout}
+    ) as response:
+        response.raise_for_status()
+        return await response.text()
+
+
+async def poll_application_completion(application_id):
     current_delay = RETRY_DELAY
 
     for _ in range(REQUEST_TIMEOUT):
@@ -174,3 +494,26 @@ async def wait_for_application_completion(application_id):
             await asyncio.sleep(current_delay)
 
     return False
+
+
+async def wait_for_application_completion(application_id):
+    for _ in range(STATUS_WAIT_ROUNDS):
+        try:
+            status = await wait_for_application_status(application_id)
+        except (ClientError, asyncio.TimeoutError) as e:
+            if isinstance(e, ClientResponseError) and e.status == 404:
+                logger.warning("Backend does not support status waiting, falling back to polling")
+            else:
+                logger.warning(
+                    "Error while waiting for application %s, falling back to polling: %s",
+                    application_id,
+                    e
+                )
+            return await poll_application_completion(application_id)
+
+        if status == "completed":
+            return True
+        elif status == "error":
+            return False
+
+    return False
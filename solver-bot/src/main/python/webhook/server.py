@@ -0,0 +1,182 @@
+import asyncio
+import os
+import secrets
+import signal
+import time
+
+from aiohttp import web
+from telegram import Update
+
+from logger import logger
+
+DEFAULT_WEBHOOK_HOST = "0.0.0.0"
+DEFAULT_WEBHOOK_PORT = 8000
+DEFAULT_WEBHOOK_PATH = "/telegram"
+DEFAULT_DRAIN_TIMEOUT = 30
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+# update_id -> time.perf_counter() of the moment the webhook request was received
+_received_at = {}
+latency_stats = {"updates": 0, "total": 0.0, "max": 0.0}
+
+
+def latency_summary():
+    updates = latency_stats["updates"]
+    return {
+        "updates": updates,
+        "mean_ms": round(latency_stats["total"] / updates * 1000, 3) if updates else 0.0,
+        "max_ms": round(latency_stats["max"] * 1000, 3),
+    }
+
+
+async def measure_latency(update: Update, context) -> None:
+    """
+    Registered in the group -1 so it runs first for every update:
+    records the time between the receipt of the webhook request and the start of the handlers.
+    """
+    received_at = _received_at.pop(update.update_id, None)
+    if received_at is None:
+        return
+
+    latency = time.perf_counter() - received_at
+    latency_stats["updates"] += 1
+    latency_stats["total"] += latency
+    latency_stats["max"] = max(latency_stats["max"], latency)
+
+    logger.debug(f"Update {update.update_id} reached the handlers in {latency * 1000:.2f} ms")
+
+
+def has_pending_updates(application):
+    return application.update_queue.qsize() > 0 or application.update_processor.current_concurrent_updates > 0
+
+
+def create_web_app(application, secret_token, path=DEFAULT_WEBHOOK_PATH):
+    web_app = web.Application()
+    web_app["draining"] = False
+
+    async def handle_update(request):
+        if request.app["draining"]:
+            return web.Response(status=503)
+
+        if not secrets.compare_digest(request.headers.get(SECRET_TOKEN_HEADER, ""), secret_token):
+            logger.warning(f"Rejected webhook request from {request.remote}: invalid secret token")
+            return web.Response(status=403)
+
+        received_at = time.perf_counter()
+
+        try:
+            update = Update.de_json(await request.json(), application.bot)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Rejected malformed webhook update: {e}")
+            return web.Response(status=400)
+
+        _received_at[update.update_id] = received_at
+        await application.update_queue.put(update)
+
+        return web.Response()
+
+    async def handle_health(request):
+        draining = request.app["draining"]
+
+        return web.json_response(
+            {
+                "status": "draining" if draining else "ok",
+                "queued_updates": application.update_queue.qsize(),
+                "processing_updates": application.update_processor.current_concurrent_updates,
+                "latency": latency_summary(),
+            },
+            status=503 if draining else 200
+        )
+
+    web_app.router.add_post(path, handle_update)
+    web_app.router.add_get("/health", handle_health)
+
+    return web_app
+
+
+async def drain(application, web_app, timeout):
+    """
+    Stops accepting updates (Telegram redelivers the rejected ones)
+    and waits for the received ones to be processed.
+    """
+    web_app["draining"] = True
+    deadline = time.monotonic() + timeout
+
+    while has_pending_updates(application):
+        if time.monotonic() >= deadline:
+            logger.warning(
+                f"Drain timed out with {application.update_queue.qsize()} queued "
+                f"and {application.update_processor.current_concurrent_updates} processing updates"
+            )
+            return
+        await asyncio.sleep(0.1)
+
+
+async def serve(application):
+    """
+    Receives the updates on a webhook until SIGINT or SIGTERM.
+    Only one replica may serve it, the conversation states and user_data
+    are kept in the memory of the process.
+    """
+    url = os.getenv("WEBHOOK_URL")
+    secret_token = os.getenv("WEBHOOK_SECRET_TOKEN")
+
+    if not url or not secret_token:
+        raise RuntimeError("WEBHOOK_URL and WEBHOOK_SECRET_TOKEN must be set in the webhook mode")
+
+    host = os.getenv("WEBHOOK_HOST", DEFAULT_WEBHOOK_HOST)
+    port = int(os.getenv("WEBHOOK_PORT", DEFAULT_WEBHOOK_PORT))
+    path = os.getenv("WEBHOOK_PATH", DEFAULT_WEBHOOK_PATH)
+    drain_timeout = float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", DEFAULT_DRAIN_TIMEOUT))
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    web_app = create_web_app(application, secret_token, path)
+    runner = web.AppRunner(web_app, access_log=None)
+
+    # Same lifecycle as Application.run_polling
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+
+    try:
+        await application.start()
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+
+        # The webhook is not deleted on shutdown, Telegram keeps retrying the updates sent while restarting
+        await application.bot.set_webhook(
+            url.rstrip("/") + path,
+            secret_token=secret_token,
+            allowed_updates=Update.ALL_TYPES
+        )
+        logger.info(f"Serving the webhook on {host}:{port}{path}")
+
+        await stop.wait()
+
+        logger.info("Draining the received updates")
+        await drain(application, web_app, drain_timeout)
+    finally:
+        await runner.cleanup()
+
+        if application.running:
+            await application.stop()
+        if application.post_stop:
+            await application.post_stop(application)
+
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+
+        summary = latency_summary()
+        logger.info(
+            f"Handled {summary['updates']} webhook updates, "
+            f"receipt to handler latency mean {summary['mean_ms']} ms, max {summary['max_ms']} ms"
+        )
+
+
+def run_webhook(application):
+    asyncio.run(serve(application))
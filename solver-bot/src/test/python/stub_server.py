@@ -0,0 +1,45 @@
+import os
+
+from contextlib import asynccontextmanager
+
+from aiohttp import web
+
+import spring_client
+
+
+@asynccontextmanager
+async def stub_backend(routes):
+    """
+    Serves the routes on a free port of 127.0.0.1 and points the backend client at it.
+    Yields the list of (method, path) of the requests the stub received.
+    """
+    requests = []
+
+    @web.middleware
+    async def record(request, handler):
+        requests.append((request.method, request.path))
+        return await handler(request)
+
+    app = web.Application(middlewares=[record])
+    app.add_routes(routes)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+
+    port = site._server.sockets[0].getsockname()[1]
+    previous_url = os.environ.get("CLIENT_API_URL")
+    os.environ["CLIENT_API_URL"] = f"http://127.0.0.1:{port}"
+
+    try:
+        yield requests
+    finally:
+        # The session is bound to the event loop of the test
+        await spring_client.close_session()
+        await runner.cleanup()
+
+        if previous_url is None:
+            os.environ.pop("CLIENT_API_URL", None)
+        else:
+            os.environ["CLIENT_API_URL"] = previous_url
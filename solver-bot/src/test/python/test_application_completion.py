@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from aiohttp import web
+
+import spring_client
+from stub_server import stub_backend
+
+WAIT_PATH = "/applications/1/status/wait"
+STATUS_PATH = "/applications/1/status"
+
+
+@pytest.fixture(autouse=True)
+def no_delays(monkeypatch):
+    monkeypatch.setattr(spring_client, "RETRY_DELAY", 0)
+
+
+def text_responses(*responses):
+    """Answers with the given statuses in turn, ints are HTTP errors."""
+    remaining = list(responses)
+
+    async def handler(request):
+        response = remaining.pop(0) if len(remaining) > 1 else remaining[0]
+        if isinstance(response, int):
+            return web.Response(status=response)
+        return web.Response(text=response)
+
+    return handler
+
+
+async def wait_with(routes):
+    async with stub_backend(routes) as requests:
+        result = await spring_client.wait_for_application_completion(1)
+    return result, requests
+
+
+def count(requests, path):
+    return sum(1 for _, request_path in requests if request_path == path)
+
+
+@pytest.mark.parametrize("status, expected", [("completed", True), ("error", False)])
+def test_wait_returns_final_status(status, expected):
+    result, requests = asyncio.run(wait_with([
+        web.get(WAIT_PATH, text_responses(status))
+    ]))
+
+    assert result is expected
+    assert requests == [("GET", WAIT_PATH)]
+
+
+def test_wait_repeats_until_final_status():
+    result, requests = asyncio.run(wait_with([
+        web.get(WAIT_PATH, text_responses("in_progress", "in_progress", "completed"))
+    ]))
+
+    assert result is True
+    assert count(requests, WAIT_PATH) == 3
+
+
+def test_wait_gives_up_after_all_rounds():
+    result, requests = asyncio.run(wait_with([
+        web.get(WAIT_PATH, text_responses("in_progress"))
+    ]))
+
+    assert result is False
+    assert count(requests, WAIT_PATH) == spring_client.STATUS_WAIT_ROUNDS
+
+
+@pytest.mark.parametrize("error", [404, 500, 503])
+def test_wait_error_falls_back_to_polling(error):
+    result, requests = asyncio.run(wait_with([
+        web.get(WAIT_PATH, text_responses(error)),
+        web.get(STATUS_PATH, text_responses("new", "in_progress", "completed"))
+    ]))
+
+    assert result is True
+    assert count(requests, WAIT_PATH) == 1
+    assert count(requests, STATUS_PATH) == 3
+
+
+def test_polling_fallback_returns_error():
+    result, requests = asyncio.run(wait_with([
+        web.get(WAIT_PATH, text_responses(404)),
+        web.get(STATUS_PATH, text_responses("in_progress", "error"))
+    ]))
+
+    assert result is False
+    assert count(requests, WAIT_PATH) == 1
+    assert count(requests, STATUS_PATH) == 2
@@ -0,0 +1,74 @@
+import re
+
+import pytest
+
+from equation.function_replacer import replace_math_functions
+from equation.functions import ARGUMENT_TEMPLATES, MATH_FUNCTIONS
+
+
+def replace_per_regex(equation):
+    """The replacer before the single pass, one regular expression per name."""
+    for func, replacement in MATH_FUNCTIONS.items():
+        if func in ['coth', 'cth']:
+            equation = re.sub(rf'\b{func}\((.*?)\)', r'(cosh(\1) / sinh(\1))', equation)
+        elif func in ['acot', 'actg', 'arccot', 'arcctg']:
+            equation = re.sub(rf'\b{func}\((.*?)\)', r'(atan(1 / \1))', equation)
+        else:
+            equation = re.sub(rf'\b{func}\b', f'{replacement}', equation)
+
+    return equation
+
+
+SIMPLE_NAMES = [name for name in MATH_FUNCTIONS if name not in ARGUMENT_TEMPLATES]
+
+
+@pytest.mark.parametrize("name", SIMPLE_NAMES)
+@pytest.mark.parametrize("template", ["{0}(x)", "2*{0}(y[0] + 1) - x", "{0}({0}(x))*{0}", "{0}"])
+def test_matches_the_per_regex_replacer(name, template):
+    equation = template.format(name)
+
+    assert replace_math_functions(equation) == replace_per_regex(equation)
+
+
+def test_matches_the_per_regex_replacer_on_the_whole_table():
+    equation = " + ".join(f"{name}(x)" for name in SIMPLE_NAMES)
+
+    assert replace_math_functions(equation) == replace_per_regex(equation)
+
+
+@pytest.mark.parametrize("name", ["coth", "cth"])
+def test_hyperbolic_cotangent(name):
+    assert replace_math_functions(f"{name}(x)") == "(cosh(x) / sinh(x))"
+
+
+@pytest.mark.parametrize("name", ["acot", "actg", "arccot", "arcctg"])
+def test_arccotangent_keeps_its_argument_together(name):
+    assert replace_math_functions(f"{name}(x+1)") == "(atan(1 / (x+1)))"
+
+
+@pytest.mark.parametrize("equation, expected", [
+    ("coth(sin(x)*(y+1))", "(cosh(sin(x)*(y+1)) / sinh(sin(x)*(y+1)))"),
+    ("acot(acot(x))", "(atan(1 / ((atan(1 / (x))))))"),
+    ("coth(ch(x))", "(cosh(cosh(x)) / sinh(cosh(x)))"),
+    (
+        "2*coth(acot(x)*(x-1))/tg(x)",
+        "2*(cosh((atan(1 / (x)))*(x-1)) / sinh((atan(1 / (x)))*(x-1)))/tan(x)"
+    )
+])
+def test_nested_calls(equation, expected):
+    assert replace_math_functions(equation) == expected
+
+
+@pytest.mark.parametrize("equation, expected", [
+    ("coth(x)*cth(x)", "(cosh(x) / sinh(x))*(cosh(x) / sinh(x))"),
+    ("acot(x)+arcctg(y[0])", "(atan(1 / (x)))+(atan(1 / (y[0])))"),
+    ("tg(x)ctg(x)", "tan(x)cot(x)"),
+    ("sh(x)+sinh(x)+ch(ln(x))", "sinh(x)+sinh(x)+cosh(log10(x))")
+])
+def test_adjacent_calls(equation, expected):
+    assert replace_math_functions(equation) == expected
+
+
+@pytest.mark.parametrize("equation", ["coth(x", "acot", "arcsinh(x)", "x*y[0]"])
+def test_leaves_unknown_and_incomplete_calls(equation):
+    assert replace_math_functions(equation) == equation
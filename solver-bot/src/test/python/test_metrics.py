@@ -0,0 +1,54 @@
+import pytest
+
+from monitoring import collectors
+from monitoring.metrics import CallbackMetric, Counter, Histogram, render
+
+
+def test_unlabeled_metrics_are_exported_from_the_start():
+    counter = Counter("test_requests_total", "Requests")
+
+    assert counter.render().splitlines()[-1] == "test_requests_total 0.0"
+
+
+def test_labeled_children_are_created_by_the_factory():
+    histogram = Histogram("test_duration_seconds", "Duration", ("stage",), buckets=(1, 0.1))
+    histogram.labels("solve").observe(0.5)
+
+    assert histogram.render().splitlines()[2:] == [
+        'test_duration_seconds_bucket{stage="solve",le="0.1"} 0.0',
+        'test_duration_seconds_bucket{stage="solve",le="1.0"} 1.0',
+        'test_duration_seconds_bucket{stage="solve",le="+Inf"} 1.0',
+        'test_duration_seconds_sum{stage="solve"} 0.5',
+        'test_duration_seconds_count{stage="solve"} 1.0'
+    ]
+
+    with pytest.raises(ValueError):
+        histogram.labels()
+
+
+def test_callback_metrics_are_read_when_rendered():
+    values = {("a",): 1}
+    metric = CallbackMetric("test_entries", "Entries", "gauge", ("cache",), lambda: values)
+    values[("b",)] = 2
+
+    assert metric.render().splitlines()[2:] == ['test_entries{cache="a"} 1.0', 'test_entries{cache="b"} 2.0']
+
+    with pytest.raises(TypeError):
+        metric.labels("a")
+
+
+def test_collectors_are_registered_once():
+    collectors.register_collectors()
+    collectors.register_collectors()
+
+    assert render().count("# TYPE solver_bot_cache_hits_total ") == 1
+
+
+def test_equation_cache_is_exported(monkeypatch):
+    monkeypatch.setattr(collectors, "format_equation_cache_info", lambda: {
+        "hits": 5, "misses": 4, "size": 4, "max_size": 1024, "persistent_hits": 3, "persistent_misses": 1
+    })
+
+    assert collectors.cache_counts("hits")[("equation",)] == 8
+    # Conversions, the persistent hits only missed the memory tier
+    assert collectors.cache_counts("misses")[("equation",)] == 1
@@ -0,0 +1,64 @@
+import math
+
+import pytest
+
+from solver.local_solver import solve
+
+# Final y of NumericalMethods.java with a fixed h = 0.1: y' = y, y(0) = 1 solved to x = 1
+# and y'' = -y, y(0) = 1, y'(0) = 0 solved to x = 2.
+# The kernels were transcribed term for term from the Java code and evaluated in doubles,
+# which are the same IEEE 754 operations Java performs.
+JAVA_RESULTS = {
+    "euler": {
+        "growth": [2.5937424601],
+        "oscillator": [-0.45301865001711583, -1.0074542881365074]
+    },
+    "midpoint": {
+        "growth": [2.714080846608224],
+        "oscillator": [-0.41927120244992866, -0.9081364311401705]
+    },
+    "heun": {
+        "growth": [2.714080846608224],
+        "oscillator": [-0.41927120244992866, -0.9081364311401705]
+    },
+    "runge_kutta": {
+        "growth": [2.718279744135166],
+        "oscillator": [-0.41614526873411334, -0.9092979917935007]
+    },
+    "dormand_prince": {
+        "growth": [2.7182818347970907],
+        "oscillator": [-0.41614683512494965, -0.9092974214354939]
+    }
+}
+
+PROBLEMS = {
+    "growth": ("y[0]", 1, [1.0], 1.0),
+    "oscillator": ("-y[0]", 2, [1.0, 0.0], 2.0)
+}
+
+
+@pytest.mark.parametrize("method", JAVA_RESULTS)
+@pytest.mark.parametrize("problem", PROBLEMS)
+def test_matches_java_results(method, problem):
+    equation, order, initial_y, reach_point = PROBLEMS[problem]
+
+    data = solve(method, equation, order, 0.0, initial_y, reach_point, 0.1)
+
+    assert data["solution"][0] == pytest.approx(reach_point, abs=1e-12)
+    # NumPy may combine the stages in another order, so the last bits can differ
+    assert data["solution"][1:] == pytest.approx(JAVA_RESULTS[method][problem], rel=1e-12)
+
+
+@pytest.mark.parametrize("method", JAVA_RESULTS)
+def test_records_every_step(method):
+    data = solve(method, "y[0]", 1, 0.0, [1.0], 1.0, 0.1)
+
+    assert len(data["xvalues"]) == 10
+    assert data["yvalues"].shape == (10, 1)
+    assert data["yvalues"][-1][0] == data["solution"][1]
+
+
+def test_high_order_methods_converge():
+    data = solve("dormand_prince", "y[0]", 1, 0.0, [1.0], 1.0, 0.01)
+
+    assert data["solution"][1] == pytest.approx(math.e, rel=1e-12)
@@ -0,0 +1,74 @@
+import math
+
+import pytest
+
+from solver.local_solver import LocalSolverError, solve
+from solver.preflight import PreflightRejection, check_equation
+
+
+def rejection(formatted_equation, order, initial_ys, initial_x=0.0, reach_point=1.0):
+    with pytest.raises(PreflightRejection) as info:
+        check_equation(formatted_equation, order, initial_x, initial_ys, reach_point)
+    return info.value
+
+
+@pytest.mark.parametrize("formatted_equation, order, initial_ys", [
+    ("y[0]", 1, [[1.0]]),
+    ("-y[1] - 4 * y[0]", 2, [[1.0, 0.0]]),
+    ("sin(x) * y[0] - cos(x)", 1, [[1.0], [-3.0]]),
+    # Only defined for y > 200 x, which the solution keeps to
+    ("100 * y[0] + sqrt(y[0] - 200 * x)", 1, [[1.0]]),
+    ("log(y[0])", 1, [[2.0]]),
+    # A NaN at a single point is passed by the steps
+    ("sin(x - 0.5) / (x - 0.5) * y[0]", 1, [[1.0]]),
+    # The y dependent exponent can make the power 1 whatever the base
+    ("y[0] ^ sqrt(0.5 - x)", 1, [[1.0]])
+])
+def test_accepts_solvable_equations(formatted_equation, order, initial_ys):
+    assert check_equation(formatted_equation, order, 0.0, initial_ys, 1.0) is True
+
+
+def test_accepted_domain_restricted_equation_solves():
+    data = solve("runge_kutta", "100 * y[0] + sqrt(y[0] - 200 * x)", 1, 0.0, [1.0], 1.0, 0.001)
+
+    assert all(math.isfinite(value) for value in data["solution"])
+    assert min(y[0] - 200 * x for x, y in zip(data["xvalues"], data["yvalues"])) > 0
+
+
+def test_rejects_nan_at_the_initial_state():
+    e = rejection("log(x - 2) + y[0]", 1, [[1.0]])
+
+    assert (e.reason, e.x, e.y) == ("nan", 0.0, [1.0])
+
+
+def test_rejects_infinite_at_the_initial_state_of_any_sweep_trajectory():
+    e = rejection("1 / y[0]", 1, [[1.0], [0.0], [2.0]])
+
+    assert (e.reason, e.x, e.y) == ("infinite", 0.0, [0.0])
+
+
+@pytest.mark.parametrize("formatted_equation, order, first_x", [
+    ("sqrt(0.5 - x) * y[0]", 1, 0.5),
+    ("y[0] + sqrt(-x)", 1, 0.0),
+    ("asin(2 * x) + y[1]", 2, 0.5),
+    ("sin(y[0] + log(0.25 - x))", 1, 0.25)
+])
+def test_rejects_parts_undefined_whatever_y(formatted_equation, order, first_x):
+    e = rejection(formatted_equation, order, [[1.0] * order])
+
+    assert e.reason == "undefined"
+    assert first_x < e.x < first_x + 1 / 15
+    assert e.y is None
+
+
+def test_rejected_equation_fails_the_solve():
+    with pytest.raises(LocalSolverError):
+        solve("runge_kutta", "sqrt(0.5 - x) * y[0]", 1, 0.0, [1.0], 1.0, 0.01)
+
+
+def test_interval_is_not_checked_without_steps():
+    assert check_equation("sqrt(0.5 - x) * y[0]", 1, 0.25, [[1.0]], 0.0) is True
+
+
+def test_unsupported_equations_are_left_to_the_backend():
+    assert check_equation("foo(x)", 1, 0.0, [[1.0]], 1.0) is False
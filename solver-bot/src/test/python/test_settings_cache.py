@@ -0,0 +1,81 @@
+import asyncio
+
+from aiohttp import web
+
+from caching.settings_cache import SettingsCache
+from stub_server import stub_backend
+
+DEFAULTS = {"method": "rungeKutta", "rounding": "4", "language": "en", "hints": "true"}
+
+
+def users_route(release, statuses):
+    async def store_users(request):
+        await release.wait()
+        return web.Response(status=statuses.pop(0) if statuses else 200)
+
+    return [web.post("/users", store_users)]
+
+
+def test_ensure_stored_waits_for_the_write_in_flight():
+    async def run():
+        release = asyncio.Event()
+
+        async with stub_backend(users_route(release, [])) as requests:
+            cache = SettingsCache(DEFAULTS)
+            cache.update(1, {})
+
+            flush = asyncio.create_task(cache.flush())
+            await asyncio.sleep(0.05)
+            assert 1 not in cache._dirty
+
+            ensure = asyncio.create_task(cache.ensure_stored(1))
+            await asyncio.sleep(0.05)
+            assert not ensure.done()
+
+            release.set()
+            await asyncio.gather(flush, ensure)
+
+            assert cache._entries[1]["stored"]
+            assert requests == [("POST", "/users")]
+            assert not cache._in_flight
+
+    asyncio.run(run())
+
+
+def test_ensure_stored_writes_again_after_a_failed_write():
+    async def run():
+        release = asyncio.Event()
+
+        async with stub_backend(users_route(release, [500])) as requests:
+            cache = SettingsCache(DEFAULTS)
+            cache.update(1, {})
+
+            flush = asyncio.create_task(cache.flush())
+            await asyncio.sleep(0.05)
+            ensure = asyncio.create_task(cache.ensure_stored(1))
+            await asyncio.sleep(0.05)
+
+            release.set()
+            results = await asyncio.gather(flush, ensure, return_exceptions=True)
+
+            assert isinstance(results[0], Exception)
+            assert results[1] is None
+            assert cache._entries[1]["stored"]
+            assert 1 not in cache._dirty
+            assert requests == [("POST", "/users"), ("POST", "/users")]
+
+    asyncio.run(run())
+
+
+def test_ensure_stored_skips_stored_users():
+    async def run():
+        async with stub_backend(users_route(asyncio.Event(), [])) as requests:
+            cache = SettingsCache(DEFAULTS)
+            await cache.ensure_stored(1)
+
+            cache._entries[2] = {"settings": dict(DEFAULTS), "loaded_at": 0, "stored": True}
+            await cache.ensure_stored(2)
+
+            assert requests == []
+
+    asyncio.run(run())
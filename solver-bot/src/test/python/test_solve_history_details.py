@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+from types import SimpleNamespace
+
+from aiohttp import web
+
+import shell
+from stub_server import stub_backend
+
+
+class FakeQuery:
+    def __init__(self, data):
+        self.data = data
+        self.answered = False
+        self.edited_texts = []
+
+    async def answer(self):
+        self.answered = True
+
+    async def edit_message_text(self, text, **kwargs):
+        self.edited_texts.append(text)
+
+    async def edit_message_media(self, **kwargs):
+        raise AssertionError("an application without results has no plot")
+
+
+class FakeHistoryCache:
+    def __init__(self, applications):
+        self.applications = applications
+
+    async def get(self, user_id):
+        return self.applications
+
+
+class FakeSolutionCache:
+    def __init__(self):
+        self.entries = {}
+
+    async def get(self, key):
+        return self.entries.get(key)
+
+    async def put(self, key, entry):
+        self.entries[key] = entry
+
+
+def test_application_without_results_shows_an_error(monkeypatch):
+    application = {
+        "id": 7,
+        "status": "in_progress",
+        "parameters": json.dumps({"method": "euler", "order": 1, "userEquation": "y"})
+    }
+    solution_cache = FakeSolutionCache()
+    monkeypatch.setattr(shell, "get_history_cache", lambda: FakeHistoryCache([application]))
+    monkeypatch.setattr(shell, "get_solution_cache", lambda: solution_cache)
+
+    async def no_results(request):
+        return web.json_response([])
+
+    async def run():
+        async with stub_backend([web.get("/results/{application_id}", no_results)]) as requests:
+            query = FakeQuery("application_0")
+            update = SimpleNamespace(callback_query=query, effective_user=SimpleNamespace(id=1))
+            context = SimpleNamespace(user_data={"language": "en"})
+
+            state = await shell.solve_history_details(update, context)
+
+            assert state == shell.MENU
+            assert query.answered
+            assert query.edited_texts == [shell.LANG_TEXTS["en"]["error_displaying_application"]]
+            assert solution_cache.entries == {}
+            assert requests == [("GET", "/results/7")]
+
+    asyncio.run(run())
@@ -0,0 +1,167 @@
+import asyncio
+
+from concurrency.solve_queue import SolveQueue
+from concurrency.update_processor import PerUserUpdateProcessor, released_update_slot
+from test_update_processor import user_update
+
+
+async def hold(queue, events, name, release, on_queued=None):
+    async with queue.slot(on_queued=on_queued) as queued:
+        events.append((name, queued))
+        await release.wait()
+
+
+def test_solves_over_capacity_wait_in_arrival_order():
+    async def run():
+        queue = SolveQueue(2)
+        events = []
+        releases = [asyncio.Event() for _ in range(5)]
+
+        tasks = [asyncio.create_task(hold(queue, events, i, releases[i])) for i in range(5)]
+        await asyncio.sleep(0)
+
+        assert events == [(0, False), (1, False)]
+        assert (queue.active, queue.waiting) == (2, 3)
+
+        releases[1].set()
+        await asyncio.sleep(0)
+        # The freed slot goes to the first waiter, not to a solve arriving meanwhile
+        late = asyncio.create_task(hold(queue, events, 5, asyncio.Event()))
+        await asyncio.sleep(0)
+
+        assert events[2:] == [(2, True)]
+        assert (queue.active, queue.waiting) == (2, 3)
+
+        for release in releases:
+            release.set()
+        await asyncio.sleep(0.01)
+
+        assert [name for name, _ in events] == [0, 1, 2, 3, 4, 5]
+        late.cancel()
+        await asyncio.gather(*tasks, late, return_exceptions=True)
+        assert (queue.active, queue.waiting) == (0, 0)
+
+    asyncio.run(run())
+
+
+def test_queued_solves_learn_their_position():
+    async def run():
+        queue = SolveQueue(1)
+        positions = []
+        release = asyncio.Event()
+
+        async def on_queued(position):
+            positions.append(position)
+            if position == 2:
+                raise RuntimeError("message was deleted")
+
+        tasks = [
+            asyncio.create_task(hold(queue, [], i, release, on_queued=on_queued))
+            for i in range(4)
+        ]
+        await asyncio.sleep(0)
+
+        assert positions == [1, 2, 3]
+
+        # A failed report does not lose the place in the queue
+        release.set()
+        await asyncio.gather(*tasks)
+        assert (queue.active, queue.waiting) == (0, 0)
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def run():
+        queue = SolveQueue(1)
+        events = []
+        release = asyncio.Event()
+
+        first = asyncio.create_task(hold(queue, events, 0, release))
+        second = asyncio.create_task(hold(queue, events, 1, release))
+        third = asyncio.create_task(hold(queue, events, 2, release))
+        await asyncio.sleep(0)
+
+        second.cancel()
+        await asyncio.sleep(0)
+        assert queue.waiting == 1
+
+        release.set()
+        await asyncio.gather(first, third)
+
+        assert events == [(0, False), (2, True)]
+        assert (queue.active, queue.waiting) == (0, 0)
+
+    asyncio.run(run())
+
+
+def test_slot_handed_over_to_a_cancelled_waiter_is_passed_on():
+    async def run():
+        queue = SolveQueue(1)
+        events = []
+        releases = [asyncio.Event() for _ in range(3)]
+
+        tasks = [asyncio.create_task(hold(queue, events, i, releases[i])) for i in range(3)]
+        await asyncio.sleep(0)
+
+        # The first solve hands its slot to the second, which is cancelled before it runs
+        releases[0].set()
+        await asyncio.sleep(0)
+        assert queue.waiting == 1
+        tasks[1].cancel()
+
+        releases[2].set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert isinstance(results[1], asyncio.CancelledError)
+        assert events == [(0, False), (2, True)]
+        assert (queue.active, queue.waiting) == (0, 0)
+
+    asyncio.run(run())
+
+
+def test_queued_solves_give_their_update_slot_up():
+    async def run():
+        processor = PerUserUpdateProcessor(2)
+        queue = SolveQueue(1)
+        release = asyncio.Event()
+        processed = []
+
+        async def solve(tag):
+            async with queue.slot(while_queued=released_update_slot):
+                processed.append(tag)
+                await release.wait()
+
+        async def start(tag):
+            processed.append(tag)
+
+        solves = [
+            asyncio.create_task(processor.process_update(user_update(i, i), solve(("solve", i))))
+            for i in range(4)
+        ]
+        await asyncio.sleep(0.01)
+        assert queue.waiting == 3
+
+        # Two update slots, yet other users are served while three solves wait
+        await asyncio.wait_for(asyncio.gather(*(
+            processor.process_update(user_update(100 + i, 100 + i), start(("start", i)))
+            for i in range(3)
+        )), timeout=1)
+
+        assert processed == [("solve", 0)] + [("start", i) for i in range(3)]
+
+        release.set()
+        await asyncio.gather(*solves)
+
+        assert [tag for tag in processed if tag[0] == "solve"] == [("solve", i) for i in range(4)]
+        assert processor._slots._value == 2
+
+    asyncio.run(run())
+
+
+def test_update_slot_is_kept_outside_the_processor():
+    async def run():
+        async with released_update_slot():
+            pass
+
+    asyncio.run(run())
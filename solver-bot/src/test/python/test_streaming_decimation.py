@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from plotting.decimation import StreamingDecimator, decimate
+
+
+def split(size, rng):
+    """Random chunk boundaries, often not aligned to the buckets."""
+    cuts = np.sort(rng.choice(np.arange(1, size), size=min(size - 1, rng.integers(0, 12)), replace=False))
+    return np.split(np.arange(size), cuts)
+
+
+def expected_indices(y_values, keys, max_points):
+    indices = np.arange(len(y_values), dtype=float)
+    kept = [decimate(indices, y_values[:, key], max_points)[0] for key in keys]
+    return np.unique(np.concatenate(kept)).astype(int)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_chunked_input_matches_decimate_of_every_column(seed):
+    rng = np.random.default_rng(seed)
+
+    size = int(rng.integers(1, 3000))
+    columns = int(rng.integers(1, 4))
+    max_points = int(rng.choice([4, 10, 64, 400, 5000]))
+    keys = sorted(rng.choice(columns, size=rng.integers(1, columns + 1), replace=False).tolist())
+
+    # Small integers, so buckets have ties and the first match must win as in argmin and argmax
+    y_values = rng.integers(-5, 6, size=(size, columns)).astype(float)
+    x_values = np.arange(size, dtype=float)
+
+    decimator = StreamingDecimator(size, columns, keys=keys, max_points=max_points)
+    for chunk in split(size, rng):
+        decimator.update(x_values[chunk], y_values[chunk])
+
+    x_kept, y_kept = decimator.result()
+
+    indices = expected_indices(y_values, keys, max_points)
+    np.testing.assert_array_equal(x_kept, indices)
+    np.testing.assert_array_equal(y_kept, y_values[indices])
+
+
+def test_small_input_is_kept_whole():
+    y_values = np.arange(10, dtype=float).reshape(5, 2)
+
+    decimator = StreamingDecimator(5, 2)
+    decimator.update(np.arange(3.0), y_values[:3])
+    decimator.update(np.arange(3.0, 5.0), y_values[3:])
+
+    x_kept, y_kept = decimator.result()
+
+    np.testing.assert_array_equal(x_kept, np.arange(5.0))
+    np.testing.assert_array_equal(y_kept, y_values)
+
+
+def test_empty_input():
+    x_kept, y_kept = StreamingDecimator(0, 2).result()
+
+    assert x_kept.shape == (0,)
+    assert y_kept.shape == (0, 2)
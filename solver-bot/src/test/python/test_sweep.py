@@ -0,0 +1,124 @@
+import asyncio
+
+from types import SimpleNamespace
+
+import pytest
+
+import shell
+from solver.sweep import expand_range, parse_initial_conditions
+
+
+def test_single_vector():
+    assert parse_initial_conditions("1, 2", 10) == [["1", "2"]]
+    assert parse_initial_conditions("1 2", 10) == [["1", "2"]]
+
+
+def test_vectors_separated_by_semicolons():
+    assert parse_initial_conditions("1, 0; 2, 0;", 10) == [["1", "0"], ["2", "0"]]
+
+
+def test_range_expands_into_evenly_spaced_vectors():
+    assert parse_initial_conditions("0..1:5, 2", 10) == [
+        ["0.0", "2"], ["0.25", "2"], ["0.5", "2"], ["0.75", "2"], ["1.0", "2"]
+    ]
+
+
+def test_ranges_mix_with_plain_vectors():
+    assert parse_initial_conditions("3; -1..1:3", 10) == [["3"], ["-1.0"], ["0.0"], ["1.0"]]
+
+
+def test_reversed_range_counts_down():
+    assert parse_initial_conditions("1..0:3", 10) == [["1.0"], ["0.5"], ["0.0"]]
+
+
+@pytest.mark.parametrize("value", ["0..1:0", "0..1:-2", "0..1:1", "0..1", "0..x:3", "0..1:2.5"])
+def test_invalid_ranges(value):
+    with pytest.raises(ValueError) as info:
+        parse_initial_conditions(f"{value}, 1", 10)
+
+    assert info.value.args[0] == value
+
+
+def test_one_range_per_vector():
+    with pytest.raises(ValueError) as info:
+        parse_initial_conditions("0..1:3, 0..2:3", 10)
+
+    assert info.value.args[0] == "0..2:3"
+
+
+def test_invalid_value():
+    with pytest.raises(ValueError) as info:
+        parse_initial_conditions("1; 2, y", 10)
+
+    assert info.value.args[0] == "y"
+
+
+def test_stops_after_more_than_max_vectors():
+    # A huge range is not expanded in full
+    assert len(parse_initial_conditions("0..1:1000000", 3)) == 4
+    assert len(parse_initial_conditions("1; 2; 3; 4; 5", 3)) == 4
+    assert len(parse_initial_conditions("1; 2; 3", 3)) == 3
+
+
+def test_expand_range_includes_both_bounds():
+    assert list(expand_range("-2..2:3")) == ["-2.0", "0.0", "2.0"]
+
+
+class FakeMessage:
+    def __init__(self, text):
+        self.text = text
+        self.from_user = SimpleNamespace(id=1)
+        self.replies = []
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+
+
+def enter_initial_y(text, order, max_trajectories, monkeypatch):
+    monkeypatch.setenv("SWEEP_MAX_TRAJECTORIES", str(max_trajectories))
+    message = FakeMessage(text)
+    update = SimpleNamespace(edited_message=None, message=message)
+    context = SimpleNamespace(user_data={"order": str(order), "language": "en", "hints": "false"})
+
+    state = asyncio.run(shell.initial_y(update, context))
+
+    return state, message.replies, context.user_data
+
+
+def test_handler_stores_the_sweep(monkeypatch):
+    state, replies, user_data = enter_initial_y("0..1:3, 0", 2, 10, monkeypatch)
+
+    assert state == shell.REACH_POINT
+    assert user_data["initial_y"] == ["0.0", "0"]
+    assert user_data["initial_ys"] == [["0.0", "0"], ["0.5", "0"], ["1.0", "0"]]
+
+
+def test_handler_keeps_a_single_vector_out_of_the_sweep(monkeypatch):
+    state, replies, user_data = enter_initial_y("1", 1, 10, monkeypatch)
+
+    assert state == shell.REACH_POINT
+    assert user_data["initial_y"] == ["1"]
+    assert "initial_ys" not in user_data
+
+
+def test_handler_rejects_vectors_of_the_wrong_length(monkeypatch):
+    state, replies, user_data = enter_initial_y("1, 0; 2", 2, 10, monkeypatch)
+
+    assert state == shell.INITIAL_Y
+    assert replies[0].startswith(shell.LANG_TEXTS["en"]["invalid_initial_y_count1"] + "<b><i>1</i></b>")
+    assert "initial_y" not in user_data
+
+
+def test_handler_rejects_too_many_vectors(monkeypatch):
+    state, replies, user_data = enter_initial_y("0..1:11", 1, 10, monkeypatch)
+
+    assert state == shell.INITIAL_Y
+    assert replies[0].startswith(shell.LANG_TEXTS["en"]["invalid_sweep_size"] + "<b><i>10</i></b>")
+    assert "initial_y" not in user_data
+
+
+def test_handler_reports_an_invalid_range(monkeypatch):
+    state, replies, user_data = enter_initial_y("0..1:0", 1, 10, monkeypatch)
+
+    assert state == shell.INITIAL_Y
+    assert replies[0].startswith(shell.LANG_TEXTS["en"]["invalid_initial_y"] + "<b><i>0..1:0</i></b>")
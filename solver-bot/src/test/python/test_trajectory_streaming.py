@@ -0,0 +1,128 @@
+import asyncio
+import re
+
+import numpy as np
+import pytest
+
+from aiohttp import web
+
+import spring_client
+from solver.trajectory import HEADER, TrajectoryError, encode_trajectory
+from stub_server import stub_backend
+
+TRAJECTORY_PATH = "/results/1/trajectory"
+
+
+def trajectory_handler(payload, ranges=True, truncate=0):
+    """Serves the packed trajectory, answering ranges with 206 unless ranges is False."""
+    payload = payload[:len(payload) - truncate]
+
+    async def handler(request):
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", request.headers.get("Range", ""))
+        if not ranges or match is None:
+            return web.Response(body=payload)
+
+        start = int(match.group(1))
+        end = int(match.group(2)) + 1 if match.group(2) else len(payload)
+        return web.Response(
+            status=206,
+            body=payload[start:end],
+            headers={"Content-Range": f"bytes {start}-{end - 1}/{len(payload)}"}
+        )
+
+    return handler
+
+
+async def read_all(handler, chunk_size):
+    async with stub_backend([web.get(TRAJECTORY_PATH, handler)]) as requests:
+        header = await spring_client.get_trajectory_header(1)
+        chunks = [chunk async for chunk in spring_client.stream_trajectory(1, header, chunk_size)]
+    return header, chunks, requests
+
+
+def solution(points, order):
+    x_values = np.linspace(0, 1, points)
+    y_values = np.column_stack([np.sin(x_values * (i + 1)) for i in range(order)])
+    return x_values, y_values
+
+
+@pytest.mark.parametrize("ranges", [True, False])
+def test_solution_is_reassembled_with_a_partial_last_chunk(ranges):
+    x_values, y_values = solution(1001, 2)
+    # 8 * (1 + 2) bytes per point, so chunks of 100 points and a last one of a single point
+    chunk_size = 2400
+
+    header, chunks, requests = asyncio.run(read_all(
+        trajectory_handler(encode_trajectory(x_values, y_values), ranges),
+        chunk_size
+    ))
+
+    assert header == (0, 1001, 2)
+    assert [len(x_chunk) for x_chunk, _ in chunks] == [100] * 10 + [1]
+
+    np.testing.assert_array_equal(np.concatenate([x_chunk for x_chunk, _ in chunks]), x_values)
+    np.testing.assert_array_equal(np.concatenate([y_chunk for _, y_chunk in chunks]), y_values)
+
+    if ranges:
+        # The header, then one range of x and one of y values per chunk
+        assert len(requests) == 1 + 2 * len(chunks)
+    else:
+        # The header, then the whole trajectory once
+        assert len(requests) == 2
+
+
+def test_sweep_is_reassembled_per_trajectory():
+    x_values = np.linspace(0, 1, 250)
+    y_values = np.stack([solution(250, 3)[1] * scale for scale in (1.0, -2.0, 0.5)])
+    # 8 * (1 + 3 * 3) bytes per point, so chunks of 64 points and a last one of 58
+    chunk_size = 5120
+
+    header, chunks, requests = asyncio.run(read_all(
+        trajectory_handler(encode_trajectory(x_values, y_values)),
+        chunk_size
+    ))
+
+    assert header == (3, 250, 3)
+    assert [len(x_chunk) for x_chunk, _ in chunks] == [64, 64, 64, 58]
+
+    np.testing.assert_array_equal(np.concatenate([x_chunk for x_chunk, _ in chunks]), x_values)
+    np.testing.assert_array_equal(np.concatenate([y_chunk for _, y_chunk in chunks], axis=1), y_values)
+
+    assert len(requests) == 1 + 4 * len(chunks)
+
+
+@pytest.mark.parametrize("ranges", [True, False])
+def test_truncated_trajectory_raises(ranges):
+    x_values, y_values = solution(100, 1)
+
+    with pytest.raises(TrajectoryError):
+        asyncio.run(read_all(
+            trajectory_handler(encode_trajectory(x_values, y_values), ranges, truncate=8),
+            HEADER.size * 8
+        ))
+
+
+def test_sweep_is_cut_out_of_a_whole_trajectory():
+    x_values = np.linspace(0, 1, 250)
+    y_values = np.stack([solution(250, 3)[1] * scale for scale in (1.0, -2.0, 0.5)])
+
+    header, chunks, requests = asyncio.run(read_all(
+        trajectory_handler(encode_trajectory(x_values, y_values), ranges=False),
+        5120
+    ))
+
+    np.testing.assert_array_equal(np.concatenate([x_chunk for x_chunk, _ in chunks]), x_values)
+    np.testing.assert_array_equal(np.concatenate([y_chunk for _, y_chunk in chunks], axis=1), y_values)
+
+    assert len(requests) == 2
+
+
+def test_missing_trajectory_has_no_header():
+    async def not_found(request):
+        return web.Response(status=404)
+
+    async def read_header():
+        async with stub_backend([web.get(TRAJECTORY_PATH, not_found)]):
+            return await spring_client.get_trajectory_header(1)
+
+    assert asyncio.run(read_header()) is None
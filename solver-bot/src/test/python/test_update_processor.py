@@ -0,0 +1,74 @@
+import asyncio
+
+from telegram import Update, User
+
+from concurrency.update_processor import PerUserUpdateProcessor
+
+
+def user_update(update_id, user_id):
+    update = Update(update_id)
+    # effective_user is computed from the message otherwise, the tests only need the user
+    object.__setattr__(update, "_effective_user", User(user_id, "user", False))
+    return update
+
+
+def test_updates_waiting_for_a_busy_user_do_not_take_slots():
+    async def run():
+        processor = PerUserUpdateProcessor(2)
+        release = asyncio.Event()
+        processed = []
+
+        async def slow(tag):
+            await release.wait()
+            processed.append(tag)
+
+        async def fast(tag):
+            processed.append(tag)
+
+        # One user has a long update running and many more queued behind it
+        busy = [
+            asyncio.create_task(processor.process_update(user_update(i, 1), slow(("busy", i))))
+            for i in range(10)
+        ]
+        await asyncio.sleep(0)
+
+        others = [
+            processor.process_update(user_update(100 + i, 100 + i), fast(("other", i)))
+            for i in range(5)
+        ]
+        await asyncio.wait_for(asyncio.gather(*others), timeout=1)
+
+        assert processed == [("other", i) for i in range(5)]
+        assert processor.current_concurrent_updates == 10
+
+        release.set()
+        await asyncio.gather(*busy)
+
+        # The updates of one user keep their order
+        assert processed[5:] == [("busy", i) for i in range(10)]
+        assert processor.current_concurrent_updates == 0
+
+    asyncio.run(run())
+
+
+def test_processing_is_limited():
+    async def run():
+        processor = PerUserUpdateProcessor(3)
+        running = 0
+        most_running = 0
+
+        async def work():
+            nonlocal running, most_running
+            running += 1
+            most_running = max(most_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        await asyncio.gather(*(
+            processor.process_update(user_update(i, i), work())
+            for i in range(12)
+        ))
+
+        assert most_running == 3
+
+    asyncio.run(run())
@@ -0,0 +1,115 @@
+// Solves N different jobs at the same time on the solver executor, checks that every result
+// matches the result of the same job solved alone, and reports the throughput against the sequential run.
+//
+// Usage, after mvn package in solver-common:
+//     java -cp "target/classes:$(mvn -q dependency:build-classpath -Dmdep.outputFile=/dev/stdout)" \
+//         benchmarks/ConcurrentSolveBenchmark.java [jobs] [threads]
+
+import com.solver.SolverExecutor;
+import com.solver.SolverJob;
+import com.solver.SolverRequest;
+
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.List;
+import java.util.concurrent.CompletableFuture;
+
+public class ConcurrentSolveBenchmark {
+    private static final String[] METHODS = {"euler", "midpoint", "heun", "rungeKutta", "dormandPrince"};
+
+    private static final String[][] EQUATIONS = {
+        {"1", "y[0]"},
+        {"1", "x + y[0]"},
+        {"1", "sin(x) * y[0] - cos(x)"},
+        {"2", "-y[1] - 4 * y[0]"},
+        {"3", "x - y[1] + exp(-x) * y[2]"},
+    };
+
+    public static void main(String[] args) throws Exception {
+        int jobs = args.length > 0 ? Integer.parseInt(args[0]) : 64;
+        int threads = args.length > 1 ? Integer.parseInt(args[1]) : 0;
+
+        List<SolverRequest> requests = new ArrayList<>(jobs);
+        for (int i = 0; i < jobs; i++) {
+            requests.add(request(i));
+        }
+
+        long start = System.nanoTime();
+        List<SolverJob.Solution> expected = new ArrayList<>(jobs);
+        for (SolverRequest request : requests) {
+            expected.add(new SolverJob(request).solve());
+        }
+        double sequential = (System.nanoTime() - start) / 1e9;
+
+        SolverExecutor executor = new SolverExecutor(threads, jobs);
+        try {
+            SolverJob.Solution[] actual = new SolverJob.Solution[jobs];
+
+            start = System.nanoTime();
+            CompletableFuture<?>[] futures = new CompletableFuture<?>[jobs];
+            for (int i = 0; i < jobs; i++) {
+                int index = i;
+                futures[i] = executor.submit(() -> actual[index] = new SolverJob(requests.get(index)).solve());
+            }
+            CompletableFuture.allOf(futures).join();
+            double concurrent = (System.nanoTime() - start) / 1e9;
+
+            int mismatches = 0;
+            for (int i = 0; i < jobs; i++) {
+                if (!matches(expected.get(i), actual[i])) {
+                    System.out.printf("Job %d differs from its sequential result%n", i);
+                    mismatches++;
+                }
+            }
+
+            System.out.printf("%d jobs: sequential %.3f s, concurrent %.3f s, speedup %.2fx%n",
+                jobs, sequential, concurrent, sequential / concurrent);
+
+            if (mismatches > 0) {
+                System.out.printf("FAILED: %d of %d concurrent results differ%n", mismatches, jobs);
+                System.exit(1);
+            }
+
+            System.out.println("All concurrent results match");
+        } finally {
+            executor.destroy();
+        }
+    }
+
+    // Every job has its own method, equation, initial values and length
+    private static SolverRequest request(int index) {
+        String[] equation = EQUATIONS[index % EQUATIONS.length];
+        int order = Integer.parseInt(equation[0]);
+
+        double[] initialY = new double[order];
+        for (int i = 0; i < order; i++) {
+            initialY[i] = 1.0 + index * 0.01 + i;
+        }
+
+        SolverRequest request = new SolverRequest();
+        request.setMethod(METHODS[index % METHODS.length]);
+        request.setOrder(order);
+        request.setUserEquation(equation[1]);
+        request.setFormattedEquation(equation[1]);
+        request.setInitialX(0);
+        request.setInitialY(initialY);
+        request.setReachPoint(1 + index % 3);
+        request.setStepSize(1e-4);
+        request.setMaxPoints(1000);
+
+        // Every third job is adaptive
+        if (index % 3 == 0) {
+            request.setMethod("dormandPrince");
+            request.setRelativeTolerance(1e-8);
+            request.setAbsoluteTolerance(1e-10);
+        }
+
+        return request;
+    }
+
+    private static boolean matches(SolverJob.Solution expected, SolverJob.Solution actual) {
+        return Arrays.equals(expected.solution(), actual.solution())
+            && Arrays.equals(expected.trajectory().getXValues(), actual.trajectory().getXValues())
+            && Arrays.deepEquals(expected.trajectory().getYValues(0), actual.trajectory().getYValues(0));
+    }
+}
\ No newline at end of file
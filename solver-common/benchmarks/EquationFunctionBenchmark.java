@@ -0,0 +1,98 @@
+// Compares right-hand side evaluations per second of the compiled equation function
+// with the previous implementation, which parsed the equation on every call.
+//
+// Usage, after mvn package in solver-common:
+//     java -cp "target/classes:$(mvn -q dependency:build-classpath -Dmdep.outputFile=/dev/stdout)" \
+//         benchmarks/EquationFunctionBenchmark.java [evaluations]
+
+import com.solver.CreateEquationFunction;
+import com.solver.EquationFunction;
+
+import java.util.HashMap;
+import java.util.Map;
+
+import net.objecthunter.exp4j.Expression;
+import net.objecthunter.exp4j.ExpressionBuilder;
+
+public class EquationFunctionBenchmark {
+    private static final String[][] EQUATIONS = {
+        {"1", "y[0]"},
+        {"1", "x + y[0]"},
+        {"1", "sin(x) * y[0] - cos(x)"},
+        {"2", "-y[1] - 4 * y[0]"},
+        {"3", "x - y[1] + exp(-x) * y[2]"},
+    };
+
+    private static final int WARM_UP_EVALUATIONS = 200_000;
+
+    public static void main(String[] args) {
+        int evaluations = args.length > 0 ? Integer.parseInt(args[0]) : 2_000_000;
+
+        System.out.printf("%-30s %16s %16s %9s%n", "equation", "per call, eval/s", "compiled, eval/s", "speedup");
+
+        for (String[] equation : EQUATIONS) {
+            int order = Integer.parseInt(equation[0]);
+
+            EquationFunction perCall = createPerCall(equation[1], order);
+            EquationFunction compiled = CreateEquationFunction.create(equation[1], order);
+
+            // The per call version is much slower, so it runs a tenth of the evaluations
+            run(perCall, order, WARM_UP_EVALUATIONS / 10);
+            double perCallRate = run(perCall, order, evaluations / 10);
+
+            run(compiled, order, WARM_UP_EVALUATIONS);
+            double compiledRate = run(compiled, order, evaluations);
+
+            System.out.printf("%-30s %16.0f %16.0f %8.1fx%n",
+                equation[1], perCallRate, compiledRate, compiledRate / perCallRate);
+        }
+    }
+
+    private static double run(EquationFunction function, int order, int evaluations) {
+        double[] y = new double[order];
+        double[] dydt = new double[order];
+        for (int i = 0; i < order; i++) {
+            y[i] = 1.0 + i;
+        }
+
+        double checksum = 0;
+        long start = System.nanoTime();
+        for (int i = 0; i < evaluations; i++) {
+            function.apply(i * 1e-6, y, dydt);
+            checksum += dydt[order - 1];
+        }
+        long elapsed = System.nanoTime() - start;
+
+        // Keeps the results alive, so the loop is not optimized away
+        if (checksum == 42) {
+            System.out.println();
+        }
+
+        return evaluations / (elapsed / 1e9);
+    }
+
+    // The previous implementation, which rebuilt the expression on every call
+    private static EquationFunction createPerCall(String equation, int order) {
+        return (x, y, dydt) -> {
+            System.arraycopy(y, 1, dydt, 0, order - 1);
+
+            String replaced = equation.replaceAll("y\\[(\\d+)]", "y$1");
+
+            ExpressionBuilder builder = new ExpressionBuilder(replaced).variable("x");
+            for (int i = 0; i < y.length; i++) {
+                builder.variable("y" + i);
+            }
+
+            Expression expression = builder.build();
+
+            Map<String, Double> variables = new HashMap<>();
+            variables.put("x", x);
+            for (int i = 0; i < y.length; i++) {
+                variables.put("y" + i, y[i]);
+            }
+
+            expression.setVariables(variables);
+            dydt[order - 1] = expression.evaluate();
+        };
+    }
+}
\ No newline at end of file
@@ -0,0 +1,185 @@
+// Compares fixed steps per second and bytes allocated per step of the in-place kernels
+// and primitive trajectories with the previous implementation, which allocated
+// the stage vectors and the result of every step and recorded boxed points.
+//
+// Usage, after mvn package in solver-common:
+//     java -cp "target/classes:$(mvn -q dependency:build-classpath -Dmdep.outputFile=/dev/stdout)" \
+//         benchmarks/StepThroughputBenchmark.java [steps]
+
+import com.solver.CreateEquationFunction;
+import com.solver.EquationFunction;
+import com.solver.NumericalMethods;
+import com.solver.Trajectory;
+
+import java.lang.management.ManagementFactory;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.function.BiFunction;
+
+public class StepThroughputBenchmark {
+    private static final String EQUATION = "-y[1] - 4 * y[0]";
+    private static final int ORDER = 2;
+    private static final double STEP_SIZE = 1e-6;
+
+    private static final String[] METHODS = {"euler", "rungeKutta", "dormandPrince"};
+
+    public static void main(String[] args) {
+        int steps = args.length > 0 ? Integer.parseInt(args[0]) : 2_000_000;
+
+        EquationFunction f = CreateEquationFunction.create(EQUATION, ORDER);
+        // The previous equation functions returned a new array on every call
+        BiFunction<Double, double[], double[]> allocating = (x, y) -> {
+            double[] dydt = new double[ORDER];
+            f.apply(x, y, dydt);
+            return dydt;
+        };
+
+        System.out.printf("%-15s %14s %14s %14s %14s %9s%n",
+            "method", "before, step/s", "before, B/step", "after, step/s", "after, B/step", "speedup");
+
+        for (String method : METHODS) {
+            runBefore(allocating, method, steps / 10);
+            Result before = runBefore(allocating, method, steps);
+
+            runAfter(f, method, steps / 10);
+            Result after = runAfter(f, method, steps);
+
+            System.out.printf("%-15s %14.0f %14.1f %14.0f %14.1f %8.1fx%n",
+                method, before.rate, before.bytesPerStep, after.rate, after.bytesPerStep, after.rate / before.rate);
+        }
+    }
+
+    private record Result(double rate, double bytesPerStep) {}
+
+    private static long allocatedBytes() {
+        return ((com.sun.management.ThreadMXBean) ManagementFactory.getThreadMXBean()).getCurrentThreadAllocatedBytes();
+    }
+
+    private static Result runBefore(BiFunction<Double, double[], double[]> f, String method, int steps) {
+        List<Double> xValues = new ArrayList<>();
+        List<double[]> yValues = new ArrayList<>();
+
+        double x = 0;
+        double[] y = {1.0, 0.0};
+
+        long bytes = allocatedBytes();
+        long start = System.nanoTime();
+        for (int i = 0; i < steps; i++) {
+            double[] result = switch (method) {
+                case "euler" -> Legacy.euler(f, x, y, STEP_SIZE);
+                case "rungeKutta" -> Legacy.rungeKutta(f, x, y, STEP_SIZE);
+                default -> Legacy.dormandPrince(f, x, y, STEP_SIZE);
+            };
+            x = result[0];
+            y = new double[result.length - 1];
+            System.arraycopy(result, 1, y, 0, result.length - 1);
+
+            xValues.add(x);
+            yValues.add(y.clone());
+        }
+        long elapsed = System.nanoTime() - start;
+
+        return new Result(steps / (elapsed / 1e9), (double) (allocatedBytes() - bytes) / steps);
+    }
+
+    private static Result runAfter(EquationFunction f, String method, int steps) {
+        // Sized from the number of steps as in SolverJob, longer runs grow the columns
+        Trajectory trajectory = new Trajectory(1, ORDER, steps);
+        NumericalMethods.Stages stages = new NumericalMethods.Stages(ORDER);
+
+        double x = 0;
+        double[] y = {1.0, 0.0};
+
+        long bytes = allocatedBytes();
+        long start = System.nanoTime();
+        for (int i = 0; i < steps; i++) {
+            switch (method) {
+                case "euler" -> NumericalMethods.euler(f, x, y, STEP_SIZE, y, stages);
+                case "rungeKutta" -> NumericalMethods.rungeKutta(f, x, y, STEP_SIZE, y, stages);
+                default -> NumericalMethods.dormandPrince(f, x, y, STEP_SIZE, y, stages);
+            }
+            x = x + STEP_SIZE;
+
+            trajectory.add(x, y);
+        }
+        long elapsed = System.nanoTime() - start;
+
+        return new Result(steps / (elapsed / 1e9), (double) (allocatedBytes() - bytes) / steps);
+    }
+
+    // The previous kernels, built from allocating array operations
+    private static class Legacy {
+        static double[] multiply(double scalar, double[] array) {
+            double[] result = new double[array.length];
+            for (int i = 0; i < array.length; i++) {
+                result[i] = scalar * array[i];
+            }
+            return result;
+        }
+
+        static double[] add(double[] array1, double[] array2) {
+            double[] result = new double[array1.length];
+            for (int i = 0; i < array1.length; i++) {
+                result[i] = array1[i] + array2[i];
+            }
+            return result;
+        }
+
+        static double[] withX(double x, double[] y) {
+            double[] result = new double[y.length + 1];
+            result[0] = x;
+            System.arraycopy(y, 0, result, 1, y.length);
+            return result;
+        }
+
+        static double[] euler(BiFunction<Double, double[], double[]> f, double x_0, double[] y_0, double h) {
+            double[] y_next = new double[y_0.length];
+            double[] k1 = f.apply(x_0, y_0);
+            for (int i = 0; i < y_0.length; i++) {
+                y_next[i] = y_0[i] + h * k1[i];
+            }
+            return withX(x_0 + h, y_next);
+        }
+
+        static double[] rungeKutta(BiFunction<Double, double[], double[]> f, double x_0, double[] y_0, double h) {
+            double[] y_next = new double[y_0.length];
+
+            double[] k1 = multiply(h, f.apply(x_0, y_0));
+            double[] k2 = multiply(h, f.apply(x_0 + h / 2, add(y_0, multiply(0.5, k1))));
+            double[] k3 = multiply(h, f.apply(x_0 + h / 2, add(y_0, multiply(0.5, k2))));
+            double[] k4 = multiply(h, f.apply(x_0 + h, add(y_0, k3)));
+
+            for (int i = 0; i < y_0.length; i++) {
+                y_next[i] = y_0[i] + (k1[i] + 2 * k2[i] + 2 * k3[i] + k4[i]) / 6;
+            }
+            return withX(x_0 + h, y_next);
+        }
+
+        static double[] dormandPrince(BiFunction<Double, double[], double[]> f, double x_0, double[] y_0, double h) {
+            double[] y_next = new double[y_0.length];
+
+            double[] k1 = multiply(h, f.apply(x_0, y_0));
+            double[] k2 = multiply(h, f.apply(x_0 + h / 5.0, add(y_0, multiply(1.0 / 5.0, k1))));
+            double[] k3 = multiply(h, f.apply(x_0 + h * 3.0 / 10.0, add(y_0, add(
+                multiply(3.0 / 40.0, k1), multiply(9.0 / 40.0, k2)))));
+            double[] k4 = multiply(h, f.apply(x_0 + h * 4.0 / 5.0, add(y_0, add(
+                add(multiply(44.0 / 45.0, k1), multiply(-56.0 / 15.0, k2)),
+                multiply(32.0 / 9.0, k3)))));
+            double[] k5 = multiply(h, f.apply(x_0 + h * 8.0 / 9.0, add(y_0, add(
+                add(multiply(19372.0 / 6561.0, k1),
+                    add(multiply(-25360.0 / 2187.0, k2), multiply(64448.0 / 6561.0, k3))),
+                multiply(-212.0 / 729.0, k4)))));
+            double[] k6 = multiply(h, f.apply(x_0 + h, add(y_0, add(
+                add(multiply(9017.0 / 3168.0, k1),
+                    add(multiply(-355.0 / 33.0, k2),
+                        add(multiply(46732.0 / 5247.0, k3), multiply(49.0 / 176.0, k4)))),
+                multiply(-5103.0 / 18656.0, k5)))));
+
+            for (int i = 0; i < y_0.length; i++) {
+                y_next[i] = y_0[i] + (35.0 / 384.0 * k1[i] + 500.0 / 1113.0 * k3[i]
+                        + 125.0 / 192.0 * k4[i] - 2187.0 / 6784.0 * k5[i] + 11.0 / 84.0 * k6[i]);
+            }
+            return withX(x_0 + h, y_next);
+        }
+    }
+}
\ No newline at end of file
@@ -0,0 +1,39 @@
+package com.solver;
+
+import org.slf4j.Logger;
+import org.slf4j.LoggerFactory;
+import org.springframework.stereotype.Component;
+
+import java.util.Map;
+import java.util.Set;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.ConcurrentHashMap;
+
+@Component
+public class CompletionRegistry {
+    private static final Logger logger = LoggerFactory.getLogger(CompletionRegistry.class);
+
+    private static final Set<String> TERMINAL_STATUSES = Set.of("completed", "error");
+
+    private final Map<Integer, CompletableFuture<String>> pending = new ConcurrentHashMap<>();
+
+    public static boolean isTerminal(String status) {
+        return TERMINAL_STATUSES.contains(status);
+    }
+
+    public CompletableFuture<String> register(int applicationId) {
+        return pending.computeIfAbsent(applicationId, id -> new CompletableFuture<>());
+    }
+
+    public void complete(int applicationId, String status) {
+        CompletableFuture<String> completion = pending.remove(applicationId);
+        if (completion != null) {
+            logger.debug("Notifying waiters of applicationId: {} with status: {}", applicationId, status);
+            completion.complete(status);
+        }
+    }
+
+    public void release(int applicationId) {
+        pending.remove(applicationId);
+    }
+}
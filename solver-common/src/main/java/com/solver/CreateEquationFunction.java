@@ -1,57 +1,61 @@
 package com.solver;
 
-import java.util.function.BiFunction;
-
 import net.objecthunter.exp4j.Expression;
 import net.objecthunter.exp4j.ExpressionBuilder;
 
-import java.util.Map;
-import java.util.HashMap;
-
 public class CreateEquationFunction {
-    public static BiFunction<Double, double[], double[]> create(String equation, int order) {
+    public static EquationFunction create(String equation, int order) {
         if (order < 1) {
             throw new IllegalArgumentException("Order must be at least 1");
         }
-        
-        return (x, y) -> {
-            double[] dydt = new double[order];
 
+        String[] variables = new String[order];
+        for (int i = 0; i < order; i++) {
+            variables[i] = "y" + i;
+        }
+
+        // Parsed once per job, every call only binds the variables and evaluates
+        Expression compiled = compile(equation, variables);
+
+        // Expression keeps the variable values in itself, so each worker thread evaluates its own copy
+        ThreadLocal<Expression> evaluator = ThreadLocal.withInitial(() -> new Expression(compiled));
+
+        return (x, y, dydt) -> {
             System.arraycopy(y, 1, dydt, 0, order - 1);
-            
-            dydt[order - 1] = evaluateEquation(equation, x, y);
-            return dydt;
+
+            dydt[order - 1] = evaluateEquation(evaluator.get(), equation, variables, x, y);
         };
     }
-    
-    private static double evaluateEquation(String equation, double x, double[] y) {
+
+    private static Expression compile(String equation, String[] variables) {
         try {
-            equation = equation.replaceAll("y\\[(\\d+)]", "y$1");
-            
-            ExpressionBuilder builder = new ExpressionBuilder(equation).variable("x");
-            
-            for (int i = 0; i < y.length; i++) {
-                builder.variable("y" + i);
-            }
-            
-            Expression expression = builder.build();
-            
-            Map<String, Double> variables = new HashMap<>();
-            variables.put("x", x);
-            for (int i = 0; i < y.length; i++) {
-                variables.put("y" + i, y[i]);
+            return new ExpressionBuilder(equation.replaceAll("y\\[(\\d+)]", "y$1"))
+                .variable("x")
+                .variables(variables)
+                .build();
+        } catch (Exception e) {
+            throw new SolverException("Error compiling equation: " + equation, e);
+        }
+    }
+
+    private static double evaluateEquation(Expression expression, String equation, String[] variables, double x, double[] y) {
+        try {
+            expression.setVariable("x", x);
+            for (int i = 0; i < variables.length; i++) {
+                expression.setVariable(variables[i], y[i]);
             }
-            
-            expression.setVariables(variables);
+
             double result = expression.evaluate();
-            
+
             if (Double.isNaN(result)) {
                 throw new SolverException("Result is NaN at x = " + x);
             }
-            
+
             return result;
+        } catch (SolverException e) {
+            throw e;
         } catch (ArithmeticException e) {
-            if (e.getMessage().contains("Division by zero")) {
+            if (e.getMessage() != null && e.getMessage().contains("Division by zero")) {
                 throw new SolverException("Division by zero occurred at x = " + x);
             }
             throw new SolverException("Arithmetic error in equation: " + equation, e);
@@ -11,6 +11,8 @@ import org.springframework.stereotype.Service;
 import org.springframework.transaction.annotation.Transactional;
 
 import java.util.concurrent.CompletableFuture;
+import java.util.ArrayList;
+import java.util.Collections;
 import java.util.HashMap;
 import java.util.List;
 import java.util.Map;
@@ -89,6 +91,38 @@ public class DBService {
         });
     }
 
+    @Async
+    @Transactional
+    public CompletableFuture<Integer> setUserSettingsBatch(List<UserSettings> settings) {
+        logger.debug("Setting user settings for {} users", settings.size());
+        return CompletableFuture.supplyAsync(() -> {
+            String query = """
+                INSERT INTO users (id, method, rounding, language, hints)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE
+                SET method = EXCLUDED.method,
+                    rounding = EXCLUDED.rounding,
+                    language = EXCLUDED.language,
+                    hints = EXCLUDED.hints
+                """;
+
+            try {
+                // One round trip for the whole batch
+                jdbcTemplate.batchUpdate(query, settings, settings.size(), (ps, user) -> {
+                    ps.setInt(1, user.getId());
+                    ps.setString(2, user.getMethod());
+                    ps.setString(3, user.getRounding());
+                    ps.setString(4, user.getLanguage());
+                    ps.setBoolean(5, Boolean.TRUE.equals(user.getHints()));
+                });
+                return settings.size();
+            } catch (DataAccessException e) {
+                logger.error("Database error while setting user settings for {} users", settings.size(), e);
+                throw new SolverException("Failed to save user settings", e);
+            }
+        });
+    }
+
     @Async
     @Transactional
     public CompletableFuture<Integer> createApplication(String parameters, String status, Integer userId) {
@@ -116,17 +150,33 @@ public class DBService {
 
     @Async
     @Transactional
-    public CompletableFuture<List<Map<String, Object>>> getApplications(Integer userId) {
-        logger.debug("Fetching applications for userId: {}", userId);
+    public CompletableFuture<List<Map<String, Object>>> getApplications(Integer userId, Integer limit, List<String> statuses) {
+        logger.debug("Fetching applications for userId: {}, limit: {}, statuses: {}", userId, limit, statuses);
         return CompletableFuture.supplyAsync(() -> {
-            String query = """
+            StringBuilder query = new StringBuilder("""
                 SELECT id, parameters, status, created_at, last_updated_at
                 FROM applications
                 WHERE user_id = ?
-                ORDER BY created_at DESC
-                """;
+                """);
+            List<Object> arguments = new ArrayList<>();
+            arguments.add(userId);
+
+            if (statuses != null && !statuses.isEmpty()) {
+                query.append("AND status IN (")
+                    .append(String.join(", ", Collections.nCopies(statuses.size(), "?")))
+                    .append(")\n");
+                arguments.addAll(statuses);
+            }
+
+            query.append("ORDER BY created_at DESC\n");
+
+            if (limit != null) {
+                query.append("LIMIT ?\n");
+                arguments.add(limit);
+            }
+
             try {
-                return jdbcTemplate.query(query, (rs, rowNum) -> {
+                return jdbcTemplate.query(query.toString(), (rs, rowNum) -> {
                     Map<String, Object> application = new HashMap<>();
                     application.put("id", rs.getInt("id"));
                     application.put("parameters", rs.getString("parameters"));
@@ -134,7 +184,7 @@ public class DBService {
                     application.put("created_at", rs.getString("created_at"));
                     application.put("last_updated_at", rs.getString("last_updated_at"));
                     return application;
-                }, userId);
+                }, arguments.toArray());
             } catch (DataAccessException e) {
                 logger.error("Database error while fetching applications for userId: {}", userId, e);
                 throw new SolverException("Failed to fetch applications", e);
@@ -167,6 +217,53 @@ public class DBService {
         });
     }
 
+    @Async
+    @Transactional
+    public CompletableFuture<Optional<byte[]>> getTrajectory(Integer applicationId) {
+        logger.debug("Fetching trajectory for applicationId: {}", applicationId);
+        return CompletableFuture.supplyAsync(() -> {
+            String query = """
+                SELECT trajectory
+                FROM results
+                WHERE application_id = ? AND trajectory IS NOT NULL
+                """;
+            try {
+                List<byte[]> trajectories = jdbcTemplate.queryForList(query, byte[].class, applicationId);
+                return trajectories.isEmpty() ? Optional.empty() : Optional.of(trajectories.getFirst());
+            } catch (DataAccessException e) {
+                logger.error("Database error while fetching trajectory for applicationId: {}", applicationId, e);
+                throw new SolverException("Failed to fetch trajectory", e);
+            }
+        });
+    }
+
+    // Reads length bytes of the trajectory from the zero based start,
+    // together with the total size of the trajectory
+    @Async
+    @Transactional
+    public CompletableFuture<Optional<Map<String, Object>>> getTrajectoryRange(Integer applicationId, int start, int length) {
+        logger.debug("Fetching trajectory range {}+{} for applicationId: {}", start, length, applicationId);
+        return CompletableFuture.supplyAsync(() -> {
+            String query = """
+                SELECT substring(trajectory FROM ? FOR ?) AS chunk, octet_length(trajectory) AS total
+                FROM results
+                WHERE application_id = ? AND trajectory IS NOT NULL
+                """;
+            try {
+                List<Map<String, Object>> ranges = jdbcTemplate.query(query, (rs, rowNum) -> {
+                    Map<String, Object> range = new HashMap<>();
+                    range.put("chunk", rs.getBytes("chunk"));
+                    range.put("total", rs.getInt("total"));
+                    return range;
+                }, start + 1, length, applicationId);
+                return ranges.isEmpty() ? Optional.empty() : Optional.of(ranges.getFirst());
+            } catch (DataAccessException e) {
+                logger.error("Database error while fetching trajectory range for applicationId: {}", applicationId, e);
+                throw new SolverException("Failed to fetch trajectory range", e);
+            }
+        });
+    }
+
     @Async
     @Transactional
     public CompletableFuture<Optional<String>> getApplicationStatus(int applicationId) {
@@ -208,15 +305,15 @@ public class DBService {
 
     @Async
     @Transactional
-    public CompletableFuture<Void> saveResults(int applicationId, String results) {
+    public CompletableFuture<Void> saveResults(int applicationId, String results, byte[] trajectory) {
         logger.debug("Saving results for applicationId: {}", applicationId);
         return CompletableFuture.runAsync(() -> {
             String query = """
-                INSERT INTO results (application_id, data)
-                VALUES (?, ?::jsonb)
+                INSERT INTO results (application_id, data, trajectory)
+                VALUES (?, ?::jsonb, ?)
                 """;
             try {
-                jdbcTemplate.update(query, applicationId, results);
+                jdbcTemplate.update(query, applicationId, results, trajectory);
             } catch (DataAccessException e) {
                 logger.error("Database error while saving results for applicationId: {}", applicationId, e);
                 throw new SolverException("Failed to save results", e);
@@ -224,6 +321,39 @@ public class DBService {
         });
     }
 
+    @Async
+    @Transactional
+    public CompletableFuture<Integer> createCompletedApplication(
+            Integer userId, String parameters, String results, byte[] trajectory) {
+        logger.debug("Recording completed application for userId: {}", userId);
+        return CompletableFuture.supplyAsync(() -> {
+            // One statement, so there is never a completed application without results
+            String query = """
+                WITH application AS (
+                    INSERT INTO applications (user_id, parameters, status)
+                    VALUES (?, ?::jsonb, 'completed')
+                    RETURNING id
+                )
+                INSERT INTO results (application_id, data, trajectory)
+                SELECT id, ?::jsonb, ? FROM application
+                RETURNING application_id
+                """;
+            try {
+                return jdbcTemplate.queryForObject(
+                    query,
+                    (rs, rowNum) -> rs.getInt("application_id"),
+                    userId,
+                    parameters,
+                    results,
+                    trajectory
+                );
+            } catch (DataAccessException e) {
+                logger.error("Database error while recording application for userId: {}", userId, e);
+                throw new SolverException("Failed to record application", e);
+            }
+        });
+    }
+
     @Async
     @Scheduled(cron = "0 0 0,12 * * *") // Runs every day at midnight and noon
     @Transactional
@@ -0,0 +1,8 @@
+package com.solver;
+
+// Right-hand side of the first order system, writes dy/dx at (x, y) into dydt.
+// Callers pass a dydt array that is not y, so the function can fill it without temporaries.
+@FunctionalInterface
+public interface EquationFunction {
+    void apply(double x, double[] y, double[] dydt);
+}
\ No newline at end of file
@@ -1,144 +1,224 @@
 package com.solver;
 
-import java.util.function.BiFunction;
-
+// The steps write into buffers owned by the caller, so stepping allocates nothing.
+// y_next may be the same array as y_0 for the fixed step methods,
+// it is only written after the last stage.
 public class NumericalMethods {
-    public static double[] dormandPrince(BiFunction<Double, double[], double[]> f, double x_0, double[] y_0, double h) {
-        double[] k1 = new double[y_0.length];
-        double[] k2 = new double[y_0.length];
-        double[] k3 = new double[y_0.length];
-        double[] k4 = new double[y_0.length];
-        double[] k5 = new double[y_0.length];
-        double[] k6 = new double[y_0.length];
-    
-        double[] temp = new double[y_0.length];
-        double[] y_next = new double[y_0.length];
-    
-        k1 = ArrayOperations.multiply(h, f.apply(x_0, y_0));
-        temp = ArrayOperations.add(y_0, ArrayOperations.multiply(1.0 / 5.0, k1));
-        k2 = ArrayOperations.multiply(h, f.apply(x_0 + h / 5.0, temp));
-        temp = ArrayOperations.add(y_0, ArrayOperations.add(
-                ArrayOperations.multiply(3.0 / 40.0, k1),
-                ArrayOperations.multiply(9.0 / 40.0, k2)));
-        k3 = ArrayOperations.multiply(h, f.apply(x_0 + h * 3.0 / 10.0, temp));
-        temp = ArrayOperations.add(y_0, ArrayOperations.add(
-                ArrayOperations.add(ArrayOperations.multiply(44.0 / 45.0, k1),
-                        ArrayOperations.multiply(-56.0 / 15.0, k2)),
-                ArrayOperations.multiply(32.0 / 9.0, k3)));
-        k4 = ArrayOperations.multiply(h, f.apply(x_0 + h * 4.0 / 5.0, temp));
-        temp = ArrayOperations.add(y_0, ArrayOperations.add(
-                ArrayOperations.add(ArrayOperations.multiply(19372.0 / 6561.0, k1),
-                        ArrayOperations.add(ArrayOperations.multiply(-25360.0 / 2187.0, k2),
-                                ArrayOperations.multiply(64448.0 / 6561.0, k3))),
-                ArrayOperations.multiply(-212.0 / 729.0, k4)));
-        k5 = ArrayOperations.multiply(h, f.apply(x_0 + h * 8.0 / 9.0, temp));
-        temp = ArrayOperations.add(y_0, ArrayOperations.add(
-                ArrayOperations.add(ArrayOperations.multiply(9017.0 / 3168.0, k1),
-                        ArrayOperations.add(ArrayOperations.multiply(-355.0 / 33.0, k2),
-                                ArrayOperations.add(ArrayOperations.multiply(46732.0 / 5247.0, k3),
-                                        ArrayOperations.multiply(49.0 / 176.0, k4)))),
-                ArrayOperations.multiply(-5103.0 / 18656.0, k5)));
-        k6 = ArrayOperations.multiply(h, f.apply(x_0 + h, temp));
-    
-        for (int i = 0; i < y_0.length; i++) {
+    // Difference between the 5th and the embedded 4th order Dormand-Prince weights
+    private static final double[] DORMAND_PRINCE_ERROR = {
+        71.0 / 57600.0, 0.0, -71.0 / 16695.0, 71.0 / 1920.0,
+        -17253.0 / 339200.0, 22.0 / 525.0, -1.0 / 40.0
+    };
+
+    // Stage vectors and the intermediate state of one job, reused for every step
+    public static final class Stages {
+        final double[][] k;
+        final double[] temp;
+
+        public Stages(int n) {
+            this.k = new double[7][n];
+            this.temp = new double[n];
+        }
+
+        // First same as last, f(x_0 + h, y_next) of an accepted adaptive step is f(x_0, y_0) of the next one
+        void swapFirstAndLast() {
+            double[] first = k[0];
+            k[0] = k[6];
+            k[6] = first;
+        }
+    }
+
+    // One adaptive Dormand-Prince step with the stages not multiplied by h.
+    // stages.k[0] must hold f(x_0, y_0), on return stages.k[6] holds f(x_0 + h, y_next).
+    // y_next must not be y_0, the step may still be rejected.
+    public static void dormandPrinceEmbedded(EquationFunction f, double x_0, double[] y_0, double h,
+                                             double[] y_next, double[] error, Stages stages) {
+        int n = y_0.length;
+        double[][] k = stages.k;
+        double[] temp = stages.temp;
+
+        for (int i = 0; i < n; i++) {
+            temp[i] = y_0[i] + h * (1.0 / 5.0 * k[0][i]);
+        }
+        f.apply(x_0 + h / 5.0, temp, k[1]);
+
+        for (int i = 0; i < n; i++) {
+            temp[i] = y_0[i] + h * (3.0 / 40.0 * k[0][i] + 9.0 / 40.0 * k[1][i]);
+        }
+        f.apply(x_0 + h * 3.0 / 10.0, temp, k[2]);
+
+        for (int i = 0; i < n; i++) {
+            temp[i] = y_0[i] + h * (44.0 / 45.0 * k[0][i] - 56.0 / 15.0 * k[1][i] + 32.0 / 9.0 * k[2][i]);
+        }
+        f.apply(x_0 + h * 4.0 / 5.0, temp, k[3]);
+
+        for (int i = 0; i < n; i++) {
+            temp[i] = y_0[i] + h * (19372.0 / 6561.0 * k[0][i] - 25360.0 / 2187.0 * k[1][i]
+                    + 64448.0 / 6561.0 * k[2][i] - 212.0 / 729.0 * k[3][i]);
+        }
+        f.apply(x_0 + h * 8.0 / 9.0, temp, k[4]);
+
+        for (int i = 0; i < n; i++) {
+            temp[i] = y_0[i] + h * (9017.0 / 3168.0 * k[0][i] - 355.0 / 33.0 * k[1][i]
+                    + 46732.0 / 5247.0 * k[2][i] + 49.0 / 176.0 * k[3][i] - 5103.0 / 18656.0 * k[4][i]);
+        }
+        f.apply(x_0 + h, temp, k[5]);
+
+        for (int i = 0; i < n; i++) {
+            y_next[i] = y_0[i] + h * (35.0 / 384.0 * k[0][i] + 500.0 / 1113.0 * k[2][i]
+                    + 125.0 / 192.0 * k[3][i] - 2187.0 / 6784.0 * k[4][i] + 11.0 / 84.0 * k[5][i]);
+        }
+        f.apply(x_0 + h, y_next, k[6]);
+
+        for (int i = 0; i < n; i++) {
+            double sum = 0.0;
+            for (int stage = 0; stage < 7; stage++) {
+                sum += DORMAND_PRINCE_ERROR[stage] * k[stage][i];
+            }
+            error[i] = h * sum;
+        }
+    }
+
+    // The stages are multiplied by h, as in the fixed step methods below
+    private static void scale(double h, double[] k) {
+        for (int i = 0; i < k.length; i++) {
+            k[i] = h * k[i];
+        }
+    }
+
+    public static void dormandPrince(EquationFunction f, double x_0, double[] y_0, double h,
+                                     double[] y_next, Stages stages) {
+        int n = y_0.length;
+        double[] k1 = stages.k[0];
+        double[] k2 = stages.k[1];
+        double[] k3 = stages.k[2];
+        double[] k4 = stages.k[3];
+        double[] k5 = stages.k[4];
+        double[] k6 = stages.k[5];
+        double[] temp = stages.temp;
+
+        f.apply(x_0, y_0, k1);
+        scale(h, k1);
+        for (int i = 0; i < n; i++) {
+            temp[i] = y_0[i] + 1.0 / 5.0 * k1[i];
+        }
+
+        f.apply(x_0 + h / 5.0, temp, k2);
+        scale(h, k2);
+        for (int i = 0; i < n; i++) {
+            temp[i] = y_0[i] + (3.0 / 40.0 * k1[i] + 9.0 / 40.0 * k2[i]);
+        }
+
+        f.apply(x_0 + h * 3.0 / 10.0, temp, k3);
+        scale(h, k3);
+        for (int i = 0; i < n; i++) {
+            temp[i] = y_0[i] + ((44.0 / 45.0 * k1[i] + -56.0 / 15.0 * k2[i]) + 32.0 / 9.0 * k3[i]);
+        }
+
+        f.apply(x_0 + h * 4.0 / 5.0, temp, k4);
+        scale(h, k4);
+        for (int i = 0; i < n; i++) {
+            temp[i] = y_0[i] + ((19372.0 / 6561.0 * k1[i] + (-25360.0 / 2187.0 * k2[i] + 64448.0 / 6561.0 * k3[i]))
+                    + -212.0 / 729.0 * k4[i]);
+        }
+
+        f.apply(x_0 + h * 8.0 / 9.0, temp, k5);
+        scale(h, k5);
+        for (int i = 0; i < n; i++) {
+            temp[i] = y_0[i] + ((9017.0 / 3168.0 * k1[i] + (-355.0 / 33.0 * k2[i]
+                    + (46732.0 / 5247.0 * k3[i] + 49.0 / 176.0 * k4[i]))) + -5103.0 / 18656.0 * k5[i]);
+        }
+
+        f.apply(x_0 + h, temp, k6);
+        scale(h, k6);
+
+        for (int i = 0; i < n; i++) {
             y_next[i] = y_0[i] + (35.0 / 384.0 * k1[i] + 500.0 / 1113.0 * k3[i]
                         + 125.0 / 192.0 * k4[i] - 2187.0 / 6784.0 * k5[i]
                         + 11.0 / 84.0 * k6[i]);
         }
-    
-        double[] result = new double[y_0.length + 1];
-        result[0] = x_0 + h;
-        System.arraycopy(y_next, 0, result, 1, y_0.length);
-    
-        return result;
-    }    
-
-    public static double[] rungeKutta(BiFunction<Double, double[], double[]> f, double x_0, double[] y_0, double h) {
-        double[] k1 = new double[y_0.length];
-        double[] k2 = new double[y_0.length];
-        double[] k3 = new double[y_0.length];
-        double[] k4 = new double[y_0.length];
-
-        double[] temp = new double[y_0.length];
-        double[] y_next = new double[y_0.length];
-
-        k1 = ArrayOperations.multiply(h, f.apply(x_0, y_0));
-        temp = ArrayOperations.add(y_0, ArrayOperations.multiply(0.5, k1));
-        k2 = ArrayOperations.multiply(h, f.apply(x_0 + h / 2, temp));
-        temp = ArrayOperations.add(y_0, ArrayOperations.multiply(0.5, k2));
-        k3 = ArrayOperations.multiply(h, f.apply(x_0 + h / 2, temp));
-        temp = ArrayOperations.add(y_0, k3);
-        k4 = ArrayOperations.multiply(h, f.apply(x_0 + h, temp));
+    }
 
-        for (int i = 0; i < y_0.length; i++) {
-            y_next[i] = y_0[i] + (k1[i] + 2 * k2[i] + 2 * k3[i] + k4[i]) / 6;
+    public static void rungeKutta(EquationFunction f, double x_0, double[] y_0, double h,
+                                  double[] y_next, Stages stages) {
+        int n = y_0.length;
+        double[] k1 = stages.k[0];
+        double[] k2 = stages.k[1];
+        double[] k3 = stages.k[2];
+        double[] k4 = stages.k[3];
+        double[] temp = stages.temp;
+
+        f.apply(x_0, y_0, k1);
+        scale(h, k1);
+        for (int i = 0; i < n; i++) {
+            temp[i] = y_0[i] + 0.5 * k1[i];
         }
 
-        double[] result = new double[y_0.length + 1];
-        result[0] = x_0 + h;
-        System.arraycopy(y_next, 0, result, 1, y_0.length);
+        f.apply(x_0 + h / 2, temp, k2);
+        scale(h, k2);
+        for (int i = 0; i < n; i++) {
+            temp[i] = y_0[i] + 0.5 * k2[i];
+        }
 
-        return result;
-    }
+        f.apply(x_0 + h / 2, temp, k3);
+        scale(h, k3);
+        for (int i = 0; i < n; i++) {
+            temp[i] = y_0[i] + k3[i];
+        }
+
+        f.apply(x_0 + h, temp, k4);
+        scale(h, k4);
 
-    public static double[] heun(BiFunction<Double, double[], double[]> f, double x_0, double[] y_0, double h) {
-        double[] y_next = new double[y_0.length];
+        for (int i = 0; i < n; i++) {
+            y_next[i] = y_0[i] + (k1[i] + 2 * k2[i] + 2 * k3[i] + k4[i]) / 6;
+        }
+    }
 
-        double[] k1 = f.apply(x_0, y_0);
-        double[] temp = new double[y_0.length];
+    public static void heun(EquationFunction f, double x_0, double[] y_0, double h,
+                            double[] y_next, Stages stages) {
+        int n = y_0.length;
+        double[] k1 = stages.k[0];
+        double[] k2 = stages.k[1];
+        double[] temp = stages.temp;
 
-        for (int i = 0; i < y_0.length; i++) {
+        f.apply(x_0, y_0, k1);
+        for (int i = 0; i < n; i++) {
             temp[i] = y_0[i] + h * k1[i];
         }
 
-        double[] k2 = f.apply(x_0 + h, temp);
+        f.apply(x_0 + h, temp, k2);
 
-        for (int i = 0; i < y_0.length; i++) {
+        for (int i = 0; i < n; i++) {
             y_next[i] = y_0[i] + (h / 2) * (k1[i] + k2[i]);
         }
-
-        double[] result = new double[y_0.length + 1];
-        result[0] = x_0 + h;
-        System.arraycopy(y_next, 0, result, 1, y_0.length);
-
-        return result;
     }
 
-    public static double[] midpoint(BiFunction<Double, double[], double[]> f, double x_0, double[] y_0, double h) {
-        double[] y_next = new double[y_0.length];
+    public static void midpoint(EquationFunction f, double x_0, double[] y_0, double h,
+                                double[] y_next, Stages stages) {
+        int n = y_0.length;
+        double[] k1 = stages.k[0];
+        double[] k2 = stages.k[1];
+        double[] temp = stages.temp;
 
-        double[] k1 = f.apply(x_0, y_0);
-        double[] temp = new double[y_0.length];
-
-        for (int i = 0; i < y_0.length; i++) {
+        f.apply(x_0, y_0, k1);
+        for (int i = 0; i < n; i++) {
             temp[i] = y_0[i] + (h / 2) * k1[i];
         }
 
-        double[] k2 = f.apply(x_0 + h / 2, temp);
+        f.apply(x_0 + h / 2, temp, k2);
 
-        for (int i = 0; i < y_0.length; i++) {
+        for (int i = 0; i < n; i++) {
             y_next[i] = y_0[i] + h * k2[i];
         }
-
-        double[] result = new double[y_0.length + 1];
-        result[0] = x_0 + h;
-        System.arraycopy(y_next, 0, result, 1, y_0.length);
-
-        return result;
     }
 
-    public static double[] euler(BiFunction<Double, double[], double[]> f, double x_0, double[] y_0, double h) {
-        double[] y_next = new double[y_0.length];
+    public static void euler(EquationFunction f, double x_0, double[] y_0, double h,
+                             double[] y_next, Stages stages) {
+        double[] k1 = stages.k[0];
 
-        double[] k1 = f.apply(x_0, y_0);
+        f.apply(x_0, y_0, k1);
         for (int i = 0; i < y_0.length; i++) {
             y_next[i] = y_0[i] + h * k1[i];
         }
-
-        double[] result = new double[y_0.length + 1];
-        result[0] = x_0 + h;
-        System.arraycopy(y_next, 0, result, 1, y_0.length);
-
-        return result;
     }
 }
\ No newline at end of file
@@ -0,0 +1,50 @@
+package com.solver;
+
+import com.fasterxml.jackson.annotation.JsonCreator;
+import com.fasterxml.jackson.annotation.JsonProperty;
+
+// A problem the bot already solved itself, stored as a completed application
+// so it appears in the history without being solved again
+public class RecordedSolution {
+    private final SolverRequest request;
+    private final double[] solution;
+    private final double[] xValues;
+    private final double[][] yValues;
+
+    @JsonCreator
+    public RecordedSolution(
+            @JsonProperty("request") SolverRequest request,
+            @JsonProperty("solution") double[] solution,
+            @JsonProperty("xValues") double[] xValues,
+            @JsonProperty("yValues") double[][] yValues) {
+        this.request = request;
+        this.solution = solution;
+        this.xValues = xValues;
+        this.yValues = yValues;
+    }
+
+    public SolverRequest getRequest() { return request; }
+
+    public double[] getSolution() { return solution; }
+
+    public double[] getXValues() { return xValues; }
+
+    public double[][] getYValues() { return yValues; }
+
+    public Trajectory toTrajectory() {
+        int order = request.getOrder();
+        if (order < 1 || solution == null || solution.length != order + 1
+                || xValues == null || yValues == null || xValues.length != yValues.length) {
+            throw new SolverException("Recorded solution does not match its request");
+        }
+
+        Trajectory trajectory = new Trajectory(1, order, xValues.length);
+        for (int i = 0; i < xValues.length; i++) {
+            if (yValues[i] == null || yValues[i].length != order) {
+                throw new SolverException("Recorded point " + i + " does not have " + order + " values");
+            }
+            trajectory.add(xValues[i], yValues[i]);
+        }
+        return trajectory;
+    }
+}
\ No newline at end of file
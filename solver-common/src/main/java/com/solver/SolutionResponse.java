@@ -1,37 +1,56 @@
 package com.solver;
 
-import java.util.List;
-
 import com.fasterxml.jackson.annotation.JsonCreator;
+import com.fasterxml.jackson.annotation.JsonInclude;
 import com.fasterxml.jackson.annotation.JsonProperty;
 import com.fasterxml.jackson.core.JsonProcessingException;
 import com.fasterxml.jackson.databind.ObjectMapper;
 
 public class SolutionResponse {
     private double[] solution;
-    private List<Double> xValues;
-    private List<double[]> yValues;
+    private double[] xValues;
+    private double[][] yValues;
+    private Integer acceptedSteps;
+    private Integer rejectedSteps;
 
     public SolutionResponse() {}
 
+    public SolutionResponse(double[] solution, double[] xValues, double[][] yValues) {
+        this(solution, xValues, yValues, null, null);
+    }
+
     @JsonCreator
     public SolutionResponse(
             @JsonProperty("solution") double[] solution,
-            @JsonProperty("xValues") List<Double> xValues,
-            @JsonProperty("yValues") List<double[]> yValues) {
+            @JsonProperty("xValues") double[] xValues,
+            @JsonProperty("yValues") double[][] yValues,
+            @JsonProperty("acceptedSteps") Integer acceptedSteps,
+            @JsonProperty("rejectedSteps") Integer rejectedSteps) {
         this.solution = solution;
         this.xValues = xValues;
         this.yValues = yValues;
+        this.acceptedSteps = acceptedSteps;
+        this.rejectedSteps = rejectedSteps;
     }
 
     public double[] getSolution() { return solution; }
     public void setSolution(double[] solution) { this.solution = solution; }
 
-    public List<Double> getXValues() { return xValues; }
-    public void setXValues(List<Double> xValues) { this.xValues = xValues; }
+    @JsonInclude(JsonInclude.Include.NON_NULL)
+    public double[] getXValues() { return xValues; }
+    public void setXValues(double[] xValues) { this.xValues = xValues; }
+
+    @JsonInclude(JsonInclude.Include.NON_NULL)
+    public double[][] getYValues() { return yValues; }
+    public void setYValues(double[][] yValues) { this.yValues = yValues; }
+
+    @JsonInclude(JsonInclude.Include.NON_NULL)
+    public Integer getAcceptedSteps() { return acceptedSteps; }
+    public void setAcceptedSteps(Integer acceptedSteps) { this.acceptedSteps = acceptedSteps; }
 
-    public List<double[]> getYValues() { return yValues; }
-    public void setYValues(List<double[]> yValues) { this.yValues = yValues; }
+    @JsonInclude(JsonInclude.Include.NON_NULL)
+    public Integer getRejectedSteps() { return rejectedSteps; }
+    public void setRejectedSteps(Integer rejectedSteps) { this.rejectedSteps = rejectedSteps; }
 
     public String toJson() {
         ObjectMapper objectMapper = new ObjectMapper();
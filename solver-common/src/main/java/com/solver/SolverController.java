@@ -2,24 +2,47 @@ package com.solver;
 
 import org.slf4j.Logger;
 import org.slf4j.LoggerFactory;
+import org.springframework.beans.factory.annotation.Value;
 import org.springframework.web.bind.annotation.*;
+import org.springframework.http.HttpHeaders;
+import org.springframework.http.HttpStatus;
+import org.springframework.http.MediaType;
 import org.springframework.http.ResponseEntity;
 
 import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.RejectedExecutionException;
+import java.util.concurrent.TimeUnit;
+import java.util.function.IntFunction;
 import java.util.List;
 import java.util.Map;
+import java.util.regex.Matcher;
+import java.util.regex.Pattern;
 
 @RestController
 @RequestMapping("/api/solver")
 public class SolverController {
     private static final Logger logger = LoggerFactory.getLogger(SolverController.class);
 
-    private final Main main;
+    private static final long MAX_STATUS_WAIT_SECONDS = 60;
+    private static final Pattern BYTE_RANGE = Pattern.compile("bytes=(\\d+)-(\\d*)");
+
+    private final SolverExecutor solverExecutor;
     private final DBService dbService;
+    private final CompletionRegistry completionRegistry;
+    private final boolean binaryTrajectories;
+
+    // Results of a solve: the JSON data and, with binary trajectories, the packed x/y values
+    private record Results(String data, byte[] trajectory) {}
 
-    public SolverController(Main main, DBService dbService) {
-        this.main = main;
+    public SolverController(
+            SolverExecutor solverExecutor,
+            DBService dbService,
+            CompletionRegistry completionRegistry,
+            @Value("${solver.results.binary-trajectories:true}") boolean binaryTrajectories) {
+        this.solverExecutor = solverExecutor;
         this.dbService = dbService;
+        this.completionRegistry = completionRegistry;
+        this.binaryTrajectories = binaryTrajectories;
     }
 
     @PostMapping("/users/{userId}")
@@ -36,53 +59,137 @@ public class SolverController {
                     .orElseThrow(() -> new SolverException("Failed to update settings for userId: " + userId)));
     }
 
+    @PostMapping("/users")
+    public CompletableFuture<ResponseEntity<Integer>> setUserSettingsBatch(@RequestBody List<UserSettings> settings) {
+        logger.debug("Setting user settings for {} users", settings.size());
+        if (settings.isEmpty()) {
+            return CompletableFuture.completedFuture(ResponseEntity.ok(0));
+        }
+        return dbService.setUserSettingsBatch(settings).thenApply(ResponseEntity::ok);
+    }
+
     @PostMapping("/solve/{userId}")
     public CompletableFuture<ResponseEntity<Integer>> solve(
             @PathVariable("userId") Integer userId,
             @RequestBody SolverRequest request) {
         logger.debug("Received solve request with userId: {}", userId);
+        return submit(userId, request.toJson(), applicationId -> {
+            SolverJob.Solution solution = new SolverJob(request).solve();
+
+            if (solution.acceptedSteps() != null) {
+                logger.debug("Adaptive solve of applicationId: {} accepted {} and rejected {} steps",
+                    applicationId, solution.acceptedSteps(), solution.rejectedSteps());
+            }
+
+            return solutionResults(
+                solution.solution(), solution.trajectory(), solution.acceptedSteps(), solution.rejectedSteps());
+        });
+    }
+
+    // Stores a problem the bot solved locally as a completed application, the backend does not solve it again
+    @PostMapping("/solve/{userId}/recorded")
+    public CompletableFuture<ResponseEntity<Integer>> recordSolution(
+            @PathVariable("userId") Integer userId,
+            @RequestBody RecordedSolution recorded) {
+        logger.debug("Recording local solution of userId: {}", userId);
+        if (recorded.getRequest() == null) {
+            throw new SolverException("Recorded solution has no request");
+        }
+
+        Results results = solutionResults(recorded.getSolution(), recorded.toTrajectory(), null, null);
+
+        return dbService.createCompletedApplication(
+                userId,
+                recorded.getRequest().toJson(),
+                results.data(),
+                results.trajectory())
+            .thenApply(ResponseEntity::ok);
+    }
+
+    private Results solutionResults(double[] solution, Trajectory trajectory, Integer acceptedSteps, Integer rejectedSteps) {
+        if (!binaryTrajectories) {
+            SolutionResponse response = new SolutionResponse(
+                solution, trajectory.getXValues(), trajectory.getYValues(0), acceptedSteps, rejectedSteps);
+            return new Results(response.toJson(), null);
+        }
+
+        SolutionResponse response = new SolutionResponse(solution, null, null, acceptedSteps, rejectedSteps);
+        return new Results(response.toJson(), TrajectoryEncoding.encode(trajectory));
+    }
+
+    @PostMapping("/solve/{userId}/sweep")
+    public CompletableFuture<ResponseEntity<Integer>> solveSweep(
+            @PathVariable("userId") Integer userId,
+            @RequestBody SweepRequest request) {
+        logger.debug("Received sweep request with userId: {}", userId);
+        return submit(userId, request.toJson(), applicationId -> {
+            SolverJob.SweepSolution sweep = new SolverJob(request).solveSweep(request.getInitialYs());
+
+            logger.debug("Solved sweep of {} initial states for applicationId: {}",
+                sweep.solutions().size(), applicationId);
+
+            if (!binaryTrajectories) {
+                double[][][] yValues = new double[sweep.solutions().size()][][];
+                for (int i = 0; i < yValues.length; i++) {
+                    yValues[i] = sweep.trajectory().getYValues(i);
+                }
+
+                SweepResponse response = new SweepResponse(sweep.solutions(), sweep.trajectory().getXValues(), yValues);
+                return new Results(response.toJson(), null);
+            }
+
+            SweepResponse response = new SweepResponse(sweep.solutions(), null, null);
+            return new Results(
+                response.toJson(),
+                TrajectoryEncoding.encodeSweep(sweep.trajectory()));
+        });
+    }
+
+    // Creates the application and solves it in the background on the solver executor,
+    // the solver returns the results saved for the application
+    private CompletableFuture<ResponseEntity<Integer>> submit(
+            Integer userId,
+            String parameters,
+            IntFunction<Results> solver) {
         return CompletableFuture.supplyAsync(() -> {
             final int applicationId;
             try {
                 applicationId = dbService.createApplication(
-                    request.toJson(),
+                    parameters,
                     "new", 
                     userId
                 ).join();
 
                 logger.debug("Created application with id: {} for userId: {}", applicationId, userId);
 
-                CompletableFuture.runAsync(() -> {
-                    try {
-                        dbService.updateApplicationStatus(applicationId, "in_progress").join();
-
-                        main.setMethod(request.getMethod());
-                        main.setOrder(request.getOrder());
-                        main.setUserEquation(request.getUserEquation());
-                        main.setEquation(request.getFormattedEquation());
-                        main.setInitialX(request.getInitialX());
-                        main.setInitialY(request.getInitialY());
-                        main.setReachPoint(request.getReachPoint());
-                        main.setStepSize(request.getStepSize());
-
-                        double[] solution = main.getSolution();
-                        List<Double> xValues = main.getXValues();
-                        List<double[]> yValues = main.getYValues();
-
-                        SolutionResponse response = new SolutionResponse(solution, xValues, yValues);
-                        dbService.saveResults(applicationId, response.toJson()).join();
-                        dbService.updateApplicationStatus(applicationId, "completed").join();
-
-                        logger.debug("Successfully solved problem for applicationId: {}", applicationId);
-                    } catch (Exception e) {
-                        logger.error("Error solving problem for applicationId: {}", applicationId, e);
+                try {
+                    solverExecutor.submit(() -> {
                         try {
-                            dbService.updateApplicationStatus(applicationId, "error").join();
-                        } catch (Exception sqlException) {
-                            logger.error("Failed to update application status to error", sqlException);
+                            dbService.updateApplicationStatus(applicationId, "in_progress").join();
+
+                            Results results = solver.apply(applicationId);
+
+                            dbService.saveResults(applicationId, results.data(), results.trajectory()).join();
+                            dbService.updateApplicationStatus(applicationId, "completed").join();
+                            completionRegistry.complete(applicationId, "completed");
+
+                            logger.debug("Successfully solved problem for applicationId: {}", applicationId);
+                        } catch (Exception e) {
+                            logger.error("Error solving problem for applicationId: {}", applicationId, e);
+                            try {
+                                dbService.updateApplicationStatus(applicationId, "error").join();
+                            } catch (Exception sqlException) {
+                                logger.error("Failed to update application status to error", sqlException);
+                            }
+                            completionRegistry.complete(applicationId, "error");
                         }
-                    }
-                });
+                    });
+                } catch (RejectedExecutionException e) {
+                    logger.warn("Solver queue is full, rejecting applicationId: {}", applicationId);
+                    dbService.updateApplicationStatus(applicationId, "error").join();
+                    completionRegistry.complete(applicationId, "error");
+                    return ResponseEntity.status(HttpStatus.SERVICE_UNAVAILABLE).<Integer>build();
+                }
 
                 return ResponseEntity.ok(applicationId);
             } catch (Exception e) {
@@ -110,10 +217,44 @@ public class SolverController {
                     .orElseThrow(() -> new SolverException("Application status not found for applicationId: " + applicationId)));
     }
 
+    @GetMapping("/applications/{applicationId}/status/wait")
+    public CompletableFuture<ResponseEntity<String>> waitForApplicationStatus(
+            @PathVariable("applicationId") int applicationId,
+            @RequestParam(value = "timeout", defaultValue = "30") long timeout) {
+        logger.debug("Waiting for application status for id: {}", applicationId);
+        long waitSeconds = Math.clamp(timeout, 0, MAX_STATUS_WAIT_SECONDS);
+
+        // Register before reading the status, so a completion between the two is not missed
+        CompletableFuture<String> completion = completionRegistry.register(applicationId);
+
+        return dbService.getApplicationStatus(applicationId)
+                .thenCompose(optionalStatus -> {
+                    if (optionalStatus.isEmpty()) {
+                        completionRegistry.release(applicationId);
+                        throw new SolverException("Application status not found for applicationId: " + applicationId);
+                    }
+
+                    String status = optionalStatus.get();
+                    if (CompletionRegistry.isTerminal(status)) {
+                        completionRegistry.complete(applicationId, status);
+                        return CompletableFuture.completedFuture(status);
+                    }
+
+                    return completion.copy().completeOnTimeout(status, waitSeconds, TimeUnit.SECONDS);
+                })
+                .thenApply(ResponseEntity::ok);
+    }
+
     @GetMapping("/applications/{userId}")
-    public CompletableFuture<ResponseEntity<List<Map<String, Object>>>> getApplications(@PathVariable("userId") Integer userId) {
+    public CompletableFuture<ResponseEntity<List<Map<String, Object>>>> getApplications(
+            @PathVariable("userId") Integer userId,
+            @RequestParam(value = "limit", required = false) Integer limit,
+            @RequestParam(value = "status", required = false) List<String> statuses) {
         logger.debug("Getting applications list for userId: {}", userId);
-        return dbService.getApplications(userId)
+        if (limit != null && limit <= 0) {
+            throw new SolverException("Invalid limit: " + limit);
+        }
+        return dbService.getApplications(userId, limit, statuses)
                 .thenApply(applications -> {
                     if (applications.isEmpty()) {
                         throw new SolverException("Applications not found for userId: " + userId);
@@ -133,4 +274,48 @@ public class SolverController {
                     return ResponseEntity.ok(results);
                 });
     }
+
+    // Supports a single "bytes=start-end" or "bytes=start-" range, so large trajectories
+    // can be read in chunks, other ranges are ignored and the whole trajectory is returned
+    @GetMapping(value = "/results/{applicationId}/trajectory", produces = MediaType.APPLICATION_OCTET_STREAM_VALUE)
+    public CompletableFuture<ResponseEntity<byte[]>> getTrajectory(
+            @PathVariable("applicationId") Integer applicationId,
+            @RequestHeader(value = HttpHeaders.RANGE, required = false) String range) {
+        Matcher matcher = range == null ? null : BYTE_RANGE.matcher(range);
+
+        if (matcher == null || !matcher.matches()) {
+            logger.debug("Getting trajectory for applicationId: {}", applicationId);
+            return dbService.getTrajectory(applicationId)
+                    .thenApply(optionalTrajectory -> optionalTrajectory
+                        .map(trajectory -> ResponseEntity.ok()
+                            .header(HttpHeaders.ACCEPT_RANGES, "bytes")
+                            .body(trajectory))
+                        .orElseGet(() -> ResponseEntity.notFound().build()));
+        }
+
+        long start = Long.parseLong(matcher.group(1));
+        long end = matcher.group(2).isEmpty() ? Integer.MAX_VALUE : Long.parseLong(matcher.group(2));
+        int from = (int) Math.min(start, Integer.MAX_VALUE);
+        int length = (int) Math.clamp(end - start + 1, 0, Integer.MAX_VALUE);
+
+        logger.debug("Getting trajectory range {} for applicationId: {}", range, applicationId);
+        return dbService.getTrajectoryRange(applicationId, from, length)
+                .thenApply(optionalRange -> optionalRange
+                    .map(row -> {
+                        byte[] chunk = (byte[]) row.get("chunk");
+                        int total = (Integer) row.get("total");
+
+                        if (start >= total || chunk.length == 0) {
+                            return ResponseEntity.status(HttpStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                                .header(HttpHeaders.CONTENT_RANGE, "bytes */" + total)
+                                .<byte[]>build();
+                        }
+
+                        return ResponseEntity.status(HttpStatus.PARTIAL_CONTENT)
+                            .header(HttpHeaders.CONTENT_RANGE,
+                                "bytes " + start + "-" + (start + chunk.length - 1) + "/" + total)
+                            .body(chunk);
+                    })
+                    .orElseGet(() -> ResponseEntity.notFound().build()));
+    }
 }
\ No newline at end of file
@@ -0,0 +1,68 @@
+package com.solver;
+
+import org.slf4j.Logger;
+import org.slf4j.LoggerFactory;
+import org.springframework.beans.factory.DisposableBean;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.stereotype.Component;
+
+import java.util.concurrent.ArrayBlockingQueue;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.RejectedExecutionException;
+import java.util.concurrent.ThreadPoolExecutor;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicInteger;
+
+// Bounded pool the solver jobs run on, separate from the executor of the @Async database calls,
+// so long solves can not starve them. It is not an Executor bean on purpose,
+// one would replace the auto-configured executor the @Async methods use.
+@Component
+public class SolverExecutor implements DisposableBean {
+    private static final Logger logger = LoggerFactory.getLogger(SolverExecutor.class);
+
+    private static final long SHUTDOWN_TIMEOUT_SECONDS = 60;
+
+    private final ThreadPoolExecutor executor;
+
+    public SolverExecutor(
+            @Value("${solver.executor.pool-size:0}") int poolSize,
+            @Value("${solver.executor.queue-capacity:100}") int queueCapacity) {
+        // Solves are CPU bound, so by default there is one thread per core
+        int threads = poolSize > 0 ? poolSize : Runtime.getRuntime().availableProcessors();
+        int capacity = Math.max(1, queueCapacity);
+        AtomicInteger threadNumber = new AtomicInteger();
+
+        this.executor = new ThreadPoolExecutor(
+            threads,
+            threads,
+            0L,
+            TimeUnit.MILLISECONDS,
+            new ArrayBlockingQueue<>(capacity),
+            runnable -> {
+                Thread thread = new Thread(runnable, "solver-" + threadNumber.incrementAndGet());
+                thread.setDaemon(false);
+                return thread;
+            },
+            new ThreadPoolExecutor.AbortPolicy());
+
+        logger.info("Solver executor started with {} threads and a queue of {} jobs", threads, capacity);
+    }
+
+    // Throws RejectedExecutionException if all threads are busy and the queue is full
+    public CompletableFuture<Void> submit(Runnable job) throws RejectedExecutionException {
+        return CompletableFuture.runAsync(job, executor);
+    }
+
+    public int getActiveCount() { return executor.getActiveCount(); }
+
+    public int getQueuedCount() { return executor.getQueue().size(); }
+
+    @Override
+    public void destroy() throws InterruptedException {
+        executor.shutdown();
+        if (!executor.awaitTermination(SHUTDOWN_TIMEOUT_SECONDS, TimeUnit.SECONDS)) {
+            logger.warn("Solver executor did not finish {} queued jobs in time", executor.getQueue().size());
+            executor.shutdownNow();
+        }
+    }
+}
\ No newline at end of file
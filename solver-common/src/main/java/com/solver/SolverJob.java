@@ -0,0 +1,251 @@
+package com.solver;
+
+import java.util.List;
+import java.util.ArrayList;
+
+// One solve of one application. The configuration is fixed when the job is created
+// and the trajectories are returned, so jobs can run in parallel without sharing state.
+public final class SolverJob {
+    private static final double SAFETY_FACTOR = 0.9;
+    private static final double MIN_STEP_FACTOR = 0.2;
+    private static final double MAX_STEP_FACTOR = 5.0;
+    private static final double MIN_STEP_SIZE = 1e-12;
+
+    private final int order;
+    private final EquationFunction equationFunction;
+    private final double initialX;
+    private final double[] initialY;
+    private final double reachPoint;
+    private final double stepSize;
+    private final String method;
+    private final Double relativeTolerance;
+    private final Double absoluteTolerance;
+    // Without either option every step is recorded
+    private final Integer maxPoints;
+    private final Integer outputEvery;
+
+    // acceptedSteps and rejectedSteps are only set for adaptive solves
+    public record Solution(
+        double[] solution,
+        Trajectory trajectory,
+        Integer acceptedSteps,
+        Integer rejectedSteps) {}
+
+    // One trajectory per initial state, all on the same x values
+    public record SweepSolution(List<double[]> solutions, Trajectory trajectory) {}
+
+    public SolverJob(SolverRequest request) {
+        this.method = request.getMethod();
+        this.order = request.getOrder();
+        this.equationFunction = CreateEquationFunction.create(request.getFormattedEquation(), request.getOrder());
+        this.initialX = request.getInitialX();
+        this.initialY = request.getInitialY() == null ? null : request.getInitialY().clone();
+        this.reachPoint = request.getReachPoint();
+        this.stepSize = request.getStepSize();
+        this.relativeTolerance = request.getRelativeTolerance();
+        this.absoluteTolerance = request.getAbsoluteTolerance();
+        this.maxPoints = request.getMaxPoints();
+        this.outputEvery = request.getOutputEvery();
+    }
+
+    // Number of fixed steps between recorded points,
+    // large enough to keep at most maxPoints points and at least outputEvery
+    private int outputStride() {
+        int stride = outputEvery != null && outputEvery > 1 ? outputEvery : 1;
+
+        if (maxPoints != null && maxPoints > 0 && stepSize > 0) {
+            double steps = Math.ceil((reachPoint - initialX) / stepSize);
+            stride = (int) Math.max(stride, Math.min(Integer.MAX_VALUE, Math.ceil(steps / maxPoints)));
+        }
+
+        return stride;
+    }
+
+    // Recorded points of a fixed step solve, so the trajectory is allocated once
+    private long expectedPoints(int stride) {
+        if (stepSize <= 0) {
+            return 0;
+        }
+        return (long) Math.ceil((reachPoint - initialX) / stepSize) / stride + 1;
+    }
+
+    private boolean isAdaptive() {
+        return "dormandPrince".equals(method) && relativeTolerance != null && absoluteTolerance != null;
+    }
+
+    // Advances y in place by one fixed step from x
+    private void step(double x, double[] y, NumericalMethods.Stages stages) {
+        switch (method) {
+            case "euler" -> NumericalMethods.euler(equationFunction, x, y, stepSize, y, stages);
+            case "midpoint" -> NumericalMethods.midpoint(equationFunction, x, y, stepSize, y, stages);
+            case "heun" -> NumericalMethods.heun(equationFunction, x, y, stepSize, y, stages);
+            case "rungeKutta" -> NumericalMethods.rungeKutta(equationFunction, x, y, stepSize, y, stages);
+            case "dormandPrince" -> NumericalMethods.dormandPrince(equationFunction, x, y, stepSize, y, stages);
+            default -> throw new IllegalArgumentException("Invalid method value: " + method);
+        }
+    }
+
+    public Solution solve() {
+        if (isAdaptive()) {
+            return solveAdaptive();
+        }
+
+        double x = initialX;
+        double[] y = initialY.clone();
+        NumericalMethods.Stages stages = new NumericalMethods.Stages(y.length);
+
+        int stride = outputStride();
+        long steps = 0;
+
+        Trajectory trajectory = new Trajectory(1, y.length, expectedPoints(stride));
+
+        while (x < reachPoint - 1e-10) {
+            step(x, y, stages);
+            x = x + stepSize;
+
+            if (++steps % stride == 0) {
+                trajectory.add(x, y);
+            }
+        }
+
+        // The final state is recorded even if it falls between two sampled steps
+        if (steps % stride != 0) {
+            trajectory.add(x, y);
+        }
+
+        return new Solution(finalSolution(x, y), trajectory, null, null);
+    }
+
+    // All initial states are advanced together on the same x grid,
+    // so the equation function is built once for the whole sweep.
+    // Sweeps always use fixed steps, tolerances are ignored.
+    public SweepSolution solveSweep(List<double[]> initialYs) {
+        if (initialYs == null || initialYs.isEmpty()) {
+            throw new SolverException("Sweep needs at least one initial state");
+        }
+
+        int count = initialYs.size();
+
+        double[][] ys = new double[count][];
+        for (int i = 0; i < count; i++) {
+            ys[i] = initialYs.get(i).clone();
+        }
+
+        // The states are advanced one after another, so they share the stage buffers
+        NumericalMethods.Stages stages = new NumericalMethods.Stages(ys[0].length);
+
+        double x = initialX;
+
+        int stride = outputStride();
+        long steps = 0;
+
+        Trajectory trajectory = new Trajectory(count, ys[0].length, expectedPoints(stride));
+
+        while (x < reachPoint - 1e-10) {
+            for (int i = 0; i < count; i++) {
+                step(x, ys[i], stages);
+            }
+
+            x = x + stepSize;
+
+            if (++steps % stride == 0) {
+                trajectory.add(x, ys);
+            }
+        }
+
+        if (steps % stride != 0) {
+            trajectory.add(x, ys);
+        }
+
+        List<double[]> solutions = new ArrayList<>(count);
+        for (double[] y : ys) {
+            solutions.add(finalSolution(x, y));
+        }
+
+        return new SweepSolution(solutions, trajectory);
+    }
+
+    // The step size given by the user is only the initial one,
+    // each step is accepted or rejected by the embedded error estimate
+    private Solution solveAdaptive() {
+        if (stepSize <= 0) {
+            throw new SolverException("Initial step size must be positive");
+        }
+
+        int acceptedSteps = 0;
+        int rejectedSteps = 0;
+
+        double x = initialX;
+        double[] y = initialY.clone();
+        double[] yNext = new double[y.length];
+        double h = stepSize;
+
+        NumericalMethods.Stages stages = new NumericalMethods.Stages(y.length);
+        double[] error = new double[y.length];
+
+        equationFunction.apply(x, y, stages.k[0]);
+
+        // Adaptive steps are not known in advance, so maxPoints is applied as a minimum x spacing
+        int stride = outputEvery != null && outputEvery > 1 ? outputEvery : 1;
+        double spacing = maxPoints != null && maxPoints > 0 ? (reachPoint - initialX) / maxPoints : 0.0;
+
+        Trajectory trajectory = new Trajectory(1, y.length, maxPoints != null && maxPoints > 0 ? maxPoints + 1L : 0);
+        double nextOutputX = initialX + spacing;
+        boolean recorded = true;
+
+        while (x < reachPoint - 1e-10) {
+            h = Math.min(h, reachPoint - x);
+
+            if (h < MIN_STEP_SIZE * Math.max(1.0, Math.abs(x))) {
+                throw new SolverException("Step size became too small at x = " + x);
+            }
+
+            NumericalMethods.dormandPrinceEmbedded(equationFunction, x, y, h, yNext, error, stages);
+
+            double errorNorm = 0.0;
+            for (int i = 0; i < y.length; i++) {
+                double scale = absoluteTolerance + relativeTolerance * Math.max(Math.abs(y[i]), Math.abs(yNext[i]));
+                errorNorm += (error[i] / scale) * (error[i] / scale);
+            }
+            errorNorm = Math.sqrt(errorNorm / y.length);
+
+            double factor;
+            if (errorNorm <= 1.0) {
+                x += h;
+                double[] previous = y;
+                y = yNext;
+                yNext = previous;
+                stages.swapFirstAndLast();
+                acceptedSteps++;
+
+                recorded = acceptedSteps % stride == 0 && x >= nextOutputX;
+                if (recorded) {
+                    trajectory.add(x, y);
+                    nextOutputX = x + spacing;
+                }
+
+                factor = errorNorm == 0.0
+                        ? MAX_STEP_FACTOR
+                        : Math.min(MAX_STEP_FACTOR, SAFETY_FACTOR * Math.pow(errorNorm, -0.2));
+            } else {
+                rejectedSteps++;
+                factor = Math.max(MIN_STEP_FACTOR, SAFETY_FACTOR * Math.pow(errorNorm, -0.2));
+            }
+
+            h *= factor;
+        }
+
+        if (!recorded) {
+            trajectory.add(x, y);
+        }
+
+        return new Solution(finalSolution(x, y), trajectory, acceptedSteps, rejectedSteps);
+    }
+
+    private static double[] finalSolution(double x, double[] y) {
+        double[] finalSolution = new double[1 + y.length];
+        finalSolution[0] = x;
+        System.arraycopy(y, 0, finalSolution, 1, y.length);
+        return finalSolution;
+    }
+}
\ No newline at end of file
@@ -12,6 +12,10 @@ public class SolverRequest {
     private double[] initialY;
     private double reachPoint;
     private double stepSize;
+    private Double relativeTolerance;
+    private Double absoluteTolerance;
+    private Integer maxPoints;
+    private Integer outputEvery;
 
     public String getMethod() { return method; }
     public void setMethod(String method) { this.method = method; }
@@ -37,6 +41,18 @@ public class SolverRequest {
     public double getStepSize() { return stepSize; }
     public void setStepSize(double stepSize) { this.stepSize = stepSize; }
 
+    public Double getRelativeTolerance() { return relativeTolerance; }
+    public void setRelativeTolerance(Double relativeTolerance) { this.relativeTolerance = relativeTolerance; }
+
+    public Double getAbsoluteTolerance() { return absoluteTolerance; }
+    public void setAbsoluteTolerance(Double absoluteTolerance) { this.absoluteTolerance = absoluteTolerance; }
+
+    public Integer getMaxPoints() { return maxPoints; }
+    public void setMaxPoints(Integer maxPoints) { this.maxPoints = maxPoints; }
+
+    public Integer getOutputEvery() { return outputEvery; }
+    public void setOutputEvery(Integer outputEvery) { this.outputEvery = outputEvery; }
+
     public String toJson() {
         ObjectMapper objectMapper = new ObjectMapper();
         try {
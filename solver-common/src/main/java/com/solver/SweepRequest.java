@@ -0,0 +1,10 @@
+package com.solver;
+
+import java.util.List;
+
+public class SweepRequest extends SolverRequest {
+    private List<double[]> initialYs;
+
+    public List<double[]> getInitialYs() { return initialYs; }
+    public void setInitialYs(List<double[]> initialYs) { this.initialYs = initialYs; }
+}
\ No newline at end of file
@@ -0,0 +1,47 @@
+package com.solver;
+
+import java.util.List;
+
+import com.fasterxml.jackson.annotation.JsonCreator;
+import com.fasterxml.jackson.annotation.JsonInclude;
+import com.fasterxml.jackson.annotation.JsonProperty;
+import com.fasterxml.jackson.core.JsonProcessingException;
+import com.fasterxml.jackson.databind.ObjectMapper;
+
+public class SweepResponse {
+    private List<double[]> solutions;
+    private double[] xValues;
+    private double[][][] yValues;
+
+    public SweepResponse() {}
+
+    @JsonCreator
+    public SweepResponse(
+            @JsonProperty("solutions") List<double[]> solutions,
+            @JsonProperty("xValues") double[] xValues,
+            @JsonProperty("yValues") double[][][] yValues) {
+        this.solutions = solutions;
+        this.xValues = xValues;
+        this.yValues = yValues;
+    }
+
+    public List<double[]> getSolutions() { return solutions; }
+    public void setSolutions(List<double[]> solutions) { this.solutions = solutions; }
+
+    @JsonInclude(JsonInclude.Include.NON_NULL)
+    public double[] getXValues() { return xValues; }
+    public void setXValues(double[] xValues) { this.xValues = xValues; }
+
+    @JsonInclude(JsonInclude.Include.NON_NULL)
+    public double[][][] getYValues() { return yValues; }
+    public void setYValues(double[][][] yValues) { this.yValues = yValues; }
+
+    public String toJson() {
+        ObjectMapper objectMapper = new ObjectMapper();
+        try {
+            return objectMapper.writeValueAsString(this);
+        } catch (JsonProcessingException e) {
+            throw new RuntimeException("Error converting SweepResponse to JSON", e);
+        }
+    }
+}
\ No newline at end of file
@@ -0,0 +1,85 @@
+package com.solver;
+
+import java.util.Arrays;
+
+// Points of one or more trajectories that share their x values, as growable primitive columns.
+// The y values of each trajectory are stored point after point, component after component,
+// so recording a point copies the state without allocating and the columns are encoded in bulk.
+public final class Trajectory {
+    private static final int DEFAULT_CAPACITY = 1024;
+    // Estimates beyond this are not trusted with a single allocation, the columns grow instead
+    private static final int MAX_INITIAL_CAPACITY = 1 << 20;
+
+    private final int order;
+    private double[] xValues;
+    private final double[][] yValues;
+    private int size;
+
+    public Trajectory(int trajectories, int order, long expectedPoints) {
+        int capacity = (int) Math.max(1, Math.min(MAX_INITIAL_CAPACITY,
+            expectedPoints > 0 ? expectedPoints : DEFAULT_CAPACITY));
+
+        this.order = order;
+        this.xValues = new double[capacity];
+        this.yValues = new double[trajectories][capacity * order];
+    }
+
+    public int size() { return size; }
+
+    public int order() { return order; }
+
+    public int trajectories() { return yValues.length; }
+
+    public void add(double x, double[] y) {
+        ensureCapacity();
+        xValues[size] = x;
+        System.arraycopy(y, 0, yValues[0], size * order, order);
+        size++;
+    }
+
+    public void add(double x, double[][] ys) {
+        ensureCapacity();
+        xValues[size] = x;
+        for (int i = 0; i < yValues.length; i++) {
+            System.arraycopy(ys[i], 0, yValues[i], size * order, order);
+        }
+        size++;
+    }
+
+    private void ensureCapacity() {
+        if (size < xValues.length) {
+            return;
+        }
+
+        long capacity = Math.max(size + 1L, 2L * xValues.length);
+        if (capacity * order > Integer.MAX_VALUE - 8) {
+            capacity = (Integer.MAX_VALUE - 8) / order;
+            if (capacity <= size) {
+                throw new SolverException("Trajectory is too large: more than " + size + " points");
+            }
+        }
+
+        xValues = Arrays.copyOf(xValues, (int) capacity);
+        for (int i = 0; i < yValues.length; i++) {
+            yValues[i] = Arrays.copyOf(yValues[i], (int) capacity * order);
+        }
+    }
+
+    // The raw columns are only valid up to size() points
+    double[] xColumn() { return xValues; }
+
+    double[] yColumn(int trajectory) { return yValues[trajectory]; }
+
+    public double[] getXValues() {
+        return Arrays.copyOf(xValues, size);
+    }
+
+    // One array per point, the shape of the JSON responses
+    public double[][] getYValues(int trajectory) {
+        double[][] points = new double[size][];
+        for (int i = 0; i < size; i++) {
+            points[i] = Arrays.copyOfRange(yValues[trajectory], i * order, (i + 1) * order);
+        }
+        return points;
+    }
+}
\ No newline at end of file
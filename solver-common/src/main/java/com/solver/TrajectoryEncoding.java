@@ -0,0 +1,54 @@
+package com.solver;
+
+import java.nio.ByteBuffer;
+import java.nio.ByteOrder;
+
+// Packs trajectories into little-endian float64 columns behind a 16 byte header:
+// magic "RKT1", number of trajectories (0 for a single solution), number of points and order.
+// x values follow, then y values ordered by trajectory, point and component.
+public class TrajectoryEncoding {
+    private static final byte[] MAGIC = {'R', 'K', 'T', '1'};
+    private static final int HEADER_SIZE = 16;
+
+    public static byte[] encode(Trajectory trajectory) {
+        return encode(trajectory, 0);
+    }
+
+    public static byte[] encodeSweep(Trajectory trajectory) {
+        return encode(trajectory, trajectory.trajectories());
+    }
+
+    private static byte[] encode(Trajectory trajectory, int trajectories) {
+        int points = trajectory.size();
+        int order = trajectory.order();
+
+        ByteBuffer buffer = allocate(points, trajectory.trajectories(), order);
+        writeHeader(buffer, trajectories, points, order);
+
+        // The columns are already laid out as in the encoding, so they are copied in bulk
+        buffer.asDoubleBuffer().put(trajectory.xColumn(), 0, points);
+        buffer.position(buffer.position() + 8 * points);
+
+        for (int i = 0; i < trajectory.trajectories(); i++) {
+            buffer.asDoubleBuffer().put(trajectory.yColumn(i), 0, points * order);
+            buffer.position(buffer.position() + 8 * points * order);
+        }
+
+        return buffer.array();
+    }
+
+    private static ByteBuffer allocate(int points, int trajectories, int order) {
+        long size = HEADER_SIZE + 8L * points * (1 + (long) trajectories * order);
+        if (size > Integer.MAX_VALUE) {
+            throw new SolverException("Trajectory is too large to encode: " + size + " bytes");
+        }
+        return ByteBuffer.allocate((int) size).order(ByteOrder.LITTLE_ENDIAN);
+    }
+
+    private static void writeHeader(ByteBuffer buffer, int trajectories, int points, int order) {
+        buffer.put(MAGIC);
+        buffer.putInt(trajectories);
+        buffer.putInt(points);
+        buffer.putInt(order);
+    }
+}
\ No newline at end of file
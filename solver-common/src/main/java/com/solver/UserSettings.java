@@ -0,0 +1,43 @@
+package com.solver;
+
+import com.fasterxml.jackson.annotation.JsonCreator;
+import com.fasterxml.jackson.annotation.JsonProperty;
+
+public class UserSettings {
+    private Integer id;
+    private String method;
+    private String rounding;
+    private String language;
+    private Boolean hints;
+
+    public UserSettings() {}
+
+    @JsonCreator
+    public UserSettings(
+            @JsonProperty("id") Integer id,
+            @JsonProperty("method") String method,
+            @JsonProperty("rounding") String rounding,
+            @JsonProperty("language") String language,
+            @JsonProperty("hints") Boolean hints) {
+        this.id = id;
+        this.method = method;
+        this.rounding = rounding;
+        this.language = language;
+        this.hints = hints;
+    }
+
+    public Integer getId() { return id; }
+    public void setId(Integer id) { this.id = id; }
+
+    public String getMethod() { return method; }
+    public void setMethod(String method) { this.method = method; }
+
+    public String getRounding() { return rounding; }
+    public void setRounding(String rounding) { this.rounding = rounding; }
+
+    public String getLanguage() { return language; }
+    public void setLanguage(String language) { this.language = language; }
+
+    public Boolean getHints() { return hints; }
+    public void setHints(Boolean hints) { this.hints = hints; }
+}
\ No newline at end of file
@@ -0,0 +1,115 @@
+package com.solver;
+
+import org.junit.jupiter.api.Test;
+
+import java.util.ArrayList;
+import java.util.List;
+import java.util.concurrent.CompletableFuture;
+
+import static org.junit.jupiter.api.Assertions.assertArrayEquals;
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertNull;
+
+// Jobs share no state, so solving them at the same time on the executor
+// has to give exactly the results of solving them one after another.
+class SolverJobConcurrencyTest {
+    private static final int JOBS = 32;
+    private static final int THREADS = 4;
+
+    private static final String[] METHODS = {"euler", "midpoint", "heun", "rungeKutta", "dormandPrince"};
+
+    private static final String[][] EQUATIONS = {
+        {"1", "y[0]"},
+        {"1", "x + y[0]"},
+        {"1", "sin(x) * y[0] - cos(x)"},
+        {"2", "-y[1] - 4 * y[0]"},
+        {"3", "x - y[1] + exp(-x) * y[2]"},
+    };
+
+    @Test
+    void concurrentJobsMatchTheirSequentialResults() throws Exception {
+        List<SolverRequest> requests = new ArrayList<>(JOBS);
+        List<SolverJob.Solution> expected = new ArrayList<>(JOBS);
+        for (int i = 0; i < JOBS; i++) {
+            requests.add(request(i));
+            expected.add(new SolverJob(requests.get(i)).solve());
+        }
+
+        SolverExecutor executor = new SolverExecutor(THREADS, JOBS);
+        try {
+            SolverJob.Solution[] actual = new SolverJob.Solution[JOBS];
+
+            CompletableFuture<?>[] futures = new CompletableFuture<?>[JOBS];
+            for (int i = 0; i < JOBS; i++) {
+                int index = i;
+                futures[i] = executor.submit(() -> actual[index] = new SolverJob(requests.get(index)).solve());
+            }
+            CompletableFuture.allOf(futures).join();
+
+            for (int i = 0; i < JOBS; i++) {
+                String message = "job " + i;
+                assertArrayEquals(expected.get(i).solution(), actual[i].solution(), message);
+                assertArrayEquals(
+                    expected.get(i).trajectory().getXValues(), actual[i].trajectory().getXValues(), message);
+                assertArrayEquals(
+                    expected.get(i).trajectory().getYValues(0), actual[i].trajectory().getYValues(0), message);
+                assertEquals(expected.get(i).acceptedSteps(), actual[i].acceptedSteps(), message);
+                assertEquals(expected.get(i).rejectedSteps(), actual[i].rejectedSteps(), message);
+            }
+        } finally {
+            executor.destroy();
+        }
+    }
+
+    @Test
+    void exponentialGrowthReachesE() {
+        SolverRequest request = new SolverRequest();
+        request.setMethod("rungeKutta");
+        request.setOrder(1);
+        request.setUserEquation("y[0]");
+        request.setFormattedEquation("y[0]");
+        request.setInitialX(0);
+        request.setInitialY(new double[] {1.0});
+        request.setReachPoint(1);
+        request.setStepSize(1e-3);
+
+        SolverJob.Solution solution = new SolverJob(request).solve();
+
+        assertEquals(1.0, solution.solution()[0], 1e-9);
+        assertEquals(Math.E, solution.solution()[1], 1e-9);
+        // The initial state is not recorded, one point per step
+        assertEquals(1000, solution.trajectory().size());
+        assertNull(solution.acceptedSteps());
+    }
+
+    // Every job has its own method, equation, initial values and length
+    private static SolverRequest request(int index) {
+        String[] equation = EQUATIONS[index % EQUATIONS.length];
+        int order = Integer.parseInt(equation[0]);
+
+        double[] initialY = new double[order];
+        for (int i = 0; i < order; i++) {
+            initialY[i] = 1.0 + index * 0.01 + i;
+        }
+
+        SolverRequest request = new SolverRequest();
+        request.setMethod(METHODS[index % METHODS.length]);
+        request.setOrder(order);
+        request.setUserEquation(equation[1]);
+        request.setFormattedEquation(equation[1]);
+        request.setInitialX(0);
+        request.setInitialY(initialY);
+        request.setReachPoint(1 + index % 3);
+        request.setStepSize(1e-3);
+        request.setMaxPoints(200);
+
+        // Every third job is adaptive
+        if (index % 3 == 0) {
+            request.setMethod("dormandPrince");
+            request.setRelativeTolerance(1e-8);
+            request.setAbsoluteTolerance(1e-10);
+        }
+
+        return request;
+    }
+}
\ No newline at end of file